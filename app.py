@@ -1,11 +1,45 @@
+import logging
+import os
 import sys
+import threading
+import time
 from pathlib import Path
 
-import ttkbootstrap as ttk
-from ttkbootstrap.constants import BOTH, YES
+# Startup path: only ttkbootstrap, ui.welcome and the DB layer load before the
+# first paint. ui.task_manager (and the dialogs/services it uses) is imported
+# on login, or right away when a saved session is resumed.
+# `python app.py --profile-startup` prints how long each phase took.
+_T0 = time.perf_counter()
 
-from ui.task_manager import TaskManagerFrame
-from ui.welcome import WelcomeScreen
+
+class StartupProfile:
+    """Per-phase wall-clock timings; mark(name) closes the phase that started at the previous mark."""
+
+    def __init__(self, enabled: bool, start: float = _T0):
+        self.enabled = enabled
+        self.phases: list[tuple[str, float]] = []
+        self._start = self._last = start
+
+    def mark(self, name: str) -> None:
+        now = time.perf_counter()
+        if self.enabled:
+            self.phases.append((name, now - self._last))
+        self._last = now
+
+    def restart(self) -> None:
+        """Start a new measurement (e.g. at login) without recording the idle time before it."""
+        self._start = self._last = time.perf_counter()
+
+    def report(self, title: str, out=None) -> None:
+        if not self.enabled:
+            return
+        out = out or sys.stderr
+        print(f"{title}:", file=out)
+        for name, seconds in self.phases:
+            print(f"  {name:<16}{seconds * 1000:8.1f} ms", file=out)
+        print(f"  {'total':<16}{(self._last - self._start) * 1000:8.1f} ms", file=out, flush=True)
+        self.phases.clear()
+        self._start = self._last
 
 
 def resource_path(rel: str) -> Path:
@@ -21,39 +55,138 @@ def resource_path(rel: str) -> Path:
     return base / rel
 
 
+def resume_session(db, session):
+    """The session.SessionStore's current db.models.User (one primary-key lookup), or None -> Welcome screen."""
+    from db.models import User
+
+    user_id = session.load()
+    if user_id is None:
+        return None
+    rows = db.fetch_models(User, "user.by_id", (user_id,))
+    if not rows:
+        session.forget(user_id)  # user no longer exists (e.g. a fresh database)
+        return None
+    return rows[0]
+
+
+# DB connection profiles the GUI can run on (see db.manager.PROFILES): it writes,
+# so "readonly" would only fail at the first login or edit
+GUI_DB_PROFILES = ("interactive", "bulk")
+
+
+def gui_db_profile(environ=os.environ) -> str:
+    """$TASK_MANAGER_DB_PROFILE, or "interactive"; ValueError for a profile the GUI cannot use."""
+    name = environ.get("TASK_MANAGER_DB_PROFILE") or "interactive"
+    if name not in GUI_DB_PROFILES:
+        raise ValueError(f"TASK_MANAGER_DB_PROFILE={name!r} is not usable by the app; "
+                         f"use one of {', '.join(GUI_DB_PROFILES)}")
+    return name
+
+
+# the change feed is trimmed on a background thread this long after startup
+COMPACT_DELAY_MS = 10_000
+
+
+def compact_change_log(db, stop: threading.Event) -> int:
+    """ChangeFeed.compact() for a background thread: returns after the current batch once `stop` is set."""
+    from service.changes import ChangeFeed
+    try:
+        return ChangeFeed(db).compact(stop=stop)
+    except Exception:
+        logging.getLogger("TaskManager").exception("Change-log compaction failed")
+        return 0
+
+
 def main() -> None:
+    profile = StartupProfile("--profile-startup" in sys.argv[1:])
+    try:
+        db_profile = gui_db_profile()
+    except ValueError as exc:
+        sys.exit(f"error: {exc}")
+
+    import ttkbootstrap as ttk
+    from ttkbootstrap.constants import BOTH, YES
+
+    from db.manager import DatabaseManager
+    from service.auth import AuthService
+    from session.session import SessionStore
+    from ui.welcome import WelcomeScreen
+    profile.mark("imports")
+
     # Main window acts as the "controller" for TaskManagerFrame (exposes .db, .logout, .title()).
-    app = ttk.Window(themename="superhero")
+    # Start in the theme the screens use, so no other theme is built and thrown away.
+    app = ttk.Window(themename=WelcomeScreen.current_theme)
     app.title("Task Manager")
     app.geometry("900x600")
+    profile.mark("theme")
 
     # Resolve resources for both dev and PyInstaller runtimes
     # created on first run if absent
     db_path = resource_path("task_manager.db")
     # bundled via --add-data in CI
     schema_path = resource_path("db/schema.sql")
+    # remembered users (current one + recent profiles), kept next to the database
+    session = SessionStore(db_path.with_name("session.json"))
+
+    # one DB handle for the whole run (login/logout cycles reuse it)
+    # pool mode: TaskManagerFrame runs its queries on a background DBWorker
+    db = DatabaseManager(str(db_path), profile=db_profile, pool_size=4)
+    profile.mark("db open")
+    # no-op (schema.sql is not even read) when user_version is current
+    db.migrate(str(schema_path))
+    profile.mark("schema")
+    # writes from the UI's worker threads are committed by one writer thread, in groups
+    db.start_write_queue(name="app-writer")
+    app.db = db  # type: ignore[attr-defined]
+    # one login service for the run: its email -> user cache survives logout/login
+    auth = AuthService(db)
+
+    def remember(user) -> None:
+        try:
+            session.save(user.id, user.name, user.email)
+        except OSError:
+            pass  # resume is a convenience: an unwritable folder just means logging in again
 
     def logout() -> None:
-        """Return to the Welcome screen (clear current user session if you add one later)."""
+        """End the session (the profile stays listed) and return to the Welcome screen."""
+        session.clear()
         app.title("Task Manager")
         show_welcome()
 
-    def on_login(user_row) -> None:
-        """
-        Called by WelcomeScreen after a successful Login/Register.
-        user_row is a sqlite3.Row with keys: id, name, email.
-        """
+    def show_main(user) -> None:
+        """Replace the current screen with TaskManagerFrame for `user`."""
+        from db.worker import DBWorker
+        from service.tasks import TaskService
+        from ui.task_manager import CACHE_BYTES, PAGE_SIZE, TaskManagerFrame
+        profile.mark("imports")
+
+        # the first course page is queried on the frame's worker while the frame is built
+        service = TaskService(db, cache_bytes=CACHE_BYTES)
+        worker = DBWorker(name="task-manager-db")
+        courses = worker.submit(service.course_listing, user.id, PAGE_SIZE)
+
         # Swap to TaskManagerFrame
         for w in app.winfo_children():
             w.destroy()
         # Ensure the controller exposes the API TaskManagerFrame expects
         app.logout = logout  # type: ignore[attr-defined]
-        tm = TaskManagerFrame(app, app)  # (parent widget, controller = app)
-        tm.set_user(user_row["id"])
+        tm = TaskManagerFrame(app, app, service=service, worker=worker)  # (parent widget, controller = app)
+        tm.set_user(user.id, user=user, courses=courses)
         tm.pack(fill=BOTH, expand=YES)
+        profile.mark("main screen")
+
+    def on_login(user) -> None:
+        """
+        Called by WelcomeScreen after a successful Login/Register.
+        user is a db.models.User (id, name, email).
+        """
+        profile.restart()
+        remember(user)
+        show_main(user)
+        app.after_idle(lambda: (profile.mark("first paint"), profile.report("main screen")))
 
     def show_welcome() -> None:
-        """Show the Welcome screen and initialize the DatabaseManager."""
+        """Show the Welcome screen on the shared DatabaseManager."""
         for w in app.winfo_children():
             w.destroy()
         screen = WelcomeScreen(
@@ -61,15 +194,37 @@ def main() -> None:
             db_path=str(db_path),
             schema_path=str(schema_path),
             on_login=on_login,
+            db_profile=db_profile,
+            db=db,
+            auth=auth,
+            recent=session.profiles(),
         )
-        # Expose DB handle on the controller (TaskManagerFrame expects controller.db)
-        app.db = screen.db  # type: ignore[attr-defined]
         app.logout = logout  # type: ignore[attr-defined]
         screen.pack(fill=BOTH, expand=YES)
 
-    # Initial screen
-    show_welcome()
+    # Initial screen: straight to the task manager for a returning user
+    user = resume_session(db, session)
+    profile.mark("session")
+    if user is not None:
+        show_main(user)
+        # bump last_used (expiry); a no-op write-wise unless it is an hour old
+        app.after_idle(lambda: remember(user))
+    else:
+        show_welcome()
+        profile.mark("welcome screen")
+    app.after_idle(lambda: (profile.mark("first paint"), profile.report("startup")))
+    # trim the change feed while the app runs (like serve.py), not on the Tk thread at exit
+    stop_compaction = threading.Event()
+    compaction = threading.Thread(target=compact_change_log, args=(db, stop_compaction),
+                                  name="change-log-compaction", daemon=True)
+    app.after(COMPACT_DELAY_MS, compaction.start)
     app.mainloop()
+    try:
+        stop_compaction.set()
+        if compaction.is_alive():
+            compaction.join()  # at most the batch in progress
+    finally:
+        db.close()  # lets the writer commit anything still queued
 
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+"""
+Rows-per-second of service.exporter for each output format.
+
+    python -m bench.bench_export             # 1M tasks
+    python -m bench.bench_export -n 200000
+"""
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from db.manager import DatabaseManager
+from service.exporter import export_file
+
+SCHEMA = Path(__file__).resolve().parent.parent / "db" / "schema.sql"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("-n", "--rows", type=int, default=1_000_000)
+    ap.add_argument("--courses", type=int, default=50)
+    args = ap.parse_args()
+    logging.getLogger("TaskManager.DB").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(str(Path(tmp) / "export.db"), profile="bulk")
+        db.migrate(str(SCHEMA))
+        user_id = db.execute_named("user.insert", ("Bench", "bench@example.com"))
+        course_ids = [db.execute_named("course.insert", (user_id, f"Course {i}", "bench"))
+                      for i in range(args.courses)]
+        with db.transaction():
+            db.executemany_named("task.insert", (
+                (course_ids[i % args.courses], f"Task {i}", "exported by bench",
+                 f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}")
+                for i in range(args.rows)))
+        print(f"seeded {args.rows:,} tasks")
+
+        for name in ("tasks.csv", "tasks.jsonl", "tasks.ics"):
+            out = Path(tmp) / name
+            start = time.perf_counter()
+            n = export_file(db, user_id, out)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<12} {n:>10,} rows  {elapsed:6.1f}s  {n / elapsed:>10,.0f} rows/s  "
+                  f"{out.stat().st_size / 2**20:6.0f} MiB")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Rows-per-second and peak memory of service.importer on a generated CSV file.
+
+    python -m bench.bench_import             # 1M task rows
+    python -m bench.bench_import -n 200000 --batch-size 20000
+    python -m bench.bench_import --trace-memory    # peak Python memory (much slower run)
+"""
+import argparse
+import csv
+import logging
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from db.manager import DatabaseManager
+from service.importer import import_file
+
+SCHEMA = Path(__file__).resolve().parent.parent / "db" / "schema.sql"
+
+
+def _write_csv(path: Path, n: int, courses: int = 50) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["course", "name", "description", "due_date"])
+        for i in range(n):
+            w.writerow([f"Course {i % courses}", f"Task {i}", "imported by bench",
+                        f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}"])
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("-n", "--rows", type=int, default=1_000_000)
+    ap.add_argument("--batch-size", type=int, default=5000)
+    ap.add_argument("--trace-memory", action="store_true", help="report peak memory via tracemalloc")
+    args = ap.parse_args()
+    logging.getLogger("TaskManager.DB").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "tasks.csv"
+        start = time.perf_counter()
+        _write_csv(src, args.rows)
+        print(f"wrote {args.rows:,} rows ({src.stat().st_size / 2**20:.0f} MiB) in {time.perf_counter() - start:.1f}s")
+
+        db = DatabaseManager(str(Path(tmp) / "import.db"), profile="bulk")
+        db.migrate(str(SCHEMA))
+        user_id = db.execute_named("user.insert", ("Bench", "bench@example.com"))
+        if args.trace_memory:
+            tracemalloc.start()
+        report = import_file(db, user_id, src, batch_size=args.batch_size)
+        db.close()
+        print(report.summary())
+        if args.trace_memory:
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"peak Python memory {peak / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Rows-per-second for TASK inserts: one commit per row vs. batched commits.
+
+    python -m bench.bench_inserts            # 5k rows per mode
+    python -m bench.bench_inserts -n 50000
+"""
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from db.manager import DatabaseManager
+
+SCHEMA = Path(__file__).resolve().parent.parent / "db" / "schema.sql"
+INSERT_TASK = "INSERT INTO TASK(course_id, name, description, due_date) VALUES(?, ?, ?, ?)"
+
+
+def _fresh_db(workdir: Path, label: str):
+    db = DatabaseManager(str(workdir / f"{label}.db"))
+    db.migrate(str(SCHEMA))
+    user_id = db.execute("INSERT INTO USER(name, email) VALUES(?, ?)", ("Bench", "bench@example.com"))
+    course_id = db.execute("INSERT INTO COURSE(user_id, name) VALUES(?, ?)", (user_id, "Bench 101"))
+    return db, course_id
+
+
+def _rows(course_id: int, n: int):
+    return [(course_id, f"Task {i}", "bench", "2025-11-01") for i in range(n)]
+
+
+def bench_single(db, rows):
+    for row in rows:
+        db.execute(INSERT_TASK, row)
+
+
+def bench_transaction(db, rows):
+    with db.transaction():
+        for row in rows:
+            db.execute(INSERT_TASK, row)
+
+
+def bench_executemany(db, rows):
+    db.executemany(INSERT_TASK, rows)
+
+
+MODES = [
+    ("commit per row", bench_single),
+    ("transaction()", bench_transaction),
+    ("executemany()", bench_executemany),
+]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("-n", "--rows", type=int, default=5000)
+    args = ap.parse_args()
+    logging.getLogger("TaskManager.DB").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, fn in MODES:
+            db, course_id = _fresh_db(Path(tmp), label.split()[0].strip("()"))
+            rows = _rows(course_id, args.rows)
+            start = time.perf_counter()
+            fn(db, rows)
+            elapsed = time.perf_counter() - start
+            db.close()
+            print(f"{label:<16} {args.rows:>8} rows  {elapsed:8.3f}s  {args.rows / elapsed:>12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
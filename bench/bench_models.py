@@ -0,0 +1,64 @@
+"""
+Memory/time to materialize TASK rows as sqlite3.Row vs. __slots__ Task objects.
+
+    python -m bench.bench_models             # 1M tasks
+    python -m bench.bench_models -n 200000
+"""
+import argparse
+import gc
+import logging
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from db.manager import DatabaseManager
+from db.models import Task
+from db.queries import MAX_ID
+
+SCHEMA = Path(__file__).resolve().parent.parent / "db" / "schema.sql"
+
+
+def _seed(db: DatabaseManager, n: int) -> int:
+    user_id = db.execute_named("user.insert", ("Bench", "bench@example.com"))
+    course_id = db.execute_named("course.insert", (user_id, "Bench 101", ""))
+    db.executemany_named(
+        "task.insert",
+        ((course_id, f"Task {i}", "bench", "2025-11-01") for i in range(n)),
+    )
+    return course_id
+
+
+def _measure(label: str, load, n: int) -> None:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = load()
+    elapsed = time.perf_counter() - start
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(rows) == n
+    print(f"{label:<14} {n:>9} rows  {elapsed:7.2f}s  {current / 2**20:9.1f} MiB"
+          f"  {current / n:7.0f} B/row")
+    del rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("-n", "--rows", type=int, default=1_000_000)
+    args = ap.parse_args()
+    logging.getLogger("TaskManager.DB").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(str(Path(tmp) / "models.db"), profile="bulk")
+        db.migrate(str(SCHEMA))
+        course_id = _seed(db, args.rows)
+        params = (course_id, MAX_ID, 0, -1)
+
+        _measure("sqlite3.Row", lambda: db.fetch_named("task.page_by_course", params), args.rows)
+        _measure("slots Task", lambda: db.fetch_models(Task, "task.page_by_course", params), args.rows)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
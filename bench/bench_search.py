@@ -0,0 +1,65 @@
+"""
+Latency of ranked full-text search (DatabaseManager.search) over many tasks.
+
+    python -m bench.bench_search             # 1M tasks
+    python -m bench.bench_search -n 200000
+"""
+import argparse
+import logging
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from db.manager import DatabaseManager
+
+SCHEMA = Path(__file__).resolve().parent.parent / "db" / "schema.sql"
+
+# a few common words plus a long tail, roughly like real task titles/notes
+WORDS = ("essay lab quiz midterm final reading project draft review chapter "
+         "proof exercise report slides outline summary thesis survey").split()
+WORDS += [f"{a}{b}{c}" for a in ("ka", "lo", "mi", "ne", "ru", "sa", "te", "vo")
+          for b in ("bar", "den", "fil", "gor", "lum", "mer", "nis", "pot")
+          for c in ("a", "e", "i", "o", "u", "ax", "en", "is", "on", "us")]
+WEIGHTS = [1 / rank for rank in range(1, len(WORDS) + 1)]
+# as typed, one keystroke at a time
+QUERIES = ("es", "ess", "essay", "essay ch", "essay chap", "lab rep",
+           "thesis", "thesis out", "mi", "mifil", "mifilen", "zzz")
+
+
+def _seed(db: DatabaseManager, n: int) -> int:
+    rnd = random.Random(7)
+    user_id = db.execute_named("user.insert", ("Bench", "bench@example.com"))
+    course_id = db.execute_named("course.insert", (user_id, "Bench 101", ""))
+    db.executemany_named(
+        "task.insert",
+        ((course_id, f"{rnd.choices(WORDS, WEIGHTS)[0]} {i}", " ".join(rnd.choices(WORDS, WEIGHTS, k=6)), None)
+         for i in range(n)),
+    )
+    return user_id
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("-n", "--rows", type=int, default=1_000_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+    logging.getLogger("TaskManager.DB").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(str(Path(tmp) / "search.db"), profile="bulk")
+        db.migrate(str(SCHEMA))
+        user_id = _seed(db, args.rows)
+        for text in QUERIES:
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                hits = db.search(user_id, text, limit=50)
+                times.append(time.perf_counter() - start)
+            print(f"{text!r:<18} {len(hits):>3} hits  median {statistics.median(times) * 1000:8.1f} ms")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
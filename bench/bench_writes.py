@@ -0,0 +1,85 @@
+"""
+Stress test for concurrent writers: N threads inserting tasks, each write
+committed on its own (pooled connections) vs. through the group-commit
+write queue (DatabaseManager.start_write_queue).
+
+    python -m bench.bench_writes                  # 8 threads x 500 writes per mode
+    python -m bench.bench_writes -t 32 -n 200 --profile interactive
+"""
+import argparse
+import logging
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from db.manager import PROFILES, DatabaseManager
+
+SCHEMA = Path(__file__).resolve().parent.parent / "db" / "schema.sql"
+
+
+def run(path: Path, threads: int, writes: int, profile: str, queued: bool) -> None:
+    db = DatabaseManager(str(path), profile=profile, pool_size=threads + 1)
+    db.migrate(str(SCHEMA))
+    user_id = db.execute_named("user.insert", ("Bench", "bench@example.com"))
+    course_id = db.execute_named("course.insert", (user_id, "Bench 101", ""))
+    if queued:
+        db.start_write_queue()
+    logging.getLogger("TaskManager.DB").setLevel(logging.CRITICAL)  # "database is locked" is counted below
+
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    start_gate = threading.Barrier(threads)
+
+    def writer(t: int) -> None:
+        nonlocal errors
+        mine, failed = [], 0
+        start_gate.wait()
+        for i in range(writes):
+            t0 = time.perf_counter()
+            try:
+                db.execute_named("task.insert", (course_id, f"T{t}-{i}", "bench", "2025-11-01"))
+            except sqlite3.OperationalError:
+                failed += 1
+            mine.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(mine)
+            errors += failed
+
+    workers = [threading.Thread(target=writer, args=(t,)) for t in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+
+    stored = db.fetchall("SELECT COUNT(*) FROM TASK")[0][0]
+    commits = db.writes.commits if queued else stored
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{'queue' if queued else 'direct':<7} {stored / elapsed:>9,.0f} writes/s  "
+          f"p50 {statistics.median(latencies) * 1000:6.2f} ms  p99 {p99 * 1000:7.2f} ms  "
+          f"{commits:>6} commits  {errors} locked errors")
+    db.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("-t", "--threads", type=int, default=8)
+    ap.add_argument("-n", "--writes", type=int, default=500, help="writes per thread")
+    ap.add_argument("--profile", default="interactive", choices=sorted(PROFILES))
+    args = ap.parse_args()
+    logging.getLogger("TaskManager.DB").setLevel(logging.WARNING)
+
+    print(f"{args.threads} threads x {args.writes} writes, profile={args.profile}")
+    with tempfile.TemporaryDirectory() as tmp:
+        run(Path(tmp) / "direct.db", args.threads, args.writes, args.profile, queued=False)
+        run(Path(tmp) / "queue.db", args.threads, args.writes, args.profile, queued=True)
+
+
+if __name__ == "__main__":
+    main()
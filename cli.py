@@ -0,0 +1,243 @@
+"""
+Headless command line for scripts, cron jobs and servers without a display.
+
+Never imports tkinter/ttkbootstrap (app.py is the GUI). Output is one
+tab-separated row per line, or JSON lines with --json.
+
+    python cli.py --email you@example.com list courses
+    python cli.py --email you@example.com list tasks --course Math
+    python cli.py --email you@example.com list tasks --upcoming 7
+    python cli.py --email you@example.com --name "Your Name" add course Math -d "Calculus"
+    python cli.py --email you@example.com add task Math "HW 1" --due 2025-11-01
+    python cli.py --email you@example.com update task 12 --due 2025-11-08
+    python cli.py --email you@example.com update task 12 --name "HW 1b" --if-version 57
+    python cli.py --email you@example.com delete task 12
+    python cli.py --email you@example.com search "lim"
+    python cli.py --email you@example.com import tasks.csv
+    python cli.py --email you@example.com export agenda.ics
+
+Exit status: 0 ok, 1 error (message on stderr), 2 bad arguments.
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+from db.manager import DatabaseManager
+from db.models import User
+from service.auth import authenticate
+from service.tasks import ConflictError, TaskService
+
+BASE = Path(__file__).resolve().parent
+DEFAULT_DB = os.environ.get("TASK_MANAGER_DB", str(BASE / "task_manager.db"))
+
+COURSE_FIELDS = ("id", "name", "description", "version")
+TASK_FIELDS = ("id", "course_id", "name", "description", "due_date", "version")
+
+
+class CliError(Exception):
+    """Reported on stderr with exit status 1."""
+
+
+def _emit(rows, fields, as_json: bool) -> None:
+    out = sys.stdout
+    for row in rows:
+        values = [getattr(row, f) for f in fields]
+        if as_json:
+            out.write(json.dumps(dict(zip(fields, values)), ensure_ascii=False))
+        else:
+            out.write("\t".join("" if v is None else str(v).replace("\t", " ").replace("\n", " ")
+                                for v in values))
+        out.write("\n")
+
+
+def _login(db, email: str, name: str | None) -> User:
+    """--name given: log in or register (like the GUI); otherwise the email must exist."""
+    if name is None:
+        users = db.fetch_models(User, "user.by_email", (email,))
+        if not users:
+            raise CliError(f"No user with email {email!r} (pass --name to register)")
+        return users[0]
+    status, user = authenticate(db, name, email, confirm_on_mismatch=lambda _entered, _saved: False)
+    if status == "mismatch_declined":
+        raise CliError(f"{email} is registered under a different name")
+    if user is None:
+        raise CliError(f"Login failed ({status})")
+    return user
+
+
+def _course(tasks: TaskService, user: User, ref: str):
+    """A course of `user` by id or by (exact) name."""
+    course = tasks.course(int(ref)) if ref.isdigit() else None
+    if course is None:
+        rows = tasks.db.fetch_named("course.by_name", (user.id, ref))
+        course = tasks.course(rows[0][0]) if rows else None
+    if course is None or course.user_id != user.id:
+        raise CliError(f"No course {ref!r}")
+    return course
+
+
+def _task(tasks: TaskService, user: User, task_id: int):
+    task = tasks.task(task_id)
+    course = tasks.course(task.course_id) if task is not None else None
+    if course is None or course.user_id != user.id:
+        raise CliError(f"No task {task_id}")
+    return task
+
+
+def _pick(new, old):
+    return old if new is None else new
+
+
+# ---- commands ----------------------------------------------------------------
+def cmd_list(args, db, user) -> None:
+    tasks = TaskService(db)
+    if args.kind == "courses":
+        _emit(tasks.iter_courses(user.id), COURSE_FIELDS, args.json)
+    elif args.course:
+        course = _course(tasks, user, args.course)
+        _emit(tasks.iter_course_tasks(course.id), TASK_FIELDS, args.json)
+    elif args.overdue:
+        _emit(tasks.overdue(user.id, limit=args.limit), TASK_FIELDS, args.json)
+    elif args.upcoming is not None:
+        _emit(tasks.upcoming(user.id, days=args.upcoming, limit=args.limit), TASK_FIELDS, args.json)
+    else:
+        _emit(tasks.iter_user_tasks(user.id), TASK_FIELDS, args.json)
+
+
+def cmd_add(args, db, user) -> None:
+    tasks = TaskService(db)
+    if args.kind == "course":
+        row = tasks.add_course(user.id, args.name, args.description or "")
+        _emit([row], COURSE_FIELDS, args.json)
+    else:
+        if not args.course:
+            raise CliError("add task needs a course: add task COURSE NAME")
+        course = _course(tasks, user, args.course)
+        row = tasks.add_task(course.id, args.name, args.description or "", args.due)
+        _emit([row], TASK_FIELDS, args.json)
+
+
+def cmd_update(args, db, user) -> None:
+    """Omitted fields are filled in from the row as read, so the write is checked against its version."""
+    tasks = TaskService(db)
+    if args.kind == "course":
+        course = _course(tasks, user, str(args.id))
+        row = tasks.update_course(course.id, _pick(args.name, course.name),
+                                  _pick(args.description, course.description),
+                                  _pick(args.if_version, course.version))
+        _emit([row], COURSE_FIELDS, args.json)
+    else:
+        task = _task(tasks, user, args.id)
+        row = tasks.update_task(task.id, _pick(args.name, task.name),
+                                _pick(args.description, task.description), _pick(args.due, task.due_date),
+                                _pick(args.if_version, task.version))
+        _emit([row], TASK_FIELDS, args.json)
+
+
+def cmd_delete(args, db, user) -> None:
+    tasks = TaskService(db)
+    if args.kind == "course":
+        tasks.delete_course(_course(tasks, user, str(args.id)).id)
+    else:
+        tasks.delete_task(_task(tasks, user, args.id).id)
+
+
+def cmd_search(args, db, user) -> None:
+    _emit(db.search(user.id, args.text, limit=args.limit), ("kind", "id", "course_id", "name"), args.json)
+
+
+def cmd_import(args, db, user) -> None:
+    from service.importer import import_file
+
+    report = import_file(db, user.id, args.file, batch_size=args.batch_size)
+    print(report.summary())
+    for line, reason in report.rejects:
+        print(f"  line {line}: {reason}", file=sys.stderr)
+
+
+def cmd_export(args, db, user) -> None:
+    from service.exporter import export_file
+
+    n = export_file(db, user.id, args.file, component="VEVENT" if args.events else "VTODO")
+    print(f"{n} rows written to {args.file}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="cli.py", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--email", required=True, help="account to act on")
+    ap.add_argument("--name", dest="login_name", help="log in / register with this name (as the GUI does)")
+    ap.add_argument("--db", default=DEFAULT_DB, help="sqlite file (default: $TASK_MANAGER_DB or %(default)s)")
+    ap.add_argument("--json", action="store_true", help="JSON lines instead of tab-separated output")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("list", help="list courses or tasks")
+    p.add_argument("kind", choices=("courses", "tasks"))
+    p.add_argument("--course", help="tasks: only this course (id or name)")
+    p.add_argument("--upcoming", type=int, metavar="DAYS", help="tasks: due today or in the next DAYS days")
+    p.add_argument("--overdue", action="store_true", help="tasks: due before today")
+    p.add_argument("--limit", type=int, default=200)
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("add", help="add a course or task")
+    p.add_argument("kind", choices=("course", "task"))
+    p.add_argument("course", nargs="?", help="task: course id or name")
+    p.add_argument("name")
+    p.add_argument("-d", "--description")
+    p.add_argument("--due", help="task: due date (YYYY-MM-DD or D/M/Y)")
+    p.set_defaults(func=cmd_add)
+
+    p = sub.add_parser("update", help="change a course or task; omitted fields are kept")
+    p.add_argument("kind", choices=("course", "task"))
+    p.add_argument("id", type=int)
+    p.add_argument("--name")
+    p.add_argument("-d", "--description")
+    p.add_argument("--due", help="task: new due date ('' clears it)")
+    p.add_argument("--if-version", type=int, metavar="N",
+                   help="only if the row is still at version N (as listed); fails if it was changed since")
+    p.set_defaults(func=cmd_update)
+
+    p = sub.add_parser("delete", help="delete a course (with its tasks) or a task")
+    p.add_argument("kind", choices=("course", "task"))
+    p.add_argument("id", type=int)
+    p.set_defaults(func=cmd_delete)
+
+    p = sub.add_parser("search", help="full-text search over course and task names/descriptions")
+    p.add_argument("text")
+    p.add_argument("--limit", type=int, default=50)
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("import", help="import a .csv/.jsonl file (see service/importer.py)")
+    p.add_argument("file")
+    p.add_argument("--batch-size", type=int, default=5000)
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("export", help="export to .csv/.jsonl/.ics (see service/exporter.py)")
+    p.add_argument("file")
+    p.add_argument("--events", action="store_true", help=".ics: VEVENTs instead of VTODOs")
+    p.set_defaults(func=cmd_export)
+    return ap
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.getLogger("TaskManager.DB").setLevel(logging.WARNING)
+
+    db = DatabaseManager(args.db)
+    try:
+        db.migrate(str(BASE / "db" / "schema.sql"))
+        user = _login(db, args.email, args.login_name)
+        args.func(args, db, user)
+        return 0
+    except (CliError, ConflictError, ValueError, OSError, sqlite3.Error) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
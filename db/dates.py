@@ -0,0 +1,52 @@
+"""
+Due dates are stored as ISO 'YYYY-MM-DD' TEXT (or NULL).
+
+- ISO text sorts like the date itself, so range filters and ORDER BY due_date
+  run on the TASK(course_id, due_date) index without any conversion
+- normalize_due_date() is applied on every write path (TaskService, migration v3);
+  the schema triggers reject anything else that slips through
+"""
+import re
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+# accepted input layouts, tried in order (day-first for the slash/dot forms)
+_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%Y.%m.%d", "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y", "%Y%m%d")
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_ISO_DATETIME = re.compile(r"^(\d{4}-\d{1,2}-\d{1,2})[T ]")
+
+
+def normalize_due_date(value) -> Optional[str]:
+    """
+    Return `value` as 'YYYY-MM-DD', or None for an empty value.
+    Accepts date/datetime objects, ISO dates or datetimes and common
+    Y/M/D or D/M/Y spellings; raises ValueError for anything else.
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    text = str(value).strip()
+    if not text:
+        return None
+    if _ISO_DATE.match(text):  # fast path: already stored form (imports, exports)
+        try:
+            return date.fromisoformat(text).isoformat()
+        except ValueError:
+            raise ValueError(f"Invalid due date {value!r}; expected YYYY-MM-DD") from None
+    m = _ISO_DATETIME.match(text)
+    if m:
+        text = m.group(1)
+    for fmt in _FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid due date {value!r}; expected YYYY-MM-DD")
+
+
+def week_start(day: date) -> date:
+    """Monday of the week containing `day` (weeks as counted by task.weekly_counts_by_user)."""
+    return day - timedelta(days=day.weekday())
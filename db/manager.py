@@ -1,74 +1,520 @@
 import logging
 import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
 
+from db.migrations import LATEST_VERSION, MIGRATIONS
+from db.models import SearchHit
+from db.pool import ConnectionPool
+from db.queries import fts_query, sql_for
+from db.writer import WriteQueue
+
 log = logging.getLogger("TaskManager.DB")
 logging.basicConfig(level=logging.INFO,
                     format="%(asctime)s %(levelname)s: %(message)s")
 
+# Connection profiles: PRAGMAs applied (in order) right after connecting.
+# - interactive: WAL + synchronous=NORMAL -> readers never block the writer, cheap commits
+# - bulk:        large caches and a long busy timeout for imports; synchronous=NORMAL
+#                (in WAL no fsync per commit: power loss may lose the last batches, never corrupts)
+# - readonly:    opened with mode=ro and query_only, safe for report/export readers
+PROFILES = {
+    "interactive": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,         # KiB (negative) -> ~16 MB
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+    "bulk": {
+        "busy_timeout": 30000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+    "readonly": {
+        "busy_timeout": 5000,
+        "query_only": "ON",
+        "cache_size": -16000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+}
+DEFAULT_PROFILE = "interactive"
+
+# the current schema, mirrored by MIGRATIONS: only this file is stamped LATEST_VERSION
+SCHEMA_FILE = Path(__file__).resolve().with_name("schema.sql")
+
 
 class DatabaseManager:
     """
     SQLite helper with:
-    - PRAGMA foreign_keys=ON
+    - PRAGMA foreign_keys=ON plus a connection profile (see PROFILES)
     - conn.row_factory=sqlite3.Row (dict-like rows)
     - safe execute/fetch helpers with logging
+    - schema migrations keyed on PRAGMA user_version (see db/migrations.py)
+    - transaction()/executemany() to group many writes into one commit, savepoint() inside it
+    - optional pool mode (pool_size > 0): every call runs on a pooled connection with
+      its own cursor, so execute/fetchall are safe to call from worker threads
+    - named statements (db/queries.py) with per-name call counts and estimated statement-cache reuse
+    - fetch_models(): rows built as __slots__ domain objects (db/models.py)
+    - iterate()/iterate_named(): streaming reads with fetchmany on a private cursor
+    - search(): ranked full-text search over courses and tasks (FTS5)
+    - start_write_queue(): from then on execute/executemany/write() of every thread
+      go through one group-committing writer thread (db/writer.py)
+
+    In pool mode self.conn/self.cur still exist but are only used for migrations.
+    Pool mode needs a file path (each ":memory:" connection is a separate database).
     """
 
-    def __init__(self, db_path: str = "task_manager.db"):
+    def __init__(self, db_path: str = "task_manager.db", profile: str = DEFAULT_PROFILE,
+                 pool_size: int = 0, cached_statements: int = 128):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown DB profile {profile!r}; expected one of {sorted(PROFILES)}")
         self.db_path = db_path
+        self.profile = profile
+        self.pool = None
+        self.writes: WriteQueue | None = None
+        self.cached_statements = cached_statements
+        # model of each connection's statement LRU (sqlite3 caches by SQL text), keyed by id(conn)
+        self._stmt_lru: dict[int, OrderedDict] = {}
+        self._query_stats: dict[str, dict[str, int]] = {}
+        self._stats_lock = threading.Lock()
+        # per-thread transaction state: nesting depth + connection pinned by transaction()
+        self._local = threading.local()
         try:
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row
+            self.conn = self._connect()
             self.cur = self.conn.cursor()
-            self.cur.execute("PRAGMA foreign_keys = ON;")
-            log.info("Connected %s (foreign_keys=ON)",
-                     Path(self.db_path).resolve())
+            if pool_size:
+                self.pool = ConnectionPool(
+                    lambda: self._connect(check_same_thread=False), size=pool_size)
+            log.info("Connected %s (foreign_keys=ON, profile=%s, pool_size=%s)",
+                     Path(self.db_path).resolve(), self.profile, pool_size)
         except Exception:
             log.exception("Failed to connect to database")
             raise
 
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        """Open a connection configured for self.profile."""
+        if self.profile == "readonly" and self.db_path != ":memory:":
+            uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=check_same_thread,
+                                   cached_statements=self.cached_statements)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=check_same_thread,
+                                   cached_statements=self.cached_statements)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON;")
+        for pragma, value in PROFILES[self.profile].items():
+            conn.execute(f"PRAGMA {pragma} = {value};")
+        return conn
+
     # ---- schema/load ---------------------------------------------------------
-    def run_schema_file(self, schema_file: str) -> None:
-        """Execute full schema.sql file (idempotent CREATE TABLE IF NOT EXISTS)."""
+    def schema_version(self) -> int:
+        return self.conn.execute("PRAGMA user_version;").fetchone()[0]
+
+    def migrate(self, schema_file: str) -> int:
+        """
+        Bring the database up to LATEST_VERSION and return the resulting version.
+        - user_version already current -> nothing is read or executed
+        - fresh file (no tables)       -> schema.sql applied in one transaction
+        - older file                   -> pending MIGRATIONS applied one by one
+        Any other `schema_file` on a fresh file is applied as version 0: migrated
+        like an older file if it has the tables MIGRATIONS build on (USER, COURSE,
+        TASK), else left at 0 (a partial or custom layout is never stamped current).
+        """
         try:
-            with open(schema_file, "r", encoding="utf-8") as f:
-                sql = f.read()
-            self.conn.executescript(sql)
-            self.conn.commit()
-            log.info("Schema applied from %s", schema_file)
+            current = self.schema_version()
+            if current >= LATEST_VERSION:
+                log.info("Schema up to date (user_version=%s)", current)
+                return current
+
+            has_tables = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' LIMIT 1"
+            ).fetchone()
+            if not has_tables:
+                with open(schema_file, "r", encoding="utf-8") as f:
+                    sql = f.read()
+                current = LATEST_VERSION if Path(schema_file).resolve() == SCHEMA_FILE else 0
+                self._apply_step(current, sql)
+                log.info("Schema applied from %s (user_version=%s)", schema_file, current)
+                if current == LATEST_VERSION:
+                    return LATEST_VERSION
+                tables = {r[0] for r in self.conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+                if not {"USER", "COURSE", "TASK"} <= tables:
+                    log.warning("%s lacks USER/COURSE/TASK: not migrated (user_version=0)", schema_file)
+                    return 0
+
+            for version, step in MIGRATIONS:
+                if version > current:
+                    self._apply_step(version, step)
+                    log.info("Migrated schema to user_version=%s", version)
+            return LATEST_VERSION
         except Exception:
             log.exception("Failed to apply schema")
             raise
 
+    def run_schema_file(self, schema_file: str) -> None:
+        """Kept for existing callers; equivalent to migrate(schema_file)."""
+        self.migrate(schema_file)
+
+    def _apply_step(self, version: int, step) -> None:
+        """Run one migration step and stamp user_version atomically."""
+        if callable(step):
+            self.conn.execute("BEGIN")
+            try:
+                step(self.conn)
+                self.conn.execute(f"PRAGMA user_version = {int(version)};")
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+            return
+        try:
+            self.conn.executescript(
+                f"BEGIN;\n{step}\nPRAGMA user_version = {int(version)};\nCOMMIT;")
+        except Exception:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            raise
+
+    # ---- transactions --------------------------------------------------------
+    @property
+    def _tx_depth(self) -> int:
+        return getattr(self._local, "depth", 0)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group several writes into a single commit:
+
+            with db.transaction():
+                db.execute(...)
+                db.executemany(...)
+
+        - commits once when the block exits normally
+        - rolls back every write of the block if it raises
+        - nested blocks join the outermost transaction
+        - in pool mode the block keeps one pooled connection for the calling thread
+        """
+        if self._tx_depth:
+            self._local.depth += 1
+            try:
+                yield self
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self.pool.checkout() if self.pool else self.conn
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield self
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            log.warning("Transaction rolled back", exc_info=True)
+            raise
+        else:
+            conn.commit()
+        finally:
+            self._local.depth = 0
+            self._local.conn = None
+            if self.pool:
+                self.pool.checkin(conn)
+
+    @contextmanager
+    def savepoint(self, name: str = "sp"):
+        """
+        Nested unit of work inside transaction(): if the block raises, only its own
+        writes are rolled back and the enclosing transaction carries on.
+        """
+        if not self._tx_depth:
+            raise RuntimeError("savepoint() must run inside transaction()")
+        conn = self._local.conn
+        conn.execute(f'SAVEPOINT "{name}"')
+        try:
+            yield self
+        except BaseException:
+            conn.execute(f'ROLLBACK TO "{name}"')
+            conn.execute(f'RELEASE "{name}"')
+            raise
+        else:
+            conn.execute(f'RELEASE "{name}"')
+
+    @contextmanager
+    def suspended_triggers(self, *names: str):
+        """
+        Drop the named triggers for the duration of the block, inside transaction():
+
+            with db.transaction(), db.suspended_triggers("search_task_ai"):
+                db.executemany_named("task.insert", rows)
+                ...  # do the triggers' work once, set-based
+
+        They are recreated from their saved SQL before the transaction commits (a
+        rollback restores them anyway), so other connections never see them missing.
+        """
+        if not self._tx_depth:
+            raise RuntimeError("suspended_triggers() must run inside transaction()")
+        saved = []
+        with self._cursor() as cur:
+            for name in names:
+                row = cur.execute(
+                    "SELECT sql FROM sqlite_master WHERE type='trigger' AND name=?", (name,)).fetchone()
+                if row is None:
+                    raise KeyError(f"Unknown trigger {name!r}")
+                saved.append(row[0])
+                cur.execute(f'DROP TRIGGER "{name}"')
+        yield self
+        with self._cursor() as cur:
+            for sql in saved:
+                cur.execute(sql)
+
+    @contextmanager
+    def _cursor(self):
+        """
+        Cursor for a single call:
+        - single-connection mode -> the shared self.cur
+        - pool mode -> a fresh cursor on the thread's pinned (transaction) or pooled connection
+        """
+        if self.pool is None:
+            yield self.cur
+            return
+        pinned = getattr(self._local, "conn", None)
+        if pinned is not None:
+            cur = pinned.cursor()
+            try:
+                yield cur
+            finally:
+                cur.close()
+            return
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            try:
+                yield cur
+            finally:
+                cur.close()
+
+    def _commit(self, conn: sqlite3.Connection) -> None:
+        """Commit unless a transaction() block owns the commit."""
+        if not self._tx_depth:
+            conn.commit()
+
+    def _note_statement(self, conn: sqlite3.Connection, sql: str, name: str | None) -> None:
+        """
+        Count a call per name (named queries) and estimate whether sqlite3 reused a
+        compiled statement, by replaying its LRU here. Only an estimate: statements
+        run outside this class are not seen, and id(conn) of a closed connection
+        can be reused by a new one that starts with the old model.
+        """
+        with self._stats_lock:
+            lru = self._stmt_lru.setdefault(id(conn), OrderedDict())
+            hit = sql in lru
+            if hit:
+                lru.move_to_end(sql)
+            else:
+                lru[sql] = None
+                if len(lru) > self.cached_statements:
+                    lru.popitem(last=False)
+            if name is not None:
+                stats = self._query_stats.setdefault(name, {"calls": 0, "est_hits": 0, "est_misses": 0})
+                stats["calls"] += 1
+                stats["est_hits" if hit else "est_misses"] += 1
+
+    def query_stats(self) -> dict[str, dict[str, int]]:
+        """
+        Snapshot of {query name: {"calls", "est_hits", "est_misses"}}, busiest first.
+        `calls` is exact; est_* estimate statement-cache reuse (see _note_statement).
+        """
+        with self._stats_lock:
+            items = sorted(self._query_stats.items(), key=lambda kv: kv[1]["calls"], reverse=True)
+            return {name: dict(stats) for name, stats in items}
+
+    # ---- write queue ----------------------------------------------------------
+    def start_write_queue(self, **options) -> WriteQueue:
+        """
+        Send all later writes through a single WriteQueue thread (pool mode only).
+        execute()/executemany() outside a transaction() then block until their
+        group is committed. transaction() blocks are not rerouted and would take
+        the write lock next to the writer: run multi-statement work through write().
+        """
+        if self.pool is None:
+            raise ValueError("start_write_queue() needs pool mode (pool_size > 0)")
+        if self.writes is None:
+            self.writes = WriteQueue(self, **options)
+        return self.writes
+
+    def write(self, fn, *args):
+        """
+        Run fn(*args) as one atomic unit of work and return its result: on the
+        write queue if there is one, else in a transaction() on this thread.
+        """
+        if self.writes is not None and not self._tx_depth:
+            return self.writes.submit(fn, *args).result()
+        with self.transaction():
+            return fn(*args)
+
+    def _queued(self) -> bool:
+        # the writer thread itself always runs jobs inside its group transaction
+        return self.writes is not None and not self._tx_depth
+
     # ---- generic helpers -----------------------------------------------------
     def execute(self, sql: str, params=()):
+        return self._execute(sql, params)
+
+    def executemany(self, sql: str, seq_of_params) -> int:
+        """Run one statement for every params tuple with a single commit; returns rowcount."""
+        return self._executemany(sql, seq_of_params)
+
+    def fetchall(self, sql: str, params=()):
+        return self._fetchall(sql, params)
+
+    # ---- named queries (db/queries.py) ---------------------------------------
+    def execute_named(self, name: str, params=()):
+        return self._execute(sql_for(name), params, name)
+
+    def executemany_named(self, name: str, seq_of_params) -> int:
+        return self._executemany(sql_for(name), seq_of_params, name)
+
+    def fetch_named(self, name: str, params=()):
+        return self._fetchall(sql_for(name), params, name)
+
+    def fetch_models(self, model, name: str, params=()):
+        """Named query whose rows are built as `model` objects (db/models.py) instead of sqlite3.Row."""
+        return self._fetchall(sql_for(name), params, name, factory=model.row_factory)
+
+    # ---- streaming reads -----------------------------------------------------
+    def iterate(self, sql: str, params=(), batch_size: int = 500):
+        """
+        Yield rows one by one, pulling `batch_size` rows at a time with fetchmany().
+        - runs on its own cursor (never touches self.cur), so other calls may interleave
+        - memory stays bounded by batch_size, whatever the size of the result
+        - in pool mode the generator keeps one pooled connection until it is
+          exhausted or closed; consume it or close() it promptly
+        """
+        return self._iterate(sql, params, batch_size)
+
+    def iterate_named(self, name: str, params=(), batch_size: int = 500, model=None):
+        """iterate() for a named query; rows are `model` objects if given (see fetch_models)."""
+        factory = model.row_factory if model is not None else None
+        return self._iterate(sql_for(name), params, batch_size, name, factory)
+
+    def _iterate(self, sql: str, params, batch_size: int, name: str | None = None, factory=None):
+        with self._connection() as conn:
+            cur = conn.cursor()
+            if factory is not None:
+                cur.row_factory = factory
+            try:
+                self._note_statement(conn, sql, name)
+                try:
+                    cur.execute(sql, params)
+                except Exception:
+                    log.exception("DB read failed: %s | params=%s", name or sql, params)
+                    raise
+                while True:
+                    batch = cur.fetchmany(batch_size)
+                    if not batch:
+                        return
+                    yield from batch
+            finally:
+                cur.close()
+
+    @contextmanager
+    def _connection(self):
+        """Connection for a multi-step read: self.conn, the pinned one, or a pooled one."""
+        if self.pool is None:
+            yield self.conn
+            return
+        pinned = getattr(self._local, "conn", None)
+        if pinned is not None:
+            yield pinned
+            return
+        with self.pool.connection() as conn:
+            yield conn
+
+    def _execute(self, sql: str, params=(), name: str | None = None):
+        if self._queued():
+            return self.writes.submit(self._execute, sql, params, name).result()
         try:
-            self.cur.execute(sql, params)
-            self.conn.commit()
-            return self.cur.lastrowid
+            with self._cursor() as cur:
+                self._note_statement(cur.connection, sql, name)
+                cur.execute(sql, params)
+                self._commit(cur.connection)
+                return cur.lastrowid
         except Exception:
-            log.exception("DB write failed: %s | params=%s", sql, params)
+            log.exception("DB write failed: %s | params=%s", name or sql, params)
             raise
 
-    def fetchall(self, sql: str, params=()):
+    def _executemany(self, sql: str, seq_of_params, name: str | None = None) -> int:
+        if self._queued():
+            return self.writes.submit(self._executemany, sql, seq_of_params, name).result()
+        try:
+            with self._cursor() as cur:
+                self._note_statement(cur.connection, sql, name)
+                try:
+                    cur.executemany(sql, seq_of_params)
+                    self._commit(cur.connection)
+                except Exception:
+                    if not self._tx_depth:
+                        cur.connection.rollback()
+                    raise
+                return cur.rowcount
+        except Exception:
+            log.exception("DB bulk write failed: %s", name or sql)
+            raise
+
+    def _fetchall(self, sql: str, params=(), name: str | None = None, factory=None):
         try:
-            self.cur.execute(sql, params)
-            return self.cur.fetchall()
+            with self._cursor() as cur:
+                self._note_statement(cur.connection, sql, name)
+                if factory is None:
+                    cur.execute(sql, params)
+                    return cur.fetchall()
+                cur.row_factory = factory
+                try:
+                    cur.execute(sql, params)
+                    return cur.fetchall()
+                finally:
+                    # self.cur is shared in single-connection mode
+                    cur.row_factory = sqlite3.Row
         except Exception:
-            log.exception("DB read failed: %s | params=%s", sql, params)
+            log.exception("DB read failed: %s | params=%s", name or sql, params)
             raise
 
     def user_exists(self, user_id: int) -> bool:
         try:
-            row = self.fetchall("SELECT 1 FROM USER WHERE id=?", (user_id,))
+            row = self.fetch_named("user.exists", (user_id,))
             return bool(row)
         except Exception:
             log.exception("user_exists check failed for id=%s", user_id)
             return False
 
+    def search(self, user_id: int, text: str, limit: int = 50) -> list[SearchHit]:
+        """
+        Ranked full-text search over the user's courses and tasks (SEARCH, FTS5).
+        Every word of `text` must match, the last one as a prefix, so it can be
+        called as the user types. Best matches first out of all the user's
+        matches; other users' rows are never read. [] for blank input.
+        """
+        query = fts_query(text)
+        if not query:
+            return []
+        match = f'{{name description}} : ({query}) AND user_id : "{int(user_id)}"'
+        return self.fetch_models(SearchHit, "search.match", (match, limit))
+
     def close(self):
         try:
+            if self.writes is not None:
+                self.writes.close()
+                self.writes = None
+            if self.pool is not None:
+                self.pool.close()
             self.conn.close()
         except Exception:
             pass
@@ -0,0 +1,277 @@
+"""
+Ordered schema migrations keyed on PRAGMA user_version.
+
+- db/schema.sql always describes the *current* schema and is applied as-is to a fresh file.
+- Each entry below upgrades an existing database by exactly one version.
+- A step is either an SQL script or a callable receiving the open sqlite3.Connection.
+- Never edit a released step; append a new one and mirror the change in schema.sql.
+"""
+import logging
+
+from db.dates import normalize_due_date
+
+log = logging.getLogger("TaskManager.DB")
+
+_DUE_DATE_TRIGGERS = (
+    """
+        CREATE TRIGGER IF NOT EXISTS task_due_date_ai BEFORE INSERT ON TASK
+          WHEN new.due_date IS NOT NULL AND new.due_date IS NOT date(new.due_date, '+0 days') BEGIN
+          SELECT RAISE(ABORT, 'TASK.due_date must be YYYY-MM-DD or NULL');
+        END;
+    """,
+    """
+        CREATE TRIGGER IF NOT EXISTS task_due_date_au BEFORE UPDATE OF due_date ON TASK
+          WHEN new.due_date IS NOT NULL AND new.due_date IS NOT date(new.due_date, '+0 days') BEGIN
+          SELECT RAISE(ABORT, 'TASK.due_date must be YYYY-MM-DD or NULL');
+        END;
+    """,
+)
+
+
+def _normalize_due_dates(conn) -> None:
+    """
+    3: rewrite TASK.due_date as YYYY-MM-DD, then reject other values on write.
+    Unparseable dates are cleared; their text is kept at the end of the description.
+    """
+    last_id, fixed, cleared = 0, 0, 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, due_date FROM TASK WHERE id > ? AND due_date IS NOT NULL"
+            " AND due_date IS NOT date(due_date, '+0 days') ORDER BY id LIMIT 1000", (last_id,)).fetchall()
+        if not rows:
+            break
+        for task_id, raw in rows:
+            try:
+                conn.execute("UPDATE TASK SET due_date=? WHERE id=?", (normalize_due_date(raw), task_id))
+                fixed += 1
+            except ValueError:
+                conn.execute(
+                    "UPDATE TASK SET due_date=NULL,"
+                    " description=COALESCE(NULLIF(description, '') || char(10), '') || 'Due: ' || ? WHERE id=?",
+                    (raw, task_id))
+                cleared += 1
+        last_id = rows[-1][0]
+    for sql in _DUE_DATE_TRIGGERS:
+        conn.execute(sql)
+    if fixed or cleared:
+        log.info("Normalized %s due dates, cleared %s unparseable ones", fixed, cleared)
+
+
+MIGRATIONS = [
+    # 1: listing / cascade indexes
+    (1, """
+        CREATE INDEX IF NOT EXISTS idx_course_user_id ON COURSE (user_id, id);
+        CREATE INDEX IF NOT EXISTS idx_task_course_id ON TASK (course_id, id);
+        CREATE INDEX IF NOT EXISTS idx_task_course_due ON TASK (course_id, due_date);
+    """),
+    # 2: full-text search (SEARCH) + sync triggers, backfilled from existing rows
+    (2, """
+        CREATE VIRTUAL TABLE IF NOT EXISTS SEARCH USING fts5 (
+          name, description,
+          kind UNINDEXED, user_id UNINDEXED, course_id UNINDEXED,
+          tokenize = 'unicode61 remove_diacritics 2',
+          prefix = '2 3'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS search_task_ai AFTER INSERT ON TASK BEGIN
+          INSERT INTO SEARCH (rowid, name, description, kind, user_id, course_id)
+          VALUES (new.id, new.name, new.description, 'task',
+                  (SELECT user_id FROM COURSE WHERE id = new.course_id), new.course_id);
+        END;
+        CREATE TRIGGER IF NOT EXISTS search_task_au AFTER UPDATE OF name, description, course_id ON TASK BEGIN
+          UPDATE SEARCH SET name = new.name, description = new.description, course_id = new.course_id,
+                 user_id = (SELECT user_id FROM COURSE WHERE id = new.course_id)
+           WHERE rowid = new.id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS search_task_ad AFTER DELETE ON TASK BEGIN
+          DELETE FROM SEARCH WHERE rowid = old.id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS search_course_ai AFTER INSERT ON COURSE BEGIN
+          INSERT INTO SEARCH (rowid, name, description, kind, user_id, course_id)
+          VALUES (-new.id, new.name, new.description, 'course', new.user_id, new.id);
+        END;
+        CREATE TRIGGER IF NOT EXISTS search_course_au AFTER UPDATE OF name, description ON COURSE BEGIN
+          UPDATE SEARCH SET name = new.name, description = new.description WHERE rowid = -new.id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS search_course_ad AFTER DELETE ON COURSE BEGIN
+          DELETE FROM SEARCH WHERE rowid = -old.id;
+        END;
+
+        INSERT INTO SEARCH (rowid, name, description, kind, user_id, course_id)
+        SELECT -id, name, description, 'course', user_id, id FROM COURSE;
+        INSERT INTO SEARCH (rowid, name, description, kind, user_id, course_id)
+        SELECT t.id, t.name, t.description, 'task', c.user_id, t.course_id
+          FROM TASK t LEFT JOIN COURSE c ON c.id = t.course_id;
+    """),
+    # 3: ISO due dates + write guards (Python step: parses the old free-form text)
+    (3, _normalize_due_dates),
+    # 4: TASK_DAY calendar aggregate + maintenance triggers, backfilled
+    (4, """
+        CREATE TABLE IF NOT EXISTS TASK_DAY (
+          user_id INTEGER NOT NULL,
+          day     TEXT NOT NULL,
+          tasks   INTEGER NOT NULL,
+          PRIMARY KEY (user_id, day),
+          FOREIGN KEY (user_id) REFERENCES USER (id) ON DELETE CASCADE
+        ) WITHOUT ROWID;
+
+        CREATE TRIGGER IF NOT EXISTS task_day_ai AFTER INSERT ON TASK WHEN new.due_date IS NOT NULL BEGIN
+          INSERT INTO TASK_DAY (user_id, day, tasks)
+          SELECT user_id, new.due_date, 1 FROM COURSE WHERE id = new.course_id AND user_id IS NOT NULL
+          ON CONFLICT (user_id, day) DO UPDATE SET tasks = tasks + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS task_day_au AFTER UPDATE OF due_date, course_id ON TASK
+          WHEN old.due_date IS NOT new.due_date OR old.course_id IS NOT new.course_id BEGIN
+          UPDATE TASK_DAY SET tasks = tasks - 1
+           WHERE user_id = (SELECT user_id FROM COURSE WHERE id = old.course_id) AND day = old.due_date;
+          DELETE FROM TASK_DAY
+           WHERE user_id = (SELECT user_id FROM COURSE WHERE id = old.course_id) AND day = old.due_date AND tasks <= 0;
+          INSERT INTO TASK_DAY (user_id, day, tasks)
+          SELECT user_id, new.due_date, 1 FROM COURSE
+           WHERE id = new.course_id AND user_id IS NOT NULL AND new.due_date IS NOT NULL
+          ON CONFLICT (user_id, day) DO UPDATE SET tasks = tasks + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS task_day_ad AFTER DELETE ON TASK WHEN old.due_date IS NOT NULL BEGIN
+          UPDATE TASK_DAY SET tasks = tasks - 1
+           WHERE user_id = (SELECT user_id FROM COURSE WHERE id = old.course_id) AND day = old.due_date;
+          DELETE FROM TASK_DAY
+           WHERE user_id = (SELECT user_id FROM COURSE WHERE id = old.course_id) AND day = old.due_date AND tasks <= 0;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS course_day_bd BEFORE DELETE ON COURSE BEGIN
+          UPDATE TASK_DAY SET tasks = tasks - (SELECT COUNT(*) FROM TASK WHERE course_id = old.id AND due_date = TASK_DAY.day)
+           WHERE user_id = old.user_id AND day IN (SELECT due_date FROM TASK WHERE course_id = old.id);
+          DELETE FROM TASK_DAY WHERE user_id = old.user_id AND tasks <= 0;
+        END;
+        CREATE TRIGGER IF NOT EXISTS course_day_au AFTER UPDATE OF user_id ON COURSE
+          WHEN old.user_id IS NOT new.user_id BEGIN
+          UPDATE TASK_DAY SET tasks = tasks - (SELECT COUNT(*) FROM TASK WHERE course_id = old.id AND due_date = TASK_DAY.day)
+           WHERE user_id = old.user_id AND day IN (SELECT due_date FROM TASK WHERE course_id = old.id);
+          DELETE FROM TASK_DAY WHERE user_id = old.user_id AND tasks <= 0;
+          INSERT INTO TASK_DAY (user_id, day, tasks)
+          SELECT new.user_id, due_date, COUNT(*) FROM TASK
+           WHERE course_id = new.id AND due_date IS NOT NULL AND new.user_id IS NOT NULL GROUP BY due_date
+          ON CONFLICT (user_id, day) DO UPDATE SET tasks = tasks + excluded.tasks;
+        END;
+
+        INSERT INTO TASK_DAY (user_id, day, tasks)
+        SELECT c.user_id, t.due_date, COUNT(*) FROM TASK t JOIN COURSE c ON c.id = t.course_id
+         WHERE t.due_date IS NOT NULL AND c.user_id IS NOT NULL
+         GROUP BY c.user_id, t.due_date;
+    """),
+    # 5: row versions (optimistic concurrency) stamped from the REVISION counter;
+    # existing rows are numbered once (courses, then tasks) so versions stay unique
+    (5, """
+        ALTER TABLE COURSE ADD COLUMN version INTEGER NOT NULL DEFAULT 0;
+        ALTER TABLE COURSE ADD COLUMN updated_at TEXT;
+        ALTER TABLE TASK ADD COLUMN version INTEGER NOT NULL DEFAULT 0;
+        ALTER TABLE TASK ADD COLUMN updated_at TEXT;
+
+        CREATE TABLE IF NOT EXISTS REVISION (
+          id    INTEGER PRIMARY KEY CHECK (id = 1),
+          value INTEGER NOT NULL
+        );
+        UPDATE COURSE SET version = id;
+        UPDATE TASK SET version = id + (SELECT COALESCE(MAX(id), 0) FROM COURSE);
+        INSERT OR IGNORE INTO REVISION (id, value)
+        VALUES (1, (SELECT COALESCE(MAX(id), 0) FROM COURSE) + (SELECT COALESCE(MAX(id), 0) FROM TASK));
+
+        CREATE INDEX IF NOT EXISTS idx_course_user_version ON COURSE (user_id, version);
+        CREATE INDEX IF NOT EXISTS idx_task_version ON TASK (version);
+
+        CREATE TRIGGER IF NOT EXISTS course_version_ai AFTER INSERT ON COURSE BEGIN
+          UPDATE REVISION SET value = value + 1;
+          UPDATE COURSE SET version = (SELECT value FROM REVISION),
+                 updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now') WHERE id = new.id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS course_version_au AFTER UPDATE OF user_id, name, description ON COURSE BEGIN
+          UPDATE REVISION SET value = value + 1;
+          UPDATE COURSE SET version = (SELECT value FROM REVISION),
+                 updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now') WHERE id = new.id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS task_version_ai AFTER INSERT ON TASK BEGIN
+          UPDATE REVISION SET value = value + 1;
+          UPDATE TASK SET version = (SELECT value FROM REVISION),
+                 updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now') WHERE id = new.id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS task_version_au AFTER UPDATE OF course_id, name, description, due_date ON TASK BEGIN
+          UPDATE REVISION SET value = value + 1;
+          UPDATE TASK SET version = (SELECT value FROM REVISION),
+                 updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now') WHERE id = new.id;
+        END;
+    """),
+    # 6: CHANGE_LOG change feed + triggers (starts empty: clients begin from a full load)
+    (6, """
+        CREATE TABLE IF NOT EXISTS CHANGE_LOG (
+          seq        INTEGER PRIMARY KEY AUTOINCREMENT,
+          entity     TEXT NOT NULL,
+          row_id     INTEGER NOT NULL,
+          op         TEXT NOT NULL,
+          user_id    INTEGER,
+          course_id  INTEGER,
+          changed_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+        );
+        CREATE INDEX IF NOT EXISTS idx_change_log_user ON CHANGE_LOG (user_id, seq);
+
+        CREATE TRIGGER IF NOT EXISTS change_user_ai AFTER INSERT ON USER BEGIN
+          INSERT INTO CHANGE_LOG (entity, row_id, op, user_id) VALUES ('user', new.id, 'insert', new.id);
+        END;
+        CREATE TRIGGER IF NOT EXISTS change_user_au AFTER UPDATE OF name, email ON USER BEGIN
+          INSERT INTO CHANGE_LOG (entity, row_id, op, user_id) VALUES ('user', new.id, 'update', new.id);
+        END;
+        CREATE TRIGGER IF NOT EXISTS change_user_ad AFTER DELETE ON USER BEGIN
+          INSERT INTO CHANGE_LOG (entity, row_id, op, user_id) VALUES ('user', old.id, 'delete', old.id);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS change_course_ai AFTER INSERT ON COURSE BEGIN
+          INSERT INTO CHANGE_LOG (entity, row_id, op, user_id, course_id)
+          VALUES ('course', new.id, 'insert', new.user_id, new.id);
+        END;
+        CREATE TRIGGER IF NOT EXISTS change_course_au AFTER UPDATE OF user_id, name, description ON COURSE BEGIN
+          INSERT INTO CHANGE_LOG (entity, row_id, op, user_id, course_id)
+          SELECT 'course', old.id, 'delete', old.user_id, old.id WHERE old.user_id IS NOT new.user_id;
+          INSERT INTO CHANGE_LOG (entity, row_id, op, user_id, course_id)
+          VALUES ('course', new.id, 'update', new.user_id, new.id);
+        END;
+        CREATE TRIGGER IF NOT EXISTS change_course_ad AFTER DELETE ON COURSE BEGIN
+          INSERT INTO CHANGE_LOG (entity, row_id, op, user_id, course_id)
+          VALUES ('course', old.id, 'delete', old.user_id, old.id);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS change_task_ai AFTER INSERT ON TASK BEGIN
+          INSERT INTO CHANGE_LOG (entity, row_id, op, user_id, course_id)
+          VALUES ('task', new.id, 'insert', (SELECT user_id FROM COURSE WHERE id = new.course_id), new.course_id);
+        END;
+        CREATE TRIGGER IF NOT EXISTS change_task_au AFTER UPDATE OF course_id, name, description, due_date ON TASK BEGIN
+          INSERT INTO CHANGE_LOG (entity, row_id, op, user_id, course_id)
+          SELECT 'task', old.id, 'delete', o.user_id, old.course_id FROM COURSE o
+           WHERE o.id = old.course_id AND o.user_id IS NOT (SELECT user_id FROM COURSE WHERE id = new.course_id);
+          INSERT INTO CHANGE_LOG (entity, row_id, op, user_id, course_id)
+          VALUES ('task', new.id, 'update', (SELECT user_id FROM COURSE WHERE id = new.course_id), new.course_id);
+        END;
+        CREATE TRIGGER IF NOT EXISTS change_task_ad AFTER DELETE ON TASK
+          WHEN EXISTS (SELECT 1 FROM COURSE WHERE id = old.course_id) BEGIN
+          INSERT INTO CHANGE_LOG (entity, row_id, op, user_id, course_id)
+          VALUES ('task', old.id, 'delete', (SELECT user_id FROM COURSE WHERE id = old.course_id), old.course_id);
+        END;
+    """),
+    # 7: SEARCH.user_id indexed, so a match is scoped to one user inside FTS5 (rebuilt, backfilled)
+    (7, """
+        DROP TABLE IF EXISTS SEARCH;
+        CREATE VIRTUAL TABLE SEARCH USING fts5 (
+          name, description,
+          kind UNINDEXED, user_id, course_id UNINDEXED,
+          tokenize = 'unicode61 remove_diacritics 2',
+          prefix = '2 3'
+        );
+
+        INSERT INTO SEARCH (rowid, name, description, kind, user_id, course_id)
+        SELECT -id, name, description, 'course', user_id, id FROM COURSE;
+        INSERT INTO SEARCH (rowid, name, description, kind, user_id, course_id)
+        SELECT t.id, t.name, t.description, 'task', c.user_id, t.course_id
+          FROM TASK t LEFT JOIN COURSE c ON c.id = t.course_id;
+    """),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
@@ -0,0 +1,66 @@
+"""
+Compact domain objects built straight from cursor tuples.
+
+- dataclass(slots=True): no per-instance __dict__, much smaller than sqlite3.Row
+- the SELECT column order of a named query must match the field order
+  (see db/queries.py), because rows are built positionally: Model(*row)
+- row["field"] still works for callers written against sqlite3.Row
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+
+class _RowCompat:
+    __slots__ = ()
+
+    def __getitem__(self, key: str):
+        return getattr(self, key)
+
+    @classmethod
+    def row_factory(cls, _cursor, row):
+        return cls(*row)
+
+
+@dataclass(slots=True)
+class User(_RowCompat):
+    id: int
+    name: str
+    email: str
+
+
+@dataclass(slots=True)
+class Course(_RowCompat):
+    id: int
+    user_id: Optional[int] = None
+    name: str = ""
+    description: Optional[str] = None
+    version: int = 0  # see REVISION in db/schema.sql
+
+
+@dataclass(slots=True)
+class Task(_RowCompat):
+    id: int
+    course_id: Optional[int] = None
+    name: str = ""
+    description: Optional[str] = None
+    due_date: Optional[str] = None
+    version: int = 0
+
+
+@dataclass(slots=True)
+class SearchHit(_RowCompat):
+    kind: str  # "course" | "task"
+    id: int
+    course_id: Optional[int] = None
+    name: str = ""
+
+
+@dataclass(slots=True)
+class Change(_RowCompat):
+    seq: int
+    entity: str  # "user" | "course" | "task"
+    row_id: int
+    op: str  # "insert" | "update" | "delete"
+    user_id: Optional[int] = None
+    course_id: Optional[int] = None
+    changed_at: str = ""
@@ -0,0 +1,77 @@
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable
+
+log = logging.getLogger("TaskManager.DB.Pool")
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no connection could be checked out within the timeout."""
+
+
+class ConnectionPool:
+    """
+    Bounded pool of sqlite3 connections with checkout/checkin.
+    - connections are opened lazily through `factory`, up to `size`
+    - checkout() blocks while all connections are in use (PoolTimeoutError after `timeout` s)
+    - connection() is the context-manager form and always checks the connection back in
+    - `factory` must open connections with check_same_thread=False
+    """
+
+    def __init__(self, factory: Callable[[], sqlite3.Connection], size: int = 4, timeout: float = 30.0):
+        if size < 1:
+            raise ValueError("pool size must be >= 1")
+        self._factory = factory
+        self.size = size
+        self.timeout = timeout
+        self._idle: list[sqlite3.Connection] = []
+        self._all: list[sqlite3.Connection] = []
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def checkout(self) -> sqlite3.Connection:
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("connection pool is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if len(self._all) < self.size:
+                    conn = self._factory()
+                    self._all.append(conn)
+                    log.debug("Opened pooled connection %d/%d", len(self._all), self.size)
+                    return conn
+                if not self._cond.wait(self.timeout):
+                    raise PoolTimeoutError(f"no free connection after {self.timeout}s (size={self.size})")
+
+    def checkin(self, conn: sqlite3.Connection) -> None:
+        with self._cond:
+            if conn.in_transaction:
+                # never hand out a connection with someone else's half-done work
+                conn.rollback()
+            if self._closed:
+                conn.close()
+                return
+            self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        conn = self.checkout()
+        try:
+            yield conn
+        finally:
+            self.checkin(conn)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            for conn in self._idle:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._idle.clear()
+            self._cond.notify_all()
@@ -0,0 +1,196 @@
+"""
+Named SQL statements used across the app.
+
+Callers go through DatabaseManager.fetch_named/execute_named instead of inlining SQL:
+- every caller sends byte-identical text, so the connection's statement cache
+  (sqlite3 `cached_statements`) keeps the hot statements compiled
+- DatabaseManager.query_stats() counts calls per name, with an estimate of cache reuse
+"""
+import re
+
+# Largest SQLite integer: "id < MAX_ID" is the upper bound of a first keyset page.
+MAX_ID = 2**63 - 1
+
+QUERIES = {
+    # ---- USER ---------------------------------------------------------------
+    "user.by_id": "SELECT id, name, email FROM USER WHERE id=?",
+    "user.by_email": "SELECT id, name, email FROM USER WHERE email=? LIMIT 1",
+    "user.exists": "SELECT 1 FROM USER WHERE id=?",
+    "user.insert": "INSERT INTO USER (name, email) VALUES (?, ?)",
+    # registration in one round-trip: a row back = created, no row = the email exists
+    "user.insert_returning": (
+        "INSERT INTO USER (name, email) VALUES (?, ?) ON CONFLICT(email) DO NOTHING RETURNING id, name, email"
+    ),
+    "user.insert_missing": "INSERT INTO USER (name, email) VALUES (?, ?) ON CONFLICT(email) DO NOTHING",
+    # ? = JSON array of emails (any length, no host-parameter limit)
+    "user.by_emails": "SELECT id, name, email FROM USER WHERE email IN (SELECT value FROM json_each(?))",
+
+    # ---- COURSE -------------------------------------------------------------
+    "course.list_by_user": "SELECT id, name FROM COURSE WHERE user_id=? ORDER BY id DESC",
+    # keyset page (see ui.paging): id range [lower, before), LIMIT -1 == unbounded
+    "course.page_by_user": (
+        "SELECT id, user_id, name, description, version FROM COURSE"
+        " WHERE user_id=? AND id<? AND id>=? ORDER BY id DESC LIMIT ?"
+    ),
+    "course.count_by_user": "SELECT COUNT(*) FROM COURSE WHERE user_id=?",
+    "course.all_by_user": (
+        "SELECT id, user_id, name, description, version FROM COURSE WHERE user_id=? ORDER BY id DESC"
+    ),
+    "course.details": "SELECT id, user_id, name, description, version FROM COURSE WHERE id=?",
+    "course.by_name": (
+        "SELECT id, user_id, name, description, version FROM COURSE"
+        " WHERE user_id=? AND name=? ORDER BY id DESC LIMIT 1"
+    ),
+    "course.insert": "INSERT INTO COURSE (user_id, name, description) VALUES (?, ?, ?)",
+    "course.update": "UPDATE COURSE SET name=?, description=? WHERE id=?",
+    # optimistic: no row back = the version moved on (or the row is gone)
+    "course.update_if_version": "UPDATE COURSE SET name=?, description=? WHERE id=? AND version=? RETURNING id",
+    "course.delete": "DELETE FROM COURSE WHERE id=?",
+
+    # ---- TASK ---------------------------------------------------------------
+    "task.list_by_course": "SELECT id, name FROM TASK WHERE course_id=? ORDER BY id DESC",
+    "task.page_by_course": (
+        "SELECT id, course_id, name, description, due_date, version FROM TASK"
+        " WHERE course_id=? AND id<? AND id>=? ORDER BY id DESC LIMIT ?"
+    ),
+    "task.count_by_course": "SELECT COUNT(*) FROM TASK WHERE course_id=?",
+    "task.all_by_course": (
+        "SELECT id, course_id, name, description, due_date, version FROM TASK WHERE course_id=? ORDER BY id DESC"
+    ),
+    # every task of a user, grouped by course (streamed with iterate_named)
+    "task.all_by_user": (
+        "SELECT t.id, t.course_id, t.name, t.description, t.due_date, t.version"
+        " FROM COURSE c JOIN TASK t ON t.course_id = c.id"
+        " WHERE c.user_id=? ORDER BY c.id, t.id"
+    ),
+    # agenda across all of a user's courses: each course is a range scan of
+    # idx_task_course_due (due_date is ISO text, see db/dates.py)
+    "task.due_between_by_user": (
+        "SELECT t.id, t.course_id, t.name, t.description, t.due_date, t.version"
+        " FROM COURSE c JOIN TASK t ON t.course_id = c.id"
+        " WHERE c.user_id=? AND t.due_date>=? AND t.due_date<? ORDER BY t.due_date, t.id LIMIT ?"
+    ),
+    "task.overdue_by_user": (
+        "SELECT t.id, t.course_id, t.name, t.description, t.due_date, t.version"
+        " FROM COURSE c JOIN TASK t ON t.course_id = c.id"
+        " WHERE c.user_id=? AND t.due_date<? ORDER BY t.due_date DESC, t.id DESC LIMIT ?"
+    ),
+    # (monday of the week, tasks due that week); index-only
+    "task.weekly_counts_by_user": (
+        "SELECT date(t.due_date, '-6 days', 'weekday 1') AS week, COUNT(*)"
+        " FROM COURSE c JOIN TASK t ON t.course_id = c.id"
+        " WHERE c.user_id=? AND t.due_date>=? AND t.due_date<? GROUP BY week ORDER BY week"
+    ),
+    "task.details": "SELECT id, course_id, name, description, due_date, version FROM TASK WHERE id=?",
+    "task.insert": "INSERT INTO TASK (course_id, name, description, due_date) VALUES (?, ?, ?, ?)",
+    # bulk loads with task_version_ai suspended: the 5th value is the row's offset
+    # past REVISION, which the caller then advances by the number of rows
+    "task.insert_stamped": (
+        "INSERT INTO TASK (course_id, name, description, due_date, version, updated_at)"
+        " VALUES (?, ?, ?, ?, (SELECT value FROM REVISION) + ?, strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))"
+    ),
+    "task.update": "UPDATE TASK SET name=?, description=?, due_date=? WHERE id=?",
+    "task.update_if_version": (
+        "UPDATE TASK SET name=?, description=?, due_date=? WHERE id=? AND version=? RETURNING id"
+    ),
+    "task.delete": "DELETE FROM TASK WHERE id=?",
+
+    # ---- REVISION (row versions, sync) --------------------------------------
+    "revision.current": "SELECT value FROM REVISION",
+    "revision.advance": "UPDATE REVISION SET value = value + ?",
+    # rows stamped in (since, upto], oldest change first. Tasks are read off
+    # idx_task_version (CROSS JOIN keeps TASK as the outer loop), so a delta
+    # costs the number of changes, not the size of the user's task list.
+    "course.changed_since": (
+        "SELECT id, user_id, name, description, version FROM COURSE"
+        " WHERE user_id=? AND version>? AND version<=? ORDER BY version LIMIT ?"
+    ),
+    "task.changed_since": (
+        "SELECT t.id, t.course_id, t.name, t.description, t.due_date, t.version"
+        " FROM TASK t CROSS JOIN COURSE c ON c.id = t.course_id"
+        " WHERE c.user_id=? AND t.version>? AND t.version<=? ORDER BY t.version LIMIT ?"
+    ),
+
+    # ---- CHANGE_LOG (change feed, service/changes.py) -----------------------
+    "change_log.after": (
+        "SELECT seq, entity, row_id, op, user_id, course_id, changed_at FROM CHANGE_LOG"
+        " WHERE seq>? ORDER BY seq LIMIT ?"
+    ),
+    "change_log.after_by_user": (
+        "SELECT seq, entity, row_id, op, user_id, course_id, changed_at FROM CHANGE_LOG"
+        " WHERE user_id=? AND seq>? ORDER BY seq LIMIT ?"
+    ),
+    # newest seq ever handed out (sqlite_sequence keeps it after compaction)
+    "change_log.latest": "SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name='CHANGE_LOG'), 0)",
+    "change_log.oldest": "SELECT MIN(seq) FROM CHANGE_LOG",
+    # compaction: among the ? oldest entries, drop those stamped before ?
+    "change_log.trim": (
+        "DELETE FROM CHANGE_LOG WHERE seq IN (SELECT seq FROM CHANGE_LOG ORDER BY seq LIMIT ?)"
+        " AND changed_at<? RETURNING seq"
+    ),
+    # bulk loads: log every task with id > ? in one statement (see importer)
+    "change_log.tasks_inserted_after": (
+        "INSERT INTO CHANGE_LOG (entity, row_id, op, user_id, course_id)"
+        " SELECT 'task', t.id, 'insert', c.user_id, t.course_id"
+        " FROM TASK t LEFT JOIN COURSE c ON c.id = t.course_id WHERE t.id > ? ORDER BY t.id"
+    ),
+
+    # ---- TASK_DAY (calendar aggregate) --------------------------------------
+    "task_day.range_by_user": (
+        "SELECT day, tasks FROM TASK_DAY WHERE user_id=? AND day>=? AND day<? ORDER BY day"
+    ),
+
+    # ---- EXPORT (service/exporter.py, streamed) -----------------------------
+    # columns: type, course, name, description, due_date
+    "export.courses_by_user": (
+        "SELECT 'course', NULL, name, description, NULL FROM COURSE WHERE user_id=? ORDER BY id"
+    ),
+    "export.tasks_by_user": (
+        "SELECT 'task', c.name, t.name, t.description, t.due_date"
+        " FROM COURSE c JOIN TASK t ON t.course_id = c.id"
+        " WHERE c.user_id=? ORDER BY c.id, t.id"
+    ),
+    # calendar export: per course in due-date order, straight off idx_task_course_due
+    "export.dated_tasks_by_user": (
+        "SELECT t.id, c.name, t.name, t.description, t.due_date"
+        " FROM COURSE c JOIN TASK t ON t.course_id = c.id"
+        " WHERE c.user_id=? AND t.due_date IS NOT NULL ORDER BY c.id, t.due_date"
+    ),
+
+    # ---- SEARCH (FTS5) ------------------------------------------------------
+    # bulk loads: index every task with id > ? in one statement (see importer)
+    "search.index_tasks_after": (
+        "INSERT INTO SEARCH (rowid, name, description, kind, user_id, course_id)"
+        " SELECT t.id, t.name, t.description, 'task', c.user_id, t.course_id"
+        " FROM TASK t LEFT JOIN COURSE c ON c.id = t.course_id WHERE t.id > ?"
+    ),
+    "task.max_id": "SELECT COALESCE(MAX(id), 0) FROM TASK",
+    # ? MATCH expression already scoped to one user (see search()), ? results.
+    # Every one of the user's matches is ranked before the LIMIT; a name hit
+    # weighs 10x a description hit, the user_id term weighs nothing.
+    "search.match": (
+        "SELECT kind, abs(rowid) AS id, course_id, name FROM SEARCH WHERE SEARCH MATCH ?"
+        " ORDER BY bm25(SEARCH, 10.0, 1.0, 0.0, 0.0, 0.0) LIMIT ?"
+    ),
+}
+
+
+def fts_query(text: str) -> str:
+    """
+    Turn free text typed by a user into an FTS5 MATCH expression.
+    Every word must match, the last one as a prefix; FTS5 operators and
+    punctuation in the input are treated as plain text. "" if there are no words.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return ""
+    quoted = [f'"{w}"' for w in words]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def sql_for(name: str) -> str:
+    try:
+        return QUERIES[name]
+    except KeyError:
+        raise KeyError(f"Unknown query name {name!r}") from None
@@ -9,6 +9,8 @@ CREATE TABLE IF NOT EXISTS COURSE (
   user_id     INTEGER,
   name        TEXT NOT NULL,
   description TEXT,
+  version     INTEGER NOT NULL DEFAULT 0,
+  updated_at  TEXT,
   FOREIGN KEY (user_id) REFERENCES USER (id) ON DELETE CASCADE
 );
 
@@ -18,5 +20,209 @@ CREATE TABLE IF NOT EXISTS TASK (
   name       TEXT NOT NULL,
   description TEXT,
   due_date    TEXT,
+  version     INTEGER NOT NULL DEFAULT 0,
+  updated_at  TEXT,
   FOREIGN KEY (course_id) REFERENCES COURSE (id) ON DELETE CASCADE
 );
+
+-- Listing indexes: COURSE by user, TASK by course (newest first) and by due date.
+-- TASK(course_id, ...) also serves the ON DELETE CASCADE lookup from COURSE.
+CREATE INDEX IF NOT EXISTS idx_course_user_id ON COURSE (user_id, id);
+CREATE INDEX IF NOT EXISTS idx_task_course_id ON TASK (course_id, id);
+CREATE INDEX IF NOT EXISTS idx_task_course_due ON TASK (course_id, due_date);
+
+-- Full-text index over TASK and COURSE name/description, kept in sync by triggers.
+-- rowid = TASK.id for tasks and -COURSE.id for courses. user_id is indexed so
+-- search() scopes the MATCH itself to one user ('... AND user_id : "42"') instead
+-- of filtering every user's hits afterwards; kind/course_id open a hit in the UI.
+-- prefix='2 3' keeps as-you-type prefix queries ("ess*") on the index.
+CREATE VIRTUAL TABLE IF NOT EXISTS SEARCH USING fts5 (
+  name, description,
+  kind UNINDEXED, user_id, course_id UNINDEXED,
+  tokenize = 'unicode61 remove_diacritics 2',
+  prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS search_task_ai AFTER INSERT ON TASK BEGIN
+  INSERT INTO SEARCH (rowid, name, description, kind, user_id, course_id)
+  VALUES (new.id, new.name, new.description, 'task',
+          (SELECT user_id FROM COURSE WHERE id = new.course_id), new.course_id);
+END;
+CREATE TRIGGER IF NOT EXISTS search_task_au AFTER UPDATE OF name, description, course_id ON TASK BEGIN
+  UPDATE SEARCH SET name = new.name, description = new.description, course_id = new.course_id,
+         user_id = (SELECT user_id FROM COURSE WHERE id = new.course_id)
+   WHERE rowid = new.id;
+END;
+CREATE TRIGGER IF NOT EXISTS search_task_ad AFTER DELETE ON TASK BEGIN
+  DELETE FROM SEARCH WHERE rowid = old.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_course_ai AFTER INSERT ON COURSE BEGIN
+  INSERT INTO SEARCH (rowid, name, description, kind, user_id, course_id)
+  VALUES (-new.id, new.name, new.description, 'course', new.user_id, new.id);
+END;
+CREATE TRIGGER IF NOT EXISTS search_course_au AFTER UPDATE OF name, description ON COURSE BEGIN
+  UPDATE SEARCH SET name = new.name, description = new.description WHERE rowid = -new.id;
+END;
+CREATE TRIGGER IF NOT EXISTS search_course_ad AFTER DELETE ON COURSE BEGIN
+  DELETE FROM SEARCH WHERE rowid = -old.id;
+END;
+
+-- TASK.due_date is ISO 'YYYY-MM-DD' (see db/dates.py): it sorts as a date, so the
+-- agenda queries are plain range scans of idx_task_course_due. Reject anything else.
+CREATE TRIGGER IF NOT EXISTS task_due_date_ai BEFORE INSERT ON TASK
+  WHEN new.due_date IS NOT NULL AND new.due_date IS NOT date(new.due_date, '+0 days') BEGIN
+  SELECT RAISE(ABORT, 'TASK.due_date must be YYYY-MM-DD or NULL');
+END;
+CREATE TRIGGER IF NOT EXISTS task_due_date_au BEFORE UPDATE OF due_date ON TASK
+  WHEN new.due_date IS NOT NULL AND new.due_date IS NOT date(new.due_date, '+0 days') BEGIN
+  SELECT RAISE(ABORT, 'TASK.due_date must be YYYY-MM-DD or NULL');
+END;
+
+-- Per-user, per-day count of tasks with a due date (calendar month view: one
+-- PK range scan). Maintained by the triggers below. The course triggers settle
+-- a course's days up front: by the time ON DELETE CASCADE removes its tasks the
+-- COURSE row is gone, so task_day_ad can no longer tell whose days they were.
+CREATE TABLE IF NOT EXISTS TASK_DAY (
+  user_id INTEGER NOT NULL,
+  day     TEXT NOT NULL,
+  tasks   INTEGER NOT NULL,
+  PRIMARY KEY (user_id, day),
+  FOREIGN KEY (user_id) REFERENCES USER (id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS task_day_ai AFTER INSERT ON TASK WHEN new.due_date IS NOT NULL BEGIN
+  INSERT INTO TASK_DAY (user_id, day, tasks)
+  SELECT user_id, new.due_date, 1 FROM COURSE WHERE id = new.course_id AND user_id IS NOT NULL
+  ON CONFLICT (user_id, day) DO UPDATE SET tasks = tasks + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS task_day_au AFTER UPDATE OF due_date, course_id ON TASK
+  WHEN old.due_date IS NOT new.due_date OR old.course_id IS NOT new.course_id BEGIN
+  UPDATE TASK_DAY SET tasks = tasks - 1
+   WHERE user_id = (SELECT user_id FROM COURSE WHERE id = old.course_id) AND day = old.due_date;
+  DELETE FROM TASK_DAY
+   WHERE user_id = (SELECT user_id FROM COURSE WHERE id = old.course_id) AND day = old.due_date AND tasks <= 0;
+  INSERT INTO TASK_DAY (user_id, day, tasks)
+  SELECT user_id, new.due_date, 1 FROM COURSE
+   WHERE id = new.course_id AND user_id IS NOT NULL AND new.due_date IS NOT NULL
+  ON CONFLICT (user_id, day) DO UPDATE SET tasks = tasks + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS task_day_ad AFTER DELETE ON TASK WHEN old.due_date IS NOT NULL BEGIN
+  UPDATE TASK_DAY SET tasks = tasks - 1
+   WHERE user_id = (SELECT user_id FROM COURSE WHERE id = old.course_id) AND day = old.due_date;
+  DELETE FROM TASK_DAY
+   WHERE user_id = (SELECT user_id FROM COURSE WHERE id = old.course_id) AND day = old.due_date AND tasks <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS course_day_bd BEFORE DELETE ON COURSE BEGIN
+  UPDATE TASK_DAY SET tasks = tasks - (SELECT COUNT(*) FROM TASK WHERE course_id = old.id AND due_date = TASK_DAY.day)
+   WHERE user_id = old.user_id AND day IN (SELECT due_date FROM TASK WHERE course_id = old.id);
+  DELETE FROM TASK_DAY WHERE user_id = old.user_id AND tasks <= 0;
+END;
+CREATE TRIGGER IF NOT EXISTS course_day_au AFTER UPDATE OF user_id ON COURSE
+  WHEN old.user_id IS NOT new.user_id BEGIN
+  UPDATE TASK_DAY SET tasks = tasks - (SELECT COUNT(*) FROM TASK WHERE course_id = old.id AND due_date = TASK_DAY.day)
+   WHERE user_id = old.user_id AND day IN (SELECT due_date FROM TASK WHERE course_id = old.id);
+  DELETE FROM TASK_DAY WHERE user_id = old.user_id AND tasks <= 0;
+  INSERT INTO TASK_DAY (user_id, day, tasks)
+  SELECT new.user_id, due_date, COUNT(*) FROM TASK
+   WHERE course_id = new.id AND due_date IS NOT NULL AND new.user_id IS NOT NULL GROUP BY due_date
+  ON CONFLICT (user_id, day) DO UPDATE SET tasks = tasks + excluded.tasks;
+END;
+
+-- Optimistic concurrency. REVISION.value is a database-wide change counter: every
+-- insert or edit of a COURSE/TASK row bumps it and stamps the row's `version`
+-- with the new value, so no two rows share a version (bulk loads stamp each row
+-- themselves, see service/importer.py). A version identifies one edit of one row
+-- (an UPDATE ... WHERE id=? AND version=? that matches nothing lost a race), and
+-- "version > X" is everything changed since a client last saw revision X.
+CREATE TABLE IF NOT EXISTS REVISION (
+  id    INTEGER PRIMARY KEY CHECK (id = 1),
+  value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO REVISION (id, value) VALUES (1, 0);
+
+CREATE INDEX IF NOT EXISTS idx_course_user_version ON COURSE (user_id, version);
+CREATE INDEX IF NOT EXISTS idx_task_version ON TASK (version);
+
+CREATE TRIGGER IF NOT EXISTS course_version_ai AFTER INSERT ON COURSE BEGIN
+  UPDATE REVISION SET value = value + 1;
+  UPDATE COURSE SET version = (SELECT value FROM REVISION),
+         updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now') WHERE id = new.id;
+END;
+CREATE TRIGGER IF NOT EXISTS course_version_au AFTER UPDATE OF user_id, name, description ON COURSE BEGIN
+  UPDATE REVISION SET value = value + 1;
+  UPDATE COURSE SET version = (SELECT value FROM REVISION),
+         updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now') WHERE id = new.id;
+END;
+CREATE TRIGGER IF NOT EXISTS task_version_ai AFTER INSERT ON TASK BEGIN
+  UPDATE REVISION SET value = value + 1;
+  UPDATE TASK SET version = (SELECT value FROM REVISION),
+         updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now') WHERE id = new.id;
+END;
+CREATE TRIGGER IF NOT EXISTS task_version_au AFTER UPDATE OF course_id, name, description, due_date ON TASK BEGIN
+  UPDATE REVISION SET value = value + 1;
+  UPDATE TASK SET version = (SELECT value FROM REVISION),
+         updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now') WHERE id = new.id;
+END;
+
+-- Append-only change feed (service/changes.py). One entry per insert/update/delete
+-- of a USER, COURSE or TASK row, in commit order: `seq` only grows (AUTOINCREMENT
+-- never reuses a number, even after old entries are compacted away).
+-- entity: 'user' | 'course' | 'task'; op: 'insert' | 'update' | 'delete'
+-- user_id: whose row it is (no FK: entries outlive the rows they describe)
+-- course_id: a task's course, a course's own id
+-- A deleted course takes its tasks with it (ON DELETE CASCADE) in ONE entry:
+-- change_task_ad skips tasks whose course is already gone.
+CREATE TABLE IF NOT EXISTS CHANGE_LOG (
+  seq        INTEGER PRIMARY KEY AUTOINCREMENT,
+  entity     TEXT NOT NULL,
+  row_id     INTEGER NOT NULL,
+  op         TEXT NOT NULL,
+  user_id    INTEGER,
+  course_id  INTEGER,
+  changed_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+CREATE INDEX IF NOT EXISTS idx_change_log_user ON CHANGE_LOG (user_id, seq);
+
+CREATE TRIGGER IF NOT EXISTS change_user_ai AFTER INSERT ON USER BEGIN
+  INSERT INTO CHANGE_LOG (entity, row_id, op, user_id) VALUES ('user', new.id, 'insert', new.id);
+END;
+CREATE TRIGGER IF NOT EXISTS change_user_au AFTER UPDATE OF name, email ON USER BEGIN
+  INSERT INTO CHANGE_LOG (entity, row_id, op, user_id) VALUES ('user', new.id, 'update', new.id);
+END;
+CREATE TRIGGER IF NOT EXISTS change_user_ad AFTER DELETE ON USER BEGIN
+  INSERT INTO CHANGE_LOG (entity, row_id, op, user_id) VALUES ('user', old.id, 'delete', old.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS change_course_ai AFTER INSERT ON COURSE BEGIN
+  INSERT INTO CHANGE_LOG (entity, row_id, op, user_id, course_id)
+  VALUES ('course', new.id, 'insert', new.user_id, new.id);
+END;
+CREATE TRIGGER IF NOT EXISTS change_course_au AFTER UPDATE OF user_id, name, description ON COURSE BEGIN
+  INSERT INTO CHANGE_LOG (entity, row_id, op, user_id, course_id)
+  SELECT 'course', old.id, 'delete', old.user_id, old.id WHERE old.user_id IS NOT new.user_id;
+  INSERT INTO CHANGE_LOG (entity, row_id, op, user_id, course_id)
+  VALUES ('course', new.id, 'update', new.user_id, new.id);
+END;
+CREATE TRIGGER IF NOT EXISTS change_course_ad AFTER DELETE ON COURSE BEGIN
+  INSERT INTO CHANGE_LOG (entity, row_id, op, user_id, course_id)
+  VALUES ('course', old.id, 'delete', old.user_id, old.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS change_task_ai AFTER INSERT ON TASK BEGIN
+  INSERT INTO CHANGE_LOG (entity, row_id, op, user_id, course_id)
+  VALUES ('task', new.id, 'insert', (SELECT user_id FROM COURSE WHERE id = new.course_id), new.course_id);
+END;
+CREATE TRIGGER IF NOT EXISTS change_task_au AFTER UPDATE OF course_id, name, description, due_date ON TASK BEGIN
+  INSERT INTO CHANGE_LOG (entity, row_id, op, user_id, course_id)
+  SELECT 'task', old.id, 'delete', o.user_id, old.course_id FROM COURSE o
+   WHERE o.id = old.course_id AND o.user_id IS NOT (SELECT user_id FROM COURSE WHERE id = new.course_id);
+  INSERT INTO CHANGE_LOG (entity, row_id, op, user_id, course_id)
+  VALUES ('task', new.id, 'update', (SELECT user_id FROM COURSE WHERE id = new.course_id), new.course_id);
+END;
+CREATE TRIGGER IF NOT EXISTS change_task_ad AFTER DELETE ON TASK
+  WHEN EXISTS (SELECT 1 FROM COURSE WHERE id = old.course_id) BEGIN
+  INSERT INTO CHANGE_LOG (entity, row_id, op, user_id, course_id)
+  VALUES ('task', old.id, 'delete', (SELECT user_id FROM COURSE WHERE id = old.course_id), old.course_id);
+END;
@@ -0,0 +1,125 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+log = logging.getLogger("TaskManager.DB.Worker")
+
+_STOP = object()
+
+
+class DBWorker:
+    """
+    Runs DB calls on a background thread and hands results back to the UI thread.
+
+    - submit(fn, *args, on_done=..., on_error=..., key=...) -> concurrent.futures.Future
+    - callbacks never run on the worker thread: they are queued and executed by pump(),
+      which the UI thread calls (attach(widget) polls it through Tk's after())
+    - key coalesces requests: a newer submit with the same key supersedes older ones;
+      superseded jobs are skipped if not started yet and their callbacks never run
+    - the DatabaseManager used by `fn` must be in pool mode (pool_size > 0)
+    """
+
+    def __init__(self, name: str = "db-worker"):
+        self._jobs: queue.Queue = queue.Queue()
+        self._results: queue.Queue = queue.Queue()
+        self._latest: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._after_id = None
+        self._widget = None
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    # ---- producer side (UI thread) -----------------------------------------
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        on_done: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+        key: Optional[str] = None,
+    ) -> Future:
+        future: Future = Future()
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            if key is not None:
+                self._latest[key] = seq
+        self._jobs.put((future, fn, args, on_done, on_error, key, seq))
+        return future
+
+    def cancel(self, key: str) -> None:
+        """Supersede every pending job submitted with `key` without queuing a new one."""
+        with self._lock:
+            self._seq += 1
+            self._latest[key] = self._seq
+
+    def pump(self) -> int:
+        """Run callbacks of finished jobs on the calling thread; returns how many ran."""
+        ran = 0
+        while True:
+            try:
+                future, on_done, on_error, key, seq = self._results.get_nowait()
+            except queue.Empty:
+                return ran
+            if self._is_stale(key, seq):
+                continue
+            try:
+                exc = future.exception()
+                if exc is not None:
+                    if on_error is not None:
+                        on_error(exc)
+                    else:
+                        log.error("Background DB call failed", exc_info=exc)
+                elif on_done is not None:
+                    on_done(future.result())
+            except Exception:
+                log.exception("DB worker callback failed")
+            ran += 1
+
+    def attach(self, widget, interval_ms: int = 16) -> None:
+        """Poll pump() from the Tk event loop of `widget` every `interval_ms`."""
+        self._widget = widget
+
+        def tick():
+            self.pump()
+            self._after_id = widget.after(interval_ms, tick)
+
+        tick()
+
+    def shutdown(self, wait: bool = False) -> None:
+        if self._widget is not None and self._after_id is not None:
+            try:
+                self._widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        self._jobs.put(_STOP)
+        if wait:
+            self._thread.join()
+
+    # ---- worker thread ------------------------------------------------------
+    def _is_stale(self, key: Optional[str], seq: int) -> bool:
+        if key is None:
+            return False
+        with self._lock:
+            return self._latest.get(key) != seq
+
+    def _run(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is _STOP:
+                return
+            future, fn, args, on_done, on_error, key, seq = job
+            if self._is_stale(key, seq):
+                future.cancel()
+                continue
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except BaseException as exc:
+                future.set_exception(exc)
+            self._results.put((future, on_done, on_error, key, seq))
@@ -0,0 +1,144 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable
+
+log = logging.getLogger("TaskManager.DB.Writer")
+
+_STOP = object()
+
+
+class WriteQueue:
+    """
+    Single writer thread with group commit.
+
+    - submit(fn, *args) -> concurrent.futures.Future with fn's return value;
+      execute()/execute_named() -> Future with the statement's lastrowid
+    - every job queued while the previous group was committing forms the next
+      group, which runs in ONE transaction: one fsync and one write lock for
+      many writers, and never "database is locked" between them
+    - a group closes at `max_batch` jobs, or when nothing else is waiting; with
+      `max_delay` > 0 it first waits up to that long for more jobs, but only once
+      it holds more than one (writers are concurrent), so a lone write commits
+      at once. Worth it only when commits are expensive (synchronous=FULL,
+      network drives): the producers of a group are blocked on their futures,
+      so with cheap WAL commits the wait is mostly dead time
+    - each job of a multi-job group runs in its own savepoint: a job that raises
+      fails only its own future; the rest of the group still commits
+    - futures resolve after the commit, so a result is never reported for a
+      write that could still be lost; if the commit itself fails every job of
+      the group gets the error
+    - `fn` does its writes through `db` (DatabaseManager); on the writer thread
+      they join the group's transaction
+    - DatabaseManager.start_write_queue() routes the manager's own writes here
+    """
+
+    def __init__(self, db, name: str = "db-writer", max_batch: int = 256, max_delay: float = 0.0):
+        self.db = db
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.commits = 0
+        self.jobs = 0
+        self.largest_group = 0
+        self._jobs: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        future: Future = Future()
+        self._jobs.put((future, fn, args, kwargs))
+        return future
+
+    def execute(self, sql: str, params=()) -> Future:
+        return self.submit(self.db.execute, sql, params)
+
+    def execute_named(self, name: str, params=()) -> Future:
+        return self.submit(self.db.execute_named, name, params)
+
+    def executemany_named(self, name: str, seq_of_params) -> Future:
+        """Future with the rowcount."""
+        return self.submit(self.db.executemany_named, name, seq_of_params)
+
+    def close(self, wait: bool = True) -> None:
+        """Stop after the jobs already queued have been committed."""
+        self._jobs.put(_STOP)
+        if wait:
+            self._thread.join()
+
+    # ---- writer thread -------------------------------------------------------
+    def _next_group(self) -> tuple[list, bool]:
+        """Block for one job, then take what is waiting, up to max_batch / max_delay."""
+        group = []
+        job = self._jobs.get()
+        deadline = time.monotonic() + self.max_delay
+        while job is not _STOP:
+            group.append(job)
+            if len(group) >= self.max_batch:
+                return group, False
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                wait = deadline - time.monotonic()
+                if len(group) < 2 or wait <= 0:
+                    return group, False
+                try:
+                    job = self._jobs.get(timeout=wait)
+                except queue.Empty:
+                    return group, False
+        return group, True
+
+    def _run(self) -> None:
+        while True:
+            group, stop = self._next_group()
+            if group:
+                self._commit_group(group)
+            if stop:
+                return
+
+    def _commit_group(self, group: list) -> None:
+        if len(group) == 1:
+            self._commit_one(*group[0])
+            return
+        done = []
+        try:
+            with self.db.transaction():
+                for future, fn, args, kwargs in group:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with self.db.savepoint("job"):
+                            done.append((future, fn(*args, **kwargs), None))
+                    except Exception as exc:
+                        done.append((future, None, exc))
+        except Exception as exc:
+            log.exception("Group commit of %d writes failed", len(group))
+            for future, _fn, _args, _kwargs in group:
+                if future.running() or future.set_running_or_notify_cancel():
+                    future.set_exception(exc)
+            return
+        self._count(len(done))
+        for future, result, error in done:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def _commit_one(self, future: Future, fn, args, kwargs) -> None:
+        """A group of one needs no savepoint: its transaction is its own."""
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            with self.db.transaction():
+                result = fn(*args, **kwargs)
+        except Exception as exc:
+            future.set_exception(exc)
+            return
+        self._count(1)
+        future.set_result(result)
+
+    def _count(self, jobs: int) -> None:
+        self.commits += 1
+        self.jobs += jobs
+        self.largest_group = max(self.largest_group, jobs)
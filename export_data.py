@@ -0,0 +1,52 @@
+"""
+Export a user's courses and tasks to CSV, JSON-lines or iCalendar (see service/exporter.py).
+
+    python export_data.py tasks.csv --email you@example.com
+    python export_data.py agenda.ics --email you@example.com --events
+"""
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+from db.manager import DatabaseManager
+from db.models import User
+from service.exporter import export_file
+
+BASE = Path(__file__).resolve().parent
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("file", help=".csv, .jsonl, .ndjson or .ics file to write")
+    ap.add_argument("--email", required=True, help="user whose data is exported")
+    ap.add_argument("--db", default=str(BASE / "task_manager.db"), help="sqlite file (default: %(default)s)")
+    ap.add_argument("--events", action="store_true", help=".ics: write VEVENTs instead of VTODOs")
+    args = ap.parse_args(argv)
+    logging.getLogger("TaskManager.DB").setLevel(logging.WARNING)
+
+    if not Path(args.db).exists():
+        print(f"No database at {args.db}", file=sys.stderr)
+        return 1
+    db = DatabaseManager(args.db, profile="readonly")
+    try:
+        users = db.fetch_models(User, "user.by_email", (args.email,))
+        if not users:
+            print(f"No user with email {args.email!r}", file=sys.stderr)
+            return 1
+        start = time.perf_counter()
+        try:
+            n = export_file(db, users[0].id, args.file, component="VEVENT" if args.events else "VTODO")
+        except (OSError, ValueError) as exc:
+            print(f"Export failed: {exc}", file=sys.stderr)
+            return 1
+        elapsed = time.perf_counter() - start
+        print(f"{n} rows written to {args.file} in {elapsed:.1f}s ({n / elapsed if elapsed else 0:,.0f} rows/s)")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
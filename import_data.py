@@ -0,0 +1,58 @@
+"""
+Import courses and tasks from a CSV, JSON-lines or JSON file (see service/importer.py).
+
+    python import_data.py tasks.csv --email you@example.com
+    python import_data.py tasks.jsonl --email you@example.com --db other.db --batch-size 20000
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from db.manager import DatabaseManager
+from db.models import User
+from service.importer import import_file
+
+BASE = Path(__file__).resolve().parent
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("file", help=".csv, .jsonl, .ndjson or .json (array of objects) file")
+    ap.add_argument("--email", required=True, help="user that receives the courses/tasks")
+    ap.add_argument("--db", default=str(BASE / "task_manager.db"), help="sqlite file (default: %(default)s)")
+    ap.add_argument("--batch-size", type=int, default=5000, help="rows per transaction")
+    ap.add_argument("--profile", default="bulk", help="DB connection profile (default: %(default)s)")
+    args = ap.parse_args(argv)
+    logging.getLogger("TaskManager.DB").setLevel(logging.WARNING)
+
+    db = DatabaseManager(args.db, profile=args.profile)
+    try:
+        db.migrate(str(BASE / "db" / "schema.sql"))
+        users = db.fetch_models(User, "user.by_email", (args.email,))
+        if not users:
+            print(f"No user with email {args.email!r}", file=sys.stderr)
+            return 1
+
+        def progress(report):
+            print(f"\r{report.rows:>12,} rows  {report.rows_per_second:>10,.0f} rows/s",
+                  end="", file=sys.stderr, flush=True)
+
+        try:
+            report = import_file(db, users[0].id, args.file, batch_size=args.batch_size, on_progress=progress)
+        except (OSError, ValueError) as exc:
+            print(f"Import failed: {exc}", file=sys.stderr)
+            return 1
+        print(file=sys.stderr)
+        print(report.summary())
+        for line, reason in report.rejects:
+            print(f"  line {line}: {reason}")
+        if report.rejected > len(report.rejects):
+            print(f"  ... and {report.rejected - len(report.rejects)} more")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Serve the task manager database as a local HTTP/JSON API (see service/server.py).
+
+    python serve.py                          # http://127.0.0.1:8765
+    TASK_MANAGER_SECRET=... python serve.py --host 0.0.0.0 --port 9000 --readers 8 --db shared.db
+
+Users are identified by email only: anything but a loopback address needs a
+shared secret (--secret or $TASK_MANAGER_SECRET), which clients send to POST /login.
+    python serve.py --keep-changes 7         # compact the change feed to a week (daily)
+"""
+import argparse
+import logging
+import os
+import sys
+import threading
+from datetime import timedelta
+from pathlib import Path
+
+from db.manager import DatabaseManager
+from service.server import DEFAULT_PORT, TaskServer
+
+BASE = Path(__file__).resolve().parent
+COMPACT_EVERY = 24 * 3600  # seconds
+
+
+def compact_changes(server: TaskServer, keep: timedelta, stop: threading.Event) -> None:
+    """Trim the change feed now and then once per COMPACT_EVERY until `stop` is set."""
+    log = logging.getLogger("TaskManager.Server")
+    while True:
+        try:
+            removed = server.feed.compact(keep)
+            if removed:
+                log.info("Compacted %s change-log entries", removed)
+        except Exception:
+            log.exception("Change-log compaction failed")
+        if stop.wait(COMPACT_EVERY):
+            return
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--db", default=str(BASE / "task_manager.db"), help="sqlite file (default: %(default)s)")
+    ap.add_argument("--host", default="127.0.0.1", help="interface to listen on (default: %(default)s)")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--readers", type=int, default=4, help="pooled read connections (default: %(default)s)")
+    ap.add_argument("--secret", default=os.environ.get("TASK_MANAGER_SECRET"),
+                    help="shared secret POST /login must send (default: $TASK_MANAGER_SECRET)")
+    ap.add_argument("--keep-changes", type=float, default=30, metavar="DAYS",
+                    help="days of change feed (GET /feed) to keep (default: %(default)s)")
+    args = ap.parse_args(argv)
+    logging.getLogger("TaskManager.DB").setLevel(logging.WARNING)
+
+    # +1: the writer thread holds a pooled connection while it commits
+    db = DatabaseManager(args.db, pool_size=args.readers + 1)
+    try:
+        db.migrate(str(BASE / "db" / "schema.sql"))
+        try:
+            server = TaskServer(db, (args.host, args.port), secret=args.secret)
+        except ValueError as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 2
+        stop = threading.Event()
+        threading.Thread(target=compact_changes, args=(server, timedelta(days=args.keep_changes), stop),
+                         name="change-log-compaction", daemon=True).start()
+        print(f"Serving {args.db} on {server.url} (Ctrl+C to stop)", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stop.set()
+            server.server_close()
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,10 @@
+import json
 import sqlite3
-from typing import Callable, Optional
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional
+
+from db.models import User
+from service.cache import LRUCache
 
 # Status strings the caller can use to decide what to show in UI.
 # - "created": new user inserted
@@ -9,45 +14,124 @@ from typing import Callable, Optional
 # - "db_error": database error (no DB writes)
 
 
+def _valid(name: str, email: str) -> bool:
+    return bool(name) and bool(email) and "@" in email and not email.startswith("@") and not email.endswith("@")
+
+
+@dataclass
+class ProvisionResult:
+    created: list[User] = field(default_factory=list)
+    existing: list[User] = field(default_factory=list)
+    invalid: list[tuple[str, str]] = field(default_factory=list)  # (name, email) as given
+
+
+class AuthService:
+    """
+    Login/registration by email, fronted by an LRU email -> User cache.
+
+    - a cached email logs in without touching the DB; a miss costs one indexed
+      SELECT, and registering a new email one INSERT ... ON CONFLICT DO NOTHING
+      RETURNING (no row back = someone registered it first -> read it instead)
+    - emails are UNIQUE and never change, so a cached user only goes stale if its
+      row is deleted; inserts and forget() replace/drop the entry
+    - bulk_provision() registers a whole class in one transaction
+    - writes go through db.write(): the DB's write queue if it has one
+    - `db` is a DatabaseManager; the cache is thread-safe (service.cache.LRUCache)
+    """
+
+    def __init__(self, db, cache_bytes: int = 256 * 1024):
+        self.db = db
+        self.cache = LRUCache(max_bytes=cache_bytes)
+
+    def user_by_email(self, email: str) -> Optional[User]:
+        user = self.cache.get(email)
+        if user is None:
+            rows = self.db.fetch_models(User, "user.by_email", (email,))
+            user = rows[0] if rows else None
+            if user is not None:
+                self.cache.put(email, user)
+        return user
+
+    def forget(self, email: str) -> None:
+        self.cache.discard(email)
+
+    def login(
+        self,
+        name: str,
+        email: str,
+        # (entered_name, saved_name) -> bool
+        confirm_on_mismatch: Callable[[str, str], bool],
+    ) -> tuple[str, Optional[User]]:
+        name = (name or "").strip()
+        email = (email or "").strip()
+        if not _valid(name, email):
+            return "invalid_input", None
+
+        try:
+            user = self.user_by_email(email)
+            status = "logged_in"
+            if user is None:
+                created, user = self._register(name, email)
+                status = "created" if created else "logged_in"
+        except sqlite3.Error:
+            return "db_error", None
+
+        saved_name = (user.name or "").strip()
+        # Ask the caller (UI or test) whether to proceed as saved_name
+        if status == "logged_in" and name != saved_name and not confirm_on_mismatch(name, saved_name):
+            return "mismatch_declined", None
+        return status, user
+
+    def _register(self, name: str, email: str) -> tuple[bool, User]:
+        """(created, user)"""
+        rows = self.db.write(self.db.fetch_models, User, "user.insert_returning", (name, email))
+        created = bool(rows)
+        if not created:
+            # Race: someone inserted it concurrently. Treat as existing.
+            rows = self.db.fetch_models(User, "user.by_email", (email,))
+        self.cache.put(email, rows[0])
+        return created, rows[0]
+
+    def bulk_provision(self, users: Iterable[tuple[str, str]]) -> ProvisionResult:
+        """
+        Register every (name, email) whose email is new, in one transaction.
+        Existing emails are left untouched and reported; invalid pairs are skipped.
+        Three statements in total, whatever the number of users.
+        """
+        result = ProvisionResult()
+        wanted: dict[str, str] = {}
+        for name, email in users:
+            n, e = (name or "").strip(), (email or "").strip()
+            if _valid(n, e):
+                wanted.setdefault(e, n)
+            else:
+                result.invalid.append((name, email))
+        if not wanted:
+            return result
+
+        existing, created = self.db.write(self._provision, wanted)
+        for user in existing + created:
+            self.cache.put(user.email, user)
+        order = {e: i for i, e in enumerate(wanted)}
+        result.existing = sorted(existing, key=lambda u: order[u.email])
+        result.created = sorted(created, key=lambda u: order[u.email])
+        return result
+
+    def _provision(self, wanted: dict[str, str]) -> tuple[list[User], list[User]]:
+        existing = self.db.fetch_models(User, "user.by_emails", (json.dumps(list(wanted)),))
+        known = {u.email for u in existing}
+        missing = [(n, e) for e, n in wanted.items() if e not in known]
+        self.db.executemany_named("user.insert_missing", missing)
+        created = self.db.fetch_models(User, "user.by_emails", (json.dumps([e for _, e in missing]),))
+        return existing, created
+
+
 def authenticate(
     db,                      # DatabaseManager instance
     name: str,
     email: str,
     # (entered_name, saved_name) -> bool
     confirm_on_mismatch: Callable[[str, str], bool],
-) -> tuple[str, Optional[sqlite3.Row]]:
-    name = (name or "").strip()
-    email = (email or "").strip()
-
-    if not name or not email or "@" not in email or email.startswith("@") or email.endswith("@"):
-        return "invalid_input", None
-
-    rows = db.fetchall(
-        "SELECT id, name, email FROM USER WHERE email=? LIMIT 1", (email,))
-    user = rows[0] if rows else None
-
-    # Existing email
-    if user:
-        saved_name = (user["name"] or "").strip()
-        if name != saved_name:
-            # Ask the caller (UI or test) whether to proceed as saved_name
-            if not confirm_on_mismatch(name, saved_name):
-                return "mismatch_declined", None
-            # proceed as the saved user
-            return "logged_in", user
-        # names match
-        return "logged_in", user
-
-    # New email -> create user
-    try:
-        db.execute("INSERT INTO USER (name, email) VALUES (?, ?)", (name, email))
-        rows = db.fetchall(
-            "SELECT id, name, email FROM USER WHERE email=? LIMIT 1", (email,))
-        return "created", rows[0] if rows else None
-    except sqlite3.IntegrityError:
-        # Race: someone inserted concurrently. Treat as existing and log in.
-        rows = db.fetchall(
-            "SELECT id, name, email FROM USER WHERE email=? LIMIT 1", (email,))
-        return "logged_in", rows[0] if rows else None
-    except Exception:
-        return "db_error", None
+) -> tuple[str, Optional[User]]:
+    """One-off login without a shared cache; long-lived callers keep an AuthService."""
+    return AuthService(db).login(name, email, confirm_on_mismatch)
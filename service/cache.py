@@ -0,0 +1,82 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+def approx_size(value) -> int:
+    """Shallow byte estimate of a cached row: the object plus its field values."""
+    if isinstance(value, dict):
+        fields = value.values()
+    else:
+        fields = (getattr(value, f) for f in getattr(value, "__slots__", ()))
+    return sys.getsizeof(value) + sum(sys.getsizeof(v) for v in fields)
+
+
+class LRUCache:
+    """
+    Thread-safe LRU map with a memory cap.
+
+    - entries are evicted least-recently-used first once the estimated size
+      of all values exceeds `max_bytes`
+    - `sizeof` estimates one value's footprint (default: approx_size)
+    - hits/misses are counted for tuning the cap
+    """
+
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024,
+                 sizeof: Callable[[Any], int] = approx_size):
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._data: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = self._sizeof(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._data) > 1:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self._bytes -= evicted
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+    def discard_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Drop every entry for which predicate(key, value) is true; returns the count."""
+        with self._lock:
+            doomed = [k for k, (v, _) in self._data.items() if predicate(k, v)]
+            for k in doomed:
+                self._bytes -= self._data.pop(k)[1]
+            return len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._data)
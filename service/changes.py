@@ -0,0 +1,90 @@
+"""
+Change feed: what was added, edited or deleted since a cursor (CHANGE_LOG, db/schema.sql).
+
+Other windows, exporters or a sync service poll it instead of re-reading
+whole tables:
+
+    feed = ChangeFeed(db)
+    cursor = feed.latest()          # before the initial full load
+    ...
+    batch = feed.since(cursor, user_id)
+    if batch.reset:                 # the cursor fell behind compaction
+        reload everything
+    else:
+        apply batch.changes         # refetch inserted/updated rows, drop deleted ones
+    cursor = batch.cursor
+
+- entries are written by triggers in the same transaction as the change, so
+  the feed never shows a write that was rolled back and never misses one
+- a 'course' delete stands for its tasks too (they go by ON DELETE CASCADE)
+- a poll is one range scan of the primary key (all users) or of
+  idx_change_log_user (one user); an idle poll touches no table rows
+"""
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from db.models import Change
+
+# entries kept by compact() when no age is given
+DEFAULT_MAX_AGE = timedelta(days=30)
+
+
+@dataclass(slots=True)
+class ChangeBatch:
+    """Changes after a cursor; pass `cursor` to the next since() call."""
+    cursor: int
+    changes: list[Change] = field(default_factory=list)
+    more: bool = False   # the limit was hit: ask again right away
+    reset: bool = False  # entries after the old cursor were compacted: reload in full
+
+
+class ChangeFeed:
+    """Reads and compacts CHANGE_LOG. `db` is a DatabaseManager; safe to use from worker threads."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def latest(self) -> int:
+        """Cursor for "from now on": take it before a full load, then poll from it."""
+        return self.db.fetch_named("change_log.latest")[0][0]
+
+    def since(self, cursor: int, user_id: Optional[int] = None, limit: int = 500) -> ChangeBatch:
+        """Changes after `cursor`, oldest first; all users' unless `user_id` is given."""
+        latest = self.latest()
+        if cursor < self._floor(latest):
+            return ChangeBatch(latest, reset=True)
+        if user_id is None:
+            changes = self.db.fetch_models(Change, "change_log.after", (cursor, limit))
+        else:
+            changes = self.db.fetch_models(Change, "change_log.after_by_user", (user_id, cursor, limit))
+        if len(changes) == limit:
+            return ChangeBatch(changes[-1].seq, changes, more=True)
+        # nothing else up to `latest` concerns this reader: skip past the other users' entries
+        return ChangeBatch(max(latest, changes[-1].seq if changes else cursor), changes)
+
+    def compact(self, max_age: timedelta = DEFAULT_MAX_AGE, batch_size: int = 10_000,
+                now: Optional[datetime] = None, stop: Optional[threading.Event] = None) -> int:
+        """
+        Drop entries older than `max_age`, oldest first, `batch_size` per
+        transaction (writers are never held up for long); returns how many.
+        Readers whose cursor is older than what is left get `reset`.
+        Once `stop` is set it returns after the current batch; the rest waits for the next run.
+        """
+        now = now or datetime.now(timezone.utc)
+        cutoff = (now - max_age).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        removed = 0
+        while True:
+            n = self.db.write(self._trim, batch_size, cutoff)
+            removed += n
+            if n < batch_size or (stop is not None and stop.is_set()):
+                return removed
+
+    def _floor(self, latest: int) -> int:
+        """Every entry after this seq is still in the log."""
+        oldest = self.db.fetch_named("change_log.oldest")[0][0]
+        return latest if oldest is None else oldest - 1
+
+    def _trim(self, batch_size: int, cutoff: str) -> int:
+        return len(self.db.fetch_named("change_log.trim", (batch_size, cutoff)))
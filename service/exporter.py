@@ -0,0 +1,110 @@
+"""
+Streaming export of a user's courses and tasks to CSV, JSON-lines or iCalendar.
+
+- rows go straight from a DB cursor (DatabaseManager.iterate_named, fetchmany
+  batches) to the output file; nothing is collected into a list
+- CSV and JSON-lines use the columns service/importer.py reads back:
+  type, course, name, description, due_date (courses first, then tasks)
+- .ics writes one VTODO (or VEVENT) per task with a due date
+"""
+import csv
+import json
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional, TextIO
+
+FIELDS = ("type", "course", "name", "description", "due_date")
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".ics": "ics"}
+
+
+def detect_format(path) -> str:
+    try:
+        return FORMATS[Path(path).suffix.lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported export file {str(path)!r}; use .csv, .jsonl or .ics") from None
+
+
+def iter_rows(db, user_id: int, batch_size: int = 1000):
+    """Yield (type, course, name, description, due_date) tuples: every course, then every task."""
+    for row in db.iterate_named("export.courses_by_user", (user_id,), batch_size):
+        yield tuple(row)
+    for row in db.iterate_named("export.tasks_by_user", (user_id,), batch_size):
+        yield tuple(row)
+
+
+def write_csv(db, user_id: int, out: TextIO) -> int:
+    """`out` must be opened with newline=""; returns the number of rows written."""
+    writer = csv.writer(out)
+    writer.writerow(FIELDS)
+    n = 0
+    for n, row in enumerate(iter_rows(db, user_id), 1):
+        writer.writerow(row)
+    return n
+
+
+def write_jsonl(db, user_id: int, out: TextIO) -> int:
+    n = 0
+    for n, row in enumerate(iter_rows(db, user_id), 1):
+        out.write(json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False))
+        out.write("\n")
+    return n
+
+
+# ---- iCalendar (RFC 5545) ----------------------------------------------------
+def _ics_text(value: Optional[str]) -> str:
+    return (value or "").replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,") \
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+
+
+def _ics_line(line: str) -> str:
+    """Fold to 75-octet lines (continuations start with a space), CRLF-terminated."""
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line + "\r\n"
+    parts, start, limit = [], 0, 75
+    while start < len(data):
+        end = min(start + limit, len(data))
+        while end < len(data) and (data[end] & 0xC0) == 0x80:  # never split a UTF-8 sequence
+            end -= 1
+        parts.append(data[start:end].decode("utf-8"))
+        start, limit = end, 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def write_ics(db, user_id: int, out: TextIO, component: str = "VTODO", batch_size: int = 1000) -> int:
+    """`out` must be opened with newline=""; returns the number of tasks written."""
+    if component not in ("VTODO", "VEVENT"):
+        raise ValueError("component must be 'VTODO' or 'VEVENT'")
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    out.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//404 Team Not Found//Task Manager//EN\r\n")
+    n = 0
+    for task_id, course, name, description, due_date in db.iterate_named(
+            "export.dated_tasks_by_user", (user_id,), batch_size):
+        day = date.fromisoformat(due_date)
+        lines = [f"BEGIN:{component}", f"UID:task-{task_id}@task-manager", f"DTSTAMP:{stamp}",
+                 f"SUMMARY:{_ics_text(name)}", f"CATEGORIES:{_ics_text(course)}"]
+        if description:
+            lines.append(f"DESCRIPTION:{_ics_text(description)}")
+        if component == "VTODO":
+            lines.append(f"DUE;VALUE=DATE:{day:%Y%m%d}")
+        else:
+            lines += [f"DTSTART;VALUE=DATE:{day:%Y%m%d}", f"DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}"]
+        lines.append(f"END:{component}")
+        out.write("".join(_ics_line(line) for line in lines))
+        n += 1
+    out.write("END:VCALENDAR\r\n")
+    return n
+
+
+def export_file(db, user_id: int, path, fmt: Optional[str] = None, component: str = "VTODO") -> int:
+    """Write the user's data to `path` in `fmt` (from the extension by default); returns rows written."""
+    fmt = fmt or detect_format(path)
+    if fmt not in ("csv", "jsonl", "ics"):
+        raise ValueError(f"Unknown export format {fmt!r}")
+    with open(path, "w", encoding="utf-8", newline="") as out:
+        if fmt == "csv":
+            return write_csv(db, user_id, out)
+        if fmt == "jsonl":
+            return write_jsonl(db, user_id, out)
+        return write_ics(db, user_id, out, component)
@@ -0,0 +1,249 @@
+"""
+Bulk import of courses and tasks from CSV, JSON-lines or JSON (array of objects) files.
+
+Columns / keys (header names are case-insensitive):
+    type         "course" or "task"; optional, see below
+    course       name of the task's course (tasks only)
+    name         course or task name (required)
+    description  optional
+    due_date     tasks only, optional; any form db.dates.normalize_due_date accepts
+
+Without a `type`, a row with a `course` value is a task and any other row a course.
+Tasks of a course that does not exist yet create it.
+
+The file is parsed as a stream and written in one transaction per `batch_size`
+rows, so memory stays flat whatever the file size. Each batch is a db.write()
+unit of work: with a write queue running (the app) it is committed by the
+writer thread instead of racing it for the write lock. Within a batch the search
+index is filled by one set-based statement instead of the per-row trigger.
+Course names are resolved through an in-memory name -> id map loaded once per
+import. Invalid rows are skipped and counted; the first MAX_REJECTS are kept
+with their reason.
+"""
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from db.dates import normalize_due_date
+
+# rejected rows kept in the report (all of them are counted)
+MAX_REJECTS = 100
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "json"}
+# .json files are read this many characters at a time
+JSON_CHUNK = 1 << 16
+
+
+@dataclass
+class ImportReport:
+    courses: int = 0
+    tasks: int = 0
+    rejected: int = 0
+    rejects: list[tuple[int, str]] = field(default_factory=list)  # (line, reason)
+    seconds: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        return self.courses + self.tasks + self.rejected
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.courses} courses, {self.tasks} tasks imported, {self.rejected} rejected "
+                f"in {self.seconds:.1f}s ({self.rows_per_second:,.0f} rows/s)")
+
+    def _reject(self, line: int, reason: str) -> None:
+        self.rejected += 1
+        if len(self.rejects) < MAX_REJECTS:
+            self.rejects.append((line, reason))
+
+
+def detect_format(path) -> str:
+    try:
+        return FORMATS[Path(path).suffix.lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported import file {str(path)!r}; use .csv, .jsonl or .json") from None
+
+
+def read_rows(path, fmt: Optional[str] = None) -> Iterator[tuple[int, dict]]:
+    """Yield (line number, row dict with lower-case keys), one row at a time."""
+    fmt = fmt or detect_format(path)
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if fmt == "csv":
+            reader = csv.reader(f)
+            keys = [k.strip().lower() for k in next(reader, [])]
+            for row in reader:
+                if row:
+                    yield reader.line_num, dict(zip(keys, row))
+        elif fmt == "jsonl":
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield line_no, {"__error__": f"invalid JSON: {exc.msg}"}
+                    continue
+                yield line_no, _object_row(row)
+        elif fmt == "json":
+            yield from _json_array_rows(f, JSON_CHUNK)
+        else:
+            raise ValueError(f"Unknown import format {fmt!r}")
+
+
+def _object_row(value) -> dict:
+    if not isinstance(value, dict):
+        return {"__error__": "expected a JSON object"}
+    return {str(k).lower(): v for k, v in value.items()}
+
+
+def _json_array_rows(f, chunk_size: int) -> Iterator[tuple[int, dict]]:
+    """
+    Like the jsonl branch of read_rows() for a file holding one JSON array,
+    decoded element by element from `chunk_size` reads (the line number is where
+    the element starts). A syntax error is reported once and ends the file.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, line_no = "", 0, 1
+
+    def more() -> bool:
+        nonlocal buf, pos
+        chunk = f.read(chunk_size)
+        buf, pos = buf[pos:] + chunk, 0
+        return bool(chunk)
+
+    def peek() -> str:
+        """Next non-blank character, "" at the end of the file."""
+        nonlocal pos, line_no
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                line_no += buf[pos] == "\n"
+                pos += 1
+            if pos < len(buf) or not more():
+                return buf[pos:pos + 1]
+
+    if peek() != "[":
+        yield line_no, {"__error__": "expected a JSON array"}
+        return
+    pos += 1
+    if peek() == "]":
+        return
+    while True:
+        peek()
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError as exc:
+            if more():  # the element runs past what has been read so far
+                continue
+            yield line_no, {"__error__": f"invalid JSON: {exc.msg}"}
+            return
+        if end == len(buf) and more():  # a number may go on in the next chunk
+            continue
+        start = line_no
+        line_no += buf.count("\n", pos, end)
+        pos = end
+        yield start, _object_row(value)
+        sep = peek()
+        if sep == ",":
+            pos += 1
+        elif sep == "]":
+            return
+        else:
+            yield line_no, {"__error__": "invalid JSON: Expecting ',' delimiter"}
+            return
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    return (value if isinstance(value, str) else str(value)).strip()
+
+
+def import_file(
+    db,                      # DatabaseManager instance
+    user_id: int,
+    path,
+    fmt: Optional[str] = None,
+    batch_size: int = 5000,
+    on_progress: Optional[Callable[[ImportReport], None]] = None,
+) -> ImportReport:
+    """
+    Import `path` into the courses of `user_id` and return the report.
+    on_progress(report) is called after every committed batch.
+    """
+    report = ImportReport()
+    start = time.perf_counter()
+    # newest first in course.list_by_user: setdefault keeps the newest of duplicate names
+    course_ids: dict[str, int] = {}
+    for row in db.fetch_named("course.list_by_user", (user_id,)):
+        course_ids.setdefault(row["name"], row["id"])
+
+    def course_id_for(name: str, description: str = "") -> int:
+        cid = course_ids.get(name)
+        if cid is None:
+            cid = db.execute_named("course.insert", (user_id, name, description))
+            course_ids[name] = cid
+            report.courses += 1
+        return cid
+
+    def write_batch(chunk: list) -> int:
+        """One unit of work (see DatabaseManager.write): the batch's courses and tasks."""
+        tasks = []
+        # the per-row FTS and change-log triggers are replaced by one INSERT ... SELECT
+        # per batch, and the version trigger by stamping each row with its own
+        # offset past REVISION
+        with db.suspended_triggers("search_task_ai", "task_version_ai", "change_task_ai"):
+            last_id = db.fetch_named("task.max_id")[0][0]
+            for line, row in chunk:
+                if "__error__" in row:
+                    report._reject(line, row["__error__"])
+                    continue
+                course = _text(row.get("course"))
+                kind = _text(row.get("type")).lower() or ("task" if course else "course")
+                name = _text(row.get("name"))
+                description = _text(row.get("description"))
+                if kind not in ("course", "task"):
+                    report._reject(line, f"unknown type {kind!r}")
+                elif not name:
+                    report._reject(line, "name is required")
+                elif kind == "course":
+                    if name in course_ids:
+                        report._reject(line, f"course {name!r} already exists")
+                    else:
+                        course_id_for(name, description)
+                elif not course:
+                    report._reject(line, "task without a course")
+                else:
+                    try:
+                        due = normalize_due_date(row.get("due_date"))
+                    except ValueError as exc:
+                        report._reject(line, str(exc))
+                        continue
+                    tasks.append((course_id_for(course), name, description, due, len(tasks) + 1))
+            if tasks:
+                db.executemany_named("task.insert_stamped", tasks)
+                db.execute_named("revision.advance", (len(tasks),))
+                db.execute_named("search.index_tasks_after", (last_id,))
+                db.execute_named("change_log.tasks_inserted_after", (last_id,))
+        return len(tasks)
+
+    rows = read_rows(path, fmt)
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            break
+        # on the DB's write queue when it has one (the app's), so an import never
+        # competes with the writer thread for the write lock
+        report.tasks += db.write(write_batch, chunk)
+        report.seconds = time.perf_counter() - start
+        if on_progress:
+            on_progress(report)
+
+    report.seconds = time.perf_counter() - start
+    return report
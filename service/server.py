@@ -0,0 +1,449 @@
+"""
+Local HTTP/JSON API over the task manager database, for several users at once.
+
+One process owns the SQLite file; clients (other lab machines, scripts, tests)
+talk JSON to it instead of each opening the database and fighting over locks.
+
+- reads run on the request threads, each on a pooled connection (WAL: readers
+  never wait for the writer)
+- each request gets its own TaskService: its row cache lives for one request,
+  so writes by the GUI, the CLI or another process are never hidden by rows
+  cached for an earlier request
+- every write goes through the DB's write queue (db.writer.WriteQueue, one
+  thread), which commits the writes of concurrent requests together
+- POST /login returns a bearer token; other endpoints need
+  "Authorization: Bearer <token>" and only see the caller's own rows. Users
+  are identified by email only, so a server started with a shared `secret`
+  issues tokens only to clients that send it; without one it must listen on
+  a loopback address. Tokens expire after TOKEN_TTL.
+- rows carry a `version`; a PUT that sends the version it read is refused with
+  409 {error, current} if the row was changed since (without one, last write wins)
+- GET /changes?since=<revision> returns what was added or edited after that
+  revision, so a client can sync deltas instead of reloading every list;
+  GET /feed?after=<seq> is the caller's change log, deletions included
+
+Endpoints (JSON bodies and responses):
+    POST   /login                   {name, email, secret?, confirm_mismatch?} -> {status, user, token}
+    POST   /logout
+    GET    /me
+    GET    /courses                 ?before=<id>&limit=<n>  (keyset pages, newest first)
+    POST   /courses                 {name, description?}
+    GET    /courses/<id>
+    PUT    /courses/<id>            {name?, description?, version?}
+    DELETE /courses/<id>
+    GET    /courses/<id>/tasks      ?before=<id>&limit=<n>
+    POST   /courses/<id>/tasks      {name, description?, due_date?}
+    GET    /tasks/<id>
+    PUT    /tasks/<id>              {name?, description?, due_date?, version?}
+    DELETE /tasks/<id>
+    GET    /search                  ?q=<text>&limit=<n>
+    GET    /changes                 ?since=<revision>&limit=<n> -> {revision, courses, tasks, more}
+    GET    /feed                    ?after=<seq>&limit=<n> -> {cursor, changes, more, reset}
+"""
+import hmac
+import ipaddress
+import json
+import logging
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+from db.pool import PoolTimeoutError
+from db.queries import MAX_ID
+from service.auth import AuthService
+from service.changes import ChangeFeed
+from service.tasks import ConflictError, TaskService
+
+log = logging.getLogger("TaskManager.Server")
+
+DEFAULT_PORT = 8765
+# rows per page when the client does not ask for a limit, and the most it may ask for
+PAGE_SIZE = 200
+MAX_PAGE = 1000
+MAX_BODY = 1024 * 1024
+# how long a request waits for its write to be committed
+WRITE_TIMEOUT = 30.0
+# seconds a login token stays valid
+TOKEN_TTL = 8 * 3600
+
+
+class HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class TaskServer(ThreadingHTTPServer):
+    """
+    HTTP server + shared services. `db` must be a DatabaseManager in pool mode
+    with one connection more than the expected concurrent readers (the writer
+    holds one while it commits). `secret`: what POST /login must send; required
+    unless the server listens on a loopback address only.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, db, address: tuple[str, int] = ("127.0.0.1", DEFAULT_PORT),
+                 secret: Optional[str] = None, token_ttl: float = TOKEN_TTL, clock=time.monotonic):
+        if db.pool is None:
+            raise ValueError("TaskServer needs a DatabaseManager with pool_size > 0")
+        if not secret and not _is_loopback(address[0]):
+            raise ValueError(f"Listening on {address[0]!r} needs a shared secret: "
+                             "without one anybody who can reach the port can log in as any email")
+        super().__init__(address, _Handler)
+        self.db = db
+        self.secret = secret
+        self.token_ttl = token_ttl
+        self.clock = clock
+        self.auth = AuthService(db)
+        self.feed = ChangeFeed(db)
+        self.writes = db.start_write_queue(name="server-writer")
+        self._tokens: dict[str, tuple[int, float]] = {}  # token -> (user id, expiry)
+        self._tokens_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def close(self) -> None:
+        """Stop serving (db.close() then lets the writer commit what is queued)."""
+        self.shutdown()
+        self.server_close()
+
+    # ---- sessions -------------------------------------------------------------
+    def check_secret(self, given) -> bool:
+        if not self.secret:
+            return True
+        return isinstance(given, str) and hmac.compare_digest(given.encode(), self.secret.encode())
+
+    def issue_token(self, user_id: int) -> str:
+        token = secrets.token_urlsafe(24)
+        now = self.clock()
+        with self._tokens_lock:
+            # drop expired tokens here, so clients that never log out do not pile up
+            for old in [t for t, (_uid, expires) in self._tokens.items() if expires <= now]:
+                del self._tokens[old]
+            self._tokens[token] = (user_id, now + self.token_ttl)
+        return token
+
+    def user_for(self, token: str) -> Optional[int]:
+        with self._tokens_lock:
+            entry = self._tokens.get(token)
+            if entry is None:
+                return None
+            if entry[1] <= self.clock():
+                del self._tokens[token]
+                return None
+            return entry[0]
+
+    def revoke(self, token: str) -> None:
+        with self._tokens_lock:
+            self._tokens.pop(token, None)
+
+    # ---- writes ---------------------------------------------------------------
+    def write(self, fn, *args):
+        """Run fn(*args) on the writer thread and wait until it is committed."""
+        try:
+            return self.writes.submit(fn, *args).result(timeout=WRITE_TIMEOUT)
+        except sqlite3.Error:
+            # the group may have been rolled back after AuthService cached its rows
+            self.auth.cache.clear()
+            raise
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: TaskServer
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def log_message(self, format, *args):
+        log.debug("%s %s", self.address_string(), format % args)
+
+    # ---- plumbing ---------------------------------------------------------------
+    def _dispatch(self, method: str) -> None:
+        url = urlsplit(self.path)
+        self.query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            body = self._read_body()
+            known_path = False
+            for verb, pattern, handler, needs_user in ROUTES:
+                m = pattern.fullmatch(url.path)
+                known_path = known_path or m is not None
+                if m and verb == method:
+                    self.user_id = self._authorize() if needs_user else None
+                    self.tasks = TaskService(self.server.db)
+                    status, payload = handler(self, body, *(int(g) for g in m.groups()))
+                    break
+            else:
+                if known_path:
+                    raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed on {url.path}")
+                raise HttpError(HTTPStatus.NOT_FOUND, f"No route for {method} {url.path}")
+        except HttpError as exc:
+            status, payload = exc.status, {"error": str(exc)}
+        except ConflictError as exc:
+            current = asdict(exc.current) if exc.current is not None else None
+            status, payload = HTTPStatus.CONFLICT, {"error": str(exc), "current": current}
+        except ValueError as exc:  # e.g. an invalid due date
+            status, payload = HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+        except PoolTimeoutError:
+            status, payload = HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Server busy, try again"}
+        except Exception:
+            log.exception("%s %s failed", method, url.path)
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal error"}
+        self._send(status, payload)
+
+    def _read_body(self) -> dict:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if not 0 <= length <= MAX_BODY:
+            self.close_connection = True  # the unread body would be parsed as the next request
+            raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Body must be JSON") from None
+        if not isinstance(body, dict):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+        return body
+
+    def _send(self, status: HTTPStatus, payload) -> None:
+        data = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _token(self) -> str:
+        scheme, _, token = (self.headers.get("Authorization") or "").partition(" ")
+        return token.strip() if scheme.lower() == "bearer" else ""
+
+    def _authorize(self) -> int:
+        user_id = self.server.user_for(self._token())
+        if user_id is None:
+            raise HttpError(HTTPStatus.UNAUTHORIZED, "Log in first (POST /login); tokens expire")
+        return user_id
+
+    def _int_arg(self, key: str, default: int) -> int:
+        try:
+            return int(self.query.get(key, default))
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"{key} must be an integer") from None
+
+    def _limit(self, default: int = PAGE_SIZE) -> int:
+        """?limit=, capped at MAX_PAGE. Below 1 is refused: SQLite reads LIMIT -1 as "no limit"."""
+        limit = self._int_arg("limit", default)
+        if limit < 1:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "limit must be at least 1")
+        return min(limit, MAX_PAGE)
+
+    def _page_args(self) -> tuple[int, int]:
+        return self._int_arg("before", MAX_ID), self._limit()
+
+    def _own_course(self, course_id: int):
+        course = self.tasks.course(course_id)
+        if course is None or course.user_id != self.user_id:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"No course {course_id}")
+        return course
+
+    def _own_task(self, task_id: int):
+        task = self.tasks.task(task_id)
+        if task is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"No task {task_id}")
+        course = self.tasks.course(task.course_id)
+        if course is None or course.user_id != self.user_id:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"No task {task_id}")
+        return task
+
+    # ---- endpoints --------------------------------------------------------------
+    def login(self, body):
+        if not self.server.check_secret(body.get("secret")):
+            raise HttpError(HTTPStatus.UNAUTHORIZED, "Wrong or missing server secret")
+        email = _text(body, "email") or ""
+        name = _text(body, "name") or ""
+        confirm = bool(body.get("confirm_mismatch"))
+        auth = self.server.auth
+        if auth.user_by_email(email.strip()) is None:
+            status, user = self.server.write(auth.login, name, email, lambda _entered, _saved: confirm)
+        else:  # known email: no write, no writer round-trip
+            status, user = auth.login(name, email, lambda _entered, _saved: confirm)
+        if status == "invalid_input":
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Name and email are required, and email must contain '@'")
+        if status == "mismatch_declined":
+            raise HttpError(HTTPStatus.CONFLICT, "This email is registered under another name; "
+                                                 "send confirm_mismatch=true to log in as that user")
+        if status == "db_error":
+            raise HttpError(HTTPStatus.INTERNAL_SERVER_ERROR, "Database error")
+        token = self.server.issue_token(user.id)
+        code = HTTPStatus.CREATED if status == "created" else HTTPStatus.OK
+        return code, {"status": status, "user": asdict(user), "token": token}
+
+    def logout(self, body):
+        self.server.revoke(self._token())
+        return HTTPStatus.OK, {}
+
+    def me(self, body):
+        rows = self.server.db.fetch_named("user.by_id", (self.user_id,))
+        if not rows:  # deleted since the token was issued
+            self.server.revoke(self._token())
+            raise HttpError(HTTPStatus.UNAUTHORIZED, "Unknown user; log in again")
+        return HTTPStatus.OK, {"id": rows[0]["id"], "name": rows[0]["name"], "email": rows[0]["email"]}
+
+    def list_courses(self, body):
+        before, limit = self._page_args()
+        payload = {"courses": [asdict(c) for c in self.tasks.course_page(self.user_id, before, 0, limit)]}
+        if "before" not in self.query:
+            payload["total"] = self.server.db.fetch_named("course.count_by_user", (self.user_id,))[0][0]
+        return HTTPStatus.OK, payload
+
+    def add_course(self, body):
+        name = _required(body, "name")
+        course = self.server.write(self.tasks.add_course, self.user_id, name, _text(body, "description") or "")
+        return HTTPStatus.CREATED, asdict(course)
+
+    def get_course(self, body, course_id):
+        return HTTPStatus.OK, asdict(self._own_course(course_id))
+
+    def update_course(self, body, course_id):
+        old = self._own_course(course_id)
+        course = self.server.write(
+            self.tasks.update_course, course_id,
+            _pick(body, "name", old.name), _pick(body, "description", old.description), _version(body))
+        return HTTPStatus.OK, asdict(course)
+
+    def delete_course(self, body, course_id):
+        self._own_course(course_id)
+        self.server.write(self.tasks.delete_course, course_id)
+        return HTTPStatus.OK, {}
+
+    def list_tasks(self, body, course_id):
+        self._own_course(course_id)
+        before, limit = self._page_args()
+        payload = {"tasks": [asdict(t) for t in self.tasks.task_page(course_id, before, 0, limit)]}
+        if "before" not in self.query:
+            payload["total"] = self.server.db.fetch_named("task.count_by_course", (course_id,))[0][0]
+        return HTTPStatus.OK, payload
+
+    def add_task(self, body, course_id):
+        self._own_course(course_id)
+        task = self.server.write(
+            self.tasks.add_task, course_id, _required(body, "name"),
+            _text(body, "description") or "", _text(body, "due_date"))
+        return HTTPStatus.CREATED, asdict(task)
+
+    def get_task(self, body, task_id):
+        return HTTPStatus.OK, asdict(self._own_task(task_id))
+
+    def update_task(self, body, task_id):
+        old = self._own_task(task_id)
+        task = self.server.write(
+            self.tasks.update_task, task_id, _pick(body, "name", old.name),
+            _pick(body, "description", old.description), _pick(body, "due_date", old.due_date),
+            _version(body))
+        return HTTPStatus.OK, asdict(task)
+
+    def delete_task(self, body, task_id):
+        self._own_task(task_id)
+        self.server.write(self.tasks.delete_task, task_id)
+        return HTTPStatus.OK, {}
+
+    def search(self, body):
+        hits = self.server.db.search(self.user_id, self.query.get("q", ""), limit=self._limit(50))
+        return HTTPStatus.OK, {"hits": [asdict(h) for h in hits]}
+
+    def changes(self, body):
+        delta = self.tasks.changes_since(self.user_id, self._int_arg("since", 0), self._limit())
+        return HTTPStatus.OK, {"revision": delta.revision, "more": delta.more,
+                               "courses": [asdict(c) for c in delta.courses],
+                               "tasks": [asdict(t) for t in delta.tasks]}
+
+    def feed(self, body):
+        after = self._int_arg("after", 0) if "after" in self.query else self.server.feed.latest()
+        batch = self.server.feed.since(after, self.user_id, self._limit())
+        return HTTPStatus.OK, {"cursor": batch.cursor, "more": batch.more, "reset": batch.reset,
+                               "changes": [asdict(c) for c in batch.changes]}
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:  # another host name, or "" (all interfaces)
+        return False
+
+
+def _text(body: dict, key: str) -> Optional[str]:
+    """A string field, or None if absent/null; anything else is the client's error, not SQLite's."""
+    value = body.get(key)
+    if value is not None and not isinstance(value, str):
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"{key} must be a string")
+    return value
+
+
+def _required(body: dict, key: str) -> str:
+    value = (_text(body, key) or "").strip()
+    if not value:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"{key} is required")
+    return value
+
+
+def _pick(body: dict, key: str, old):
+    """PUT keeps fields the client left out; an empty name is rejected."""
+    if key not in body:
+        return old
+    if key == "name":
+        return _required(body, key)
+    return _text(body, key)
+
+
+def _version(body: dict) -> Optional[int]:
+    """The row version the client read, if it sent one."""
+    version = body.get("version")
+    if version is not None and (isinstance(version, bool) or not isinstance(version, int)):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "version must be an integer")
+    return version
+
+
+# (method, path, handler, needs a logged-in user); path groups are integer ids
+ROUTES = [
+    ("POST", re.compile(r"/login"), _Handler.login, False),
+    ("POST", re.compile(r"/logout"), _Handler.logout, True),
+    ("GET", re.compile(r"/me"), _Handler.me, True),
+    ("GET", re.compile(r"/courses"), _Handler.list_courses, True),
+    ("POST", re.compile(r"/courses"), _Handler.add_course, True),
+    ("GET", re.compile(r"/courses/(\d+)"), _Handler.get_course, True),
+    ("PUT", re.compile(r"/courses/(\d+)"), _Handler.update_course, True),
+    ("DELETE", re.compile(r"/courses/(\d+)"), _Handler.delete_course, True),
+    ("GET", re.compile(r"/courses/(\d+)/tasks"), _Handler.list_tasks, True),
+    ("POST", re.compile(r"/courses/(\d+)/tasks"), _Handler.add_task, True),
+    ("GET", re.compile(r"/tasks/(\d+)"), _Handler.get_task, True),
+    ("PUT", re.compile(r"/tasks/(\d+)"), _Handler.update_task, True),
+    ("DELETE", re.compile(r"/tasks/(\d+)"), _Handler.delete_task, True),
+    ("GET", re.compile(r"/search"), _Handler.search, True),
+    ("GET", re.compile(r"/changes"), _Handler.changes, True),
+    ("GET", re.compile(r"/feed"), _Handler.feed, True),
+]
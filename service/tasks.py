@@ -0,0 +1,233 @@
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Iterator, Optional
+
+from db.dates import normalize_due_date, week_start
+from db.models import Course, Task
+from db.queries import MAX_ID
+from service.cache import LRUCache
+
+
+class ConflictError(RuntimeError):
+    """
+    A versioned update lost a race: the row was changed (or deleted) after the
+    caller read it. Nothing was written; `current` is the row as stored now
+    (None if it is gone), so the caller can show it and let the user retry.
+    """
+
+    def __init__(self, kind: str, row_id: int, current=None):
+        state = "was changed elsewhere" if current is not None else "no longer exists"
+        super().__init__(f"{kind} {row_id} {state}")
+        self.kind = kind
+        self.row_id = row_id
+        self.current = current
+
+
+@dataclass(slots=True)
+class Changes:
+    """Rows stamped after a client's revision; pass `revision` back as the next `since`."""
+    revision: int
+    courses: list[Course] = field(default_factory=list)
+    tasks: list[Task] = field(default_factory=list)
+    more: bool = False  # a list hit the limit: ask again from `revision`
+
+
+class TaskService:
+    """
+    Course/task operations for one user session, fronted by a write-through LRU cache.
+
+    - list pages populate the cache, so selecting a listed course/task needs no
+      DB round-trip (cached_course/cached_task never touch the DB)
+    - writes go to the DB first, then update or invalidate the cached rows
+    - rows are db.models.Course/Task objects (compact, detached from the cursor)
+    - due dates are normalized to 'YYYY-MM-DD' (db/dates.py) before they are written
+    - rows carry the `version` they were read at; update_*(..., version=v) only
+      writes if the row is still at v, else raises ConflictError (also raised,
+      with current=None, when the row does not exist, versioned or not)
+    - `db` is a DatabaseManager; methods are safe to call from a DBWorker thread
+    """
+
+    def __init__(self, db, cache_bytes: int = 8 * 1024 * 1024):
+        self.db = db
+        self.cache = LRUCache(max_bytes=cache_bytes)
+
+    # ---- listings ------------------------------------------------------------
+    def course_listing(self, user_id: int, limit: int) -> tuple[int, list[Course]]:
+        """(total courses, first keyset page)."""
+        total = self.db.fetch_named("course.count_by_user", (user_id,))[0][0]
+        return total, self.course_page(user_id, MAX_ID, 0, limit)
+
+    def course_page(self, user_id: int, before_id: int, lower_id: int, limit: int) -> list[Course]:
+        rows = self.db.fetch_models(Course, "course.page_by_user", (user_id, before_id, lower_id, limit))
+        return self._remember("course", rows)
+
+    def task_listing(self, course_id: int, limit: int) -> tuple[int, list[Task]]:
+        """(total tasks of the course, first keyset page)."""
+        total = self.db.fetch_named("task.count_by_course", (course_id,))[0][0]
+        return total, self.task_page(course_id, MAX_ID, 0, limit)
+
+    def task_page(self, course_id: int, before_id: int, lower_id: int, limit: int) -> list[Task]:
+        rows = self.db.fetch_models(Task, "task.page_by_course", (course_id, before_id, lower_id, limit))
+        return self._remember("task", rows)
+
+    def iter_courses(self, user_id: int, batch_size: int = 500) -> Iterator[Course]:
+        """Stream every course of the user, newest first; bypasses the cache like iter_user_tasks()."""
+        return self.db.iterate_named("course.all_by_user", (user_id,), batch_size, model=Course)
+
+    def iter_course_tasks(self, course_id: int, batch_size: int = 500) -> Iterator[Task]:
+        """Stream every task of one course, newest first; bypasses the cache like iter_user_tasks()."""
+        return self.db.iterate_named("task.all_by_course", (course_id,), batch_size, model=Task)
+
+    def iter_user_tasks(self, user_id: int, batch_size: int = 500) -> Iterator[Task]:
+        """
+        Stream every task of the user (grouped by course) for exports and reports.
+        Rows bypass the cache, so a full scan does not evict the rows on screen.
+        """
+        return self.db.iterate_named("task.all_by_user", (user_id,), batch_size, model=Task)
+
+    # ---- agenda (all of the user's courses) -----------------------------------
+    # `today` defaults to the local date; pass one in to pin "now" (tests, reports).
+    def upcoming(self, user_id: int, days: int = 7, today: Optional[date] = None,
+                 limit: int = 200) -> list[Task]:
+        """Tasks due today or within the next `days` days, soonest first."""
+        start = today or date.today()
+        end = start + timedelta(days=days + 1)
+        rows = self.db.fetch_models(
+            Task, "task.due_between_by_user", (user_id, start.isoformat(), end.isoformat(), limit))
+        return self._remember("task", rows)
+
+    def overdue(self, user_id: int, today: Optional[date] = None, limit: int = 200) -> list[Task]:
+        """Tasks due before today, most recently due first."""
+        today = today or date.today()
+        rows = self.db.fetch_models(Task, "task.overdue_by_user", (user_id, today.isoformat(), limit))
+        return self._remember("task", rows)
+
+    def weekly_counts(self, user_id: int, start: Optional[date] = None,
+                      weeks: int = 8) -> list[tuple[str, int]]:
+        """[(monday 'YYYY-MM-DD', tasks due that week)] for `weeks` weeks from start's week, zeros included."""
+        first = week_start(start or date.today())
+        end = first + timedelta(weeks=weeks)
+        counts = dict(self.db.fetch_named(
+            "task.weekly_counts_by_user", (user_id, first.isoformat(), end.isoformat())))
+        mondays = (first + timedelta(weeks=i) for i in range(weeks))
+        return [(m.isoformat(), counts.get(m.isoformat(), 0)) for m in mondays]
+
+    def day_counts(self, user_id: int, first: date, last: date) -> dict[str, int]:
+        """{'YYYY-MM-DD': tasks due} for first..last inclusive, from the TASK_DAY aggregate."""
+        end = last + timedelta(days=1)
+        return dict(self.db.fetch_named("task_day.range_by_user", (user_id, first.isoformat(), end.isoformat())))
+
+    def tasks_due_on(self, user_id: int, day: date, limit: int = 200) -> list[Task]:
+        return self.upcoming(user_id, days=0, today=day, limit=limit)
+
+    # ---- single rows ---------------------------------------------------------
+    def cached_course(self, course_id: int) -> Optional[Course]:
+        return self.cache.get(("course", course_id))
+
+    def cached_task(self, task_id: int) -> Optional[Task]:
+        return self.cache.get(("task", task_id))
+
+    def course(self, course_id: int) -> Optional[Course]:
+        row = self.cached_course(course_id)
+        if row is None:
+            rows = self._remember("course", self.db.fetch_models(Course, "course.details", (course_id,)))
+            row = rows[0] if rows else None
+        return row
+
+    def task(self, task_id: int) -> Optional[Task]:
+        row = self.cached_task(task_id)
+        if row is None:
+            rows = self._remember("task", self.db.fetch_models(Task, "task.details", (task_id,)))
+            row = rows[0] if rows else None
+        return row
+
+    # ---- sync -----------------------------------------------------------------
+    def revision(self) -> int:
+        """The database's current revision: the `since` for a first changes_since()."""
+        return self.db.fetch_named("revision.current")[0][0]
+
+    def changes_since(self, user_id: int, since: int, limit: int = 500) -> Changes:
+        """
+        Courses and tasks of the user added or edited after revision `since`,
+        oldest change first; a client applies them to its copy instead of
+        reloading whole lists. Deleted rows are not reported.
+        """
+        upto = self.revision()
+        courses = self.db.fetch_models(Course, "course.changed_since", (user_id, since, upto, limit))
+        tasks = self.db.fetch_models(Task, "task.changed_since", (user_id, since, upto, limit))
+        more = False
+        for rows in (courses, tasks):
+            if len(rows) == limit:
+                # versions are unique: everything up to this list's last one is complete
+                upto, more = min(upto, rows[-1].version), True
+        if more:
+            courses = [c for c in courses if c.version <= upto]
+            tasks = [t for t in tasks if t.version <= upto]
+        return Changes(upto, self._remember("course", courses), self._remember("task", tasks), more)
+
+    # ---- writes (DB first, then cache) ---------------------------------------
+    # Rows come back from the DB after the write: `version` is stamped by triggers.
+    def add_course(self, user_id: int, name: str, description: str) -> Course:
+        row = self.db.write(self._insert, Course, "course", (user_id, name, description))
+        self.cache.put(("course", row.id), row)
+        return row
+
+    def update_course(self, course_id: int, name: str, description: str,
+                      version: Optional[int] = None) -> Course:
+        """`version`: the one the caller read; None writes unconditionally."""
+        row = self._update(Course, "course", course_id, (name, description), version)
+        self.cache.put(("course", course_id), row)
+        return row
+
+    def delete_course(self, course_id: int) -> None:
+        self.db.execute_named("course.delete", (course_id,))
+        self.cache.discard(("course", course_id))
+        # ON DELETE CASCADE removed its tasks too
+        self.cache.discard_where(lambda k, v: k[0] == "task" and v.course_id == course_id)
+
+    def add_task(self, course_id: int, name: str, description: str, due_date: str) -> Task:
+        due_date = normalize_due_date(due_date)  # ValueError before anything is written
+        row = self.db.write(self._insert, Task, "task", (course_id, name, description, due_date))
+        self.cache.put(("task", row.id), row)
+        return row
+
+    def update_task(self, task_id: int, name: str, description: str, due_date: str,
+                    version: Optional[int] = None) -> Task:
+        due_date = normalize_due_date(due_date)
+        row = self._update(Task, "task", task_id, (name, description, due_date), version)
+        self.cache.put(("task", task_id), row)
+        return row
+
+    def delete_task(self, task_id: int) -> None:
+        self.db.execute_named("task.delete", (task_id,))
+        self.cache.discard(("task", task_id))
+
+    def _insert(self, model, kind: str, values: tuple):
+        row_id = self.db.execute_named(f"{kind}.insert", values)
+        return self.db.fetch_models(model, f"{kind}.details", (row_id,))[0]
+
+    def _update(self, model, kind: str, row_id: int, values: tuple, version: Optional[int]):
+        written, row = self.db.write(self._update_row, model, kind, row_id, values, version)
+        if written and row is not None:
+            return row
+        # nothing to roll back: the UPDATE matched no row (stale version, or no such id)
+        if row is None:
+            self.cache.discard((kind, row_id))
+        else:
+            self.cache.put((kind, row_id), row)
+        raise ConflictError(kind, row_id, row)
+
+    def _update_row(self, model, kind: str, row_id: int, values: tuple, version: Optional[int]):
+        """One unit of work: (written?, the row as stored now or None)."""
+        if version is None:
+            self.db.execute_named(f"{kind}.update", (*values, row_id))
+            written = True
+        else:
+            written = bool(self.db.fetch_named(f"{kind}.update_if_version", (*values, row_id, version)))
+        rows = self.db.fetch_models(model, f"{kind}.details", (row_id,))
+        return written, rows[0] if rows else None
+
+    def _remember(self, kind: str, rows: list) -> list:
+        for row in rows:
+            self.cache.put((kind, row.id), row)
+        return rows
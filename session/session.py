@@ -1,12 +1,33 @@
 from __future__ import annotations
 
+import json
 import logging
+import os
+import tempfile
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 log = logging.getLogger("TaskManager.Session")
 
 
+def _atomic_write_text(path: Path, text: str) -> None:
+    """Write via a temp file in the same folder + os.replace: readers see the old or the new file, never half of one."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
 class SessionManager:
     """
     Persist/retrieve a single logged-in user_id in a plaintext file.
@@ -21,7 +42,7 @@ class SessionManager:
     def save(self, user_id: int) -> None:
         if not isinstance(user_id, int) or user_id <= 0:
             raise ValueError("user_id must be a positive int")
-        self.session_path.write_text(f"{user_id}\n", encoding="utf-8")
+        _atomic_write_text(self.session_path, f"{user_id}\n")
         log.info("Session saved for user_id=%s at %s",
                  user_id, self.session_path.resolve())
 
@@ -56,3 +77,131 @@ class SessionManager:
             # Don't raise on logout cleanup failure
             log.warning("Failed to remove session file %s",
                         self.session_path, exc_info=True)
+
+
+class SessionStore:
+    """
+    Several remembered users ("profiles") in one JSON file, for shared workstations.
+    - file: {"version": 1, "current": 42, "profiles": {"42": {"name", "email", "last_used"}}}
+    - writes are atomic (temp file + os.replace), so a crash never leaves a torn file
+    - a profile not used for `max_age` seconds expires: load()/profiles() skip it and
+      the next write drops it
+    - the parsed file is cached; a call costs one stat() and the file is only re-read
+      when its mtime/size/inode changed (another window or process wrote it)
+    - a SessionManager file ("42\n") is read as a single, current profile, last used
+      when the file was written (its mtime), so it expires like any other
+    - corrupt/missing file -> no profiles (caller shows the Login screen)
+    """
+
+    VERSION = 1
+    # save() of the already-current user rewrites the file at most this often
+    TOUCH_INTERVAL = 3600
+
+    def __init__(self, session_file: str | Path = "session.json", max_age: float = 30 * 24 * 3600,
+                 clock: Callable[[], float] = time.time):
+        self.session_path = Path(session_file)
+        self.max_age = max_age
+        self.clock = clock
+        self._cache_key: Optional[tuple] = None
+        self._cache: dict = {"current": None, "profiles": {}}
+
+    # ---- queries ------------------------------------------------------------
+    def load(self) -> Optional[int]:
+        """The current (logged-in, not expired) user_id, or None."""
+        state = self._state()
+        current = state["current"]
+        if current is None or not self._alive(state["profiles"].get(str(current))):
+            return None
+        return current
+
+    def profiles(self) -> list[dict]:
+        """Unexpired profiles, most recently used first: {"user_id", "name", "email", "last_used"}."""
+        rows = [{"user_id": int(uid), **p} for uid, p in self._state()["profiles"].items() if self._alive(p)]
+        rows.sort(key=lambda p: p["last_used"], reverse=True)
+        return rows
+
+    # ---- writes -------------------------------------------------------------
+    def save(self, user_id: int, name: str = "", email: str = "") -> None:
+        """Make `user_id` the current user and mark it used now (login, switch, resume)."""
+        if not isinstance(user_id, int) or user_id <= 0:
+            raise ValueError("user_id must be a positive int")
+        now = self.clock()
+        state = self._state()
+        old = state["profiles"].get(str(user_id))
+        if (state["current"] == user_id and self._alive(old)
+                and now - old["last_used"] < self.TOUCH_INTERVAL
+                and (old["name"], old["email"]) == (name or old["name"], email or old["email"])):
+            return
+        profiles = dict(state["profiles"])
+        profiles[str(user_id)] = {
+            "name": name or (old or {}).get("name", ""),
+            "email": email or (old or {}).get("email", ""),
+            "last_used": now,
+        }
+        self._write(user_id, profiles)
+        log.info("Session saved for user_id=%s at %s", user_id, self.session_path.resolve())
+
+    def clear(self) -> None:
+        """Logout: no current user; the profile stays listed for a quick switch back."""
+        state = self._state()
+        if state["current"] is not None:
+            self._write(None, state["profiles"])
+
+    def forget(self, user_id: int) -> None:
+        """Drop a profile (e.g. the user no longer exists in the database)."""
+        state = self._state()
+        if str(user_id) in state["profiles"] or state["current"] == user_id:
+            profiles = {k: v for k, v in state["profiles"].items() if k != str(user_id)}
+            self._write(None if state["current"] == user_id else state["current"], profiles)
+
+    # ---- file I/O -------------------------------------------------------------
+    def _alive(self, profile: Optional[dict]) -> bool:
+        return profile is not None and self.clock() - profile["last_used"] < self.max_age
+
+    def _state(self) -> dict:
+        try:
+            st = os.stat(self.session_path)
+        except OSError:
+            self._cache_key, self._cache = None, {"current": None, "profiles": {}}
+            return self._cache
+        key = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if key != self._cache_key:
+            self._cache = self._parse()
+            self._cache_key = key
+        return self._cache
+
+    def _parse(self) -> dict:
+        empty = {"current": None, "profiles": {}}
+        try:
+            raw = self.session_path.read_text(encoding="utf-8").strip()
+            if not raw:
+                return empty
+            if raw.isdigit():  # SessionManager format
+                user_id = int(raw)
+                if user_id <= 0:
+                    return empty
+                last_used = self.session_path.stat().st_mtime
+                return {"current": user_id,
+                        "profiles": {raw: {"name": "", "email": "", "last_used": last_used}}}
+            data = json.loads(raw)
+            profiles = {
+                str(int(uid)): {"name": str(p.get("name", "")), "email": str(p.get("email", "")),
+                                "last_used": float(p["last_used"])}
+                for uid, p in data.get("profiles", {}).items()
+            }
+            current = data.get("current")
+            current = int(current) if current is not None and str(int(current)) in profiles else None
+            return {"current": current, "profiles": profiles}
+        except Exception:
+            log.warning("Invalid session file; ignoring and falling back to login.", exc_info=True)
+            return empty
+
+    def _write(self, current: Optional[int], profiles: dict) -> None:
+        profiles = {uid: p for uid, p in profiles.items() if self._alive(p)}
+        if current is not None and str(current) not in profiles:
+            current = None
+        data = {"version": self.VERSION, "current": current, "profiles": profiles}
+        _atomic_write_text(self.session_path, json.dumps(data, indent=1, sort_keys=True) + "\n")
+        st = os.stat(self.session_path)
+        self._cache_key = (st.st_mtime_ns, st.st_size, st.st_ino)
+        self._cache = {"current": current, "profiles": profiles}
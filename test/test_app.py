@@ -0,0 +1,43 @@
+import io
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import app
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_importing_app_defers_gui_modules_to_main():
+    code = "import sys, app; assert not {'ttkbootstrap', 'ui.task_manager'} & set(sys.modules)"
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, timeout=60)
+
+
+def test_startup_profile_reports_each_phase():
+    profile = app.StartupProfile(enabled=True, start=0.0)
+    profile.mark("imports")
+    profile.mark("theme")
+    out = io.StringIO()
+    profile.report("startup", out)
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "startup:"
+    assert [line.split()[0] for line in lines[1:]] == ["imports", "theme", "total"]
+    assert profile.phases == []
+
+
+def test_startup_profile_disabled_is_silent():
+    profile = app.StartupProfile(enabled=False)
+    profile.mark("imports")
+    out = io.StringIO()
+    profile.report("startup", out)
+    assert out.getvalue() == "" and profile.phases == []
+
+
+def test_gui_refuses_the_readonly_db_profile():
+    assert app.gui_db_profile({}) == "interactive"
+    assert app.gui_db_profile({"TASK_MANAGER_DB_PROFILE": "bulk"}) == "bulk"
+    for name in ("readonly", "turbo"):
+        with pytest.raises(ValueError, match=name):
+            app.gui_db_profile({"TASK_MANAGER_DB_PROFILE": name})
@@ -3,7 +3,7 @@ from pathlib import Path
 import pytest
 
 from db.manager import DatabaseManager
-from service.auth import authenticate
+from service.auth import AuthService, authenticate
 
 SCHEMA = """
 CREATE TABLE IF NOT EXISTS USER (
@@ -85,3 +85,40 @@ def test_invalid_input_no_write(db):
     assert user is None
     rows = db.fetchall("SELECT COUNT(*) AS c FROM USER", ())
     assert rows[0]["c"] == 0
+
+
+def test_auth_service_registers_in_one_statement_and_caches(db):
+    auth = AuthService(db)
+    assert auth.login("Eve", "eve@example.com", lambda a, b: True)[0] == "created"
+    stats = db.query_stats()
+    assert stats["user.insert_returning"]["calls"] == 1
+    assert stats["user.by_email"]["calls"] == 1  # the cache miss before registering
+
+    for _ in range(3):
+        status, user = auth.login("Eve", "eve@example.com", lambda a, b: True)
+        assert (status, user.name) == ("logged_in", "Eve")
+    assert db.query_stats()["user.by_email"]["calls"] == 1
+    assert auth.cache.hits == 3
+
+
+def test_auth_service_lost_registration_race_logs_in(db):
+    auth = AuthService(db)
+    auth.user_by_email = lambda email: None  # pretend the SELECT ran before the other insert
+    db.execute("INSERT INTO USER (name, email) VALUES (?, ?)", ("Fay", "fay@example.com"))
+    status, user = auth.login("Fay", "fay@example.com", lambda a, b: True)
+    assert (status, user.name) == ("logged_in", "Fay")
+    assert db.fetchall("SELECT COUNT(*) AS c FROM USER", ())[0]["c"] == 1
+
+
+def test_bulk_provision_one_transaction(db):
+    db.execute("INSERT INTO USER (name, email) VALUES (?, ?)", ("Old", "s1@example.com"))
+    auth = AuthService(db)
+    roster = [(f"Student {i}", f"s{i}@example.com") for i in range(1, 301)]
+    result = auth.bulk_provision(roster + [("", "nobody@example.com"), ("Dup", "s2@example.com")])
+
+    assert [u.email for u in result.existing] == ["s1@example.com"]
+    assert len(result.created) == 299 and result.created[0].email == "s2@example.com"
+    assert result.invalid == [("", "nobody@example.com")]
+    assert db.fetchall("SELECT COUNT(*) AS c FROM USER", ())[0]["c"] == 300
+    assert auth.login("Student 7", "s7@example.com", lambda a, b: True)[0] == "logged_in"
+    assert "user.by_email" not in db.query_stats()  # served from the cache
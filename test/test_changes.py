@@ -0,0 +1,97 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from db.manager import DatabaseManager
+from service.changes import ChangeFeed
+from service.tasks import TaskService
+
+SCHEMA = Path(__file__).resolve().parent.parent / "db" / "schema.sql"
+
+
+@pytest.fixture
+def db(tmp_path: Path):
+    db = DatabaseManager(str(tmp_path / "c.db"))
+    db.migrate(str(SCHEMA))
+    yield db
+    db.close()
+
+
+def entries(batch):
+    return [(c.entity, c.op, c.row_id) for c in batch.changes]
+
+
+def test_feed_records_every_change_in_order_per_user(db):
+    feed, tasks = ChangeFeed(db), TaskService(db)
+    ann = db.execute_named("user.insert", ("Ann", "ann@example.com"))
+    bob = db.execute_named("user.insert", ("Bob", "bob@example.com"))
+    start = feed.latest()
+
+    course = tasks.add_course(ann, "Math", "")
+    t1 = tasks.add_task(course.id, "HW1", "", None)
+    t2 = tasks.add_task(course.id, "HW2", "", None)
+    tasks.update_task(t1.id, "HW1b", "", None)
+    tasks.delete_task(t2.id)
+    tasks.add_course(bob, "Art", "")
+
+    batch = feed.since(start, ann)
+    assert entries(batch) == [("course", "insert", course.id), ("task", "insert", t1.id),
+                              ("task", "insert", t2.id), ("task", "update", t1.id), ("task", "delete", t2.id)]
+    assert all(c.course_id == course.id for c in batch.changes)
+    assert batch.cursor == feed.latest() and not (batch.more or batch.reset)
+    assert feed.since(batch.cursor, ann).changes == []
+    assert len(feed.since(start).changes) == 6  # every user's
+
+    page = feed.since(start, ann, limit=2)
+    assert (len(page.changes), page.more) == (2, True)
+    assert entries(feed.since(page.cursor, ann))[0] == ("task", "insert", t2.id)
+
+    # a course delete covers its cascaded tasks in one entry
+    cursor = feed.latest()
+    tasks.delete_course(course.id)
+    assert entries(feed.since(cursor, ann)) == [("course", "delete", course.id)]
+
+
+def test_rolled_back_writes_leave_no_entries(db):
+    feed = ChangeFeed(db)
+    uid = db.execute_named("user.insert", ("Ann", "ann@example.com"))
+    cursor = feed.latest()
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.execute_named("course.insert", (uid, "Ghost", ""))
+            raise RuntimeError("abort")
+    assert feed.since(cursor).changes == []
+
+
+def test_compaction_trims_old_entries_and_resets_readers_behind_it(db):
+    feed = ChangeFeed(db)
+    uid = db.execute_named("user.insert", ("Ann", "ann@example.com"))
+    cid = db.execute_named("course.insert", (uid, "Math", ""))
+    db.executemany_named("task.insert", [(cid, f"T{i}", None, None) for i in range(25)])
+    old_cursor = feed.latest() - 3
+    later = datetime.now(timezone.utc) + timedelta(days=40)
+
+    assert feed.compact(now=datetime.now(timezone.utc)) == 0  # nothing is 30 days old yet
+    assert feed.compact(now=later, batch_size=10) == 27
+    assert feed.since(old_cursor, uid).reset
+    assert feed.since(0).reset
+
+    tid = db.execute_named("task.insert", (cid, "fresh", None, None))
+    batch = feed.since(old_cursor + 3, uid)
+    assert not batch.reset and entries(batch) == [("task", "insert", tid)]
+    assert feed.latest() == batch.cursor == 28  # sequence numbers are never reused
+
+
+def test_compaction_stops_after_the_current_batch_once_asked(db):
+    feed = ChangeFeed(db)
+    uid = db.execute_named("user.insert", ("Ann", "ann@example.com"))
+    cid = db.execute_named("course.insert", (uid, "Math", ""))
+    db.executemany_named("task.insert", [(cid, f"T{i}", None, None) for i in range(25)])
+    later = datetime.now(timezone.utc) + timedelta(days=40)
+    stop = threading.Event()
+    stop.set()
+
+    assert feed.compact(now=later, batch_size=10, stop=stop) == 10
+    assert feed.compact(now=later, batch_size=10) == 17  # the next run picks up the rest
@@ -0,0 +1,66 @@
+import json
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def cli(tmp_path: Path):
+    def run(*args, ok=True):
+        proc = subprocess.run(
+            [sys.executable, str(ROOT / "cli.py"), "--db", str(tmp_path / "cli.db"), "--email", "ada@example.com",
+             *args], capture_output=True, text=True, timeout=60)
+        assert (proc.returncode == 0) == ok, proc.stderr
+        return proc
+    return run
+
+
+def test_cli_round_trip(cli, tmp_path: Path):
+    assert "No user" in cli("list", "courses", ok=False).stderr
+    cli("--name", "Ada", "add", "course", "Math", "-d", "Calculus")
+    task = json.loads(cli("--json", "add", "task", "Math", "HW 1", "--due", "03/11/2025").stdout)
+    assert task["due_date"] == "2025-11-03"
+
+    cli("update", "task", str(task["id"]), "--name", "HW 1 (limits)")
+    assert cli("list", "tasks", "--course", "Math").stdout == f"{task['id']}\t1\tHW 1 (limits)\t\t2025-11-03\t3\n"
+    stale = cli("update", "task", str(task["id"]), "--name", "HW 1", "--if-version", str(task["version"]), ok=False)
+    assert "changed elsewhere" in stale.stderr
+    assert "HW 1 (limits)" in cli("search", "limi").stdout
+    assert "invalid" in cli("add", "task", "Math", "HW 2", "--due", "someday", ok=False).stderr.lower()
+
+    out = tmp_path / "out.csv"
+    cli("export", str(out))
+    cli("delete", "course", "1")
+    assert cli("list", "tasks").stdout == ""
+    assert "1 courses, 1 tasks imported" in cli("import", str(out)).stdout
+
+
+def test_cli_never_imports_tkinter(tmp_path: Path):
+    code = (
+        "import sys, cli\n"
+        f"cli.main(['--db', {str(tmp_path / 'cli.db')!r}, '--email', 'a@b.c', '--name', 'A', 'list', 'tasks'])\n"
+        "assert not {'tkinter', 'ttkbootstrap'} & set(sys.modules), sorted(sys.modules)\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, timeout=60)
+
+
+def test_cli_rejects_other_users_rows(cli, tmp_path: Path):
+    cli("--name", "Ada", "add", "course", "Math")
+    other = subprocess.run(
+        [sys.executable, str(ROOT / "cli.py"), "--db", str(tmp_path / "cli.db"), "--email", "bea@example.com",
+         "--name", "Bea", "delete", "course", "1"], capture_output=True, text=True, timeout=60)
+    assert other.returncode == 1 and "No course" in other.stderr
+    assert cli("list", "courses").stdout.startswith("1\tMath")
+
+
+def test_cli_treats_a_task_without_its_course_as_missing(cli, tmp_path: Path):
+    cli("--name", "Ada", "add", "course", "Math")
+    with sqlite3.connect(tmp_path / "cli.db") as conn:  # foreign_keys off: a legacy orphan row
+        conn.execute("INSERT INTO TASK (course_id, name) VALUES (99, 'Orphan')")
+    proc = cli("delete", "task", "1", ok=False)
+    assert proc.returncode == 1 and "No task 1" in proc.stderr
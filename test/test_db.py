@@ -1,10 +1,18 @@
+import random
 import sqlite3
+import threading
+import tracemalloc
 from pathlib import Path
 
 import pytest
 
 # Import your DatabaseManager
+from db.dates import normalize_due_date
 from db.manager import DatabaseManager
+from db.migrations import LATEST_VERSION
+from db.models import Task, User
+from db.pool import ConnectionPool, PoolTimeoutError
+from db.queries import MAX_ID
 
 SCHEMA_TEXT = """
 CREATE TABLE IF NOT EXISTS USER (
@@ -31,6 +39,8 @@ CREATE TABLE IF NOT EXISTS TASK (
 );
 """
 
+REPO_SCHEMA = Path(__file__).resolve().parent.parent / "db" / "schema.sql"
+
 
 @pytest.fixture
 def temp_db(tmp_path: Path):
@@ -47,6 +57,17 @@ def temp_db(tmp_path: Path):
         db.close()
 
 
+@pytest.fixture
+def repo_db(tmp_path: Path):
+    """Like temp_db, from db/schema.sql (the app's current schema)."""
+    db = DatabaseManager(str(tmp_path / "repo.db"))
+    db.migrate(str(REPO_SCHEMA))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def test_row_factory_is_dict_like(temp_db: DatabaseManager):
     user_id = temp_db.execute(
         "INSERT INTO USER(name, email) VALUES(?, ?)",
@@ -113,3 +134,491 @@ def test_foreign_keys_prevent_orphan_course(temp_db: DatabaseManager):
             "INSERT INTO COURSE(user_id, name, description) VALUES(?, ?, ?)",
             (999999, "Ghost Course", "Should fail"),
         )
+
+
+def _schema_objects(db: DatabaseManager):
+    rows = db.fetchall(
+        "SELECT type, name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%' ORDER BY type, name")
+    objects = [(r["type"], r["name"]) for r in rows]
+    # ALTER TABLE ADD COLUMN must end up with the columns schema.sql declares
+    columns = [(name, tuple(c["name"] for c in db.fetchall(f'PRAGMA table_info("{name}")')))
+               for kind, name in objects if kind == "table"]
+    return objects, columns
+
+
+def test_fresh_database_gets_latest_version_and_indexes(tmp_path: Path):
+    db = DatabaseManager(str(tmp_path / "fresh.db"))
+    try:
+        assert db.migrate(str(REPO_SCHEMA)) == LATEST_VERSION
+        assert db.schema_version() == LATEST_VERSION
+        plan = db.fetchall(
+            "EXPLAIN QUERY PLAN SELECT id, name FROM TASK WHERE course_id=? ORDER BY id DESC", (1,))
+        assert any("idx_task_course_id" in r["detail"] for r in plan)
+    finally:
+        db.close()
+
+
+def test_legacy_database_is_migrated_to_match_fresh_schema(tmp_path: Path):
+    # temp_db layout == schema before migrations existed (user_version=0)
+    legacy = DatabaseManager(str(tmp_path / "legacy.db"))
+    legacy.conn.executescript(SCHEMA_TEXT)
+    legacy.execute("INSERT INTO USER(name, email) VALUES(?, ?)", ("Eve", "eve@example.com"))
+    assert legacy.schema_version() == 0
+
+    fresh = DatabaseManager(str(tmp_path / "fresh.db"))
+    try:
+        assert legacy.migrate(str(REPO_SCHEMA)) == LATEST_VERSION
+        fresh.migrate(str(REPO_SCHEMA))
+        assert _schema_objects(legacy) == _schema_objects(fresh)
+        # data survives the upgrade
+        assert legacy.fetchall("SELECT name FROM USER")[0]["name"] == "Eve"
+    finally:
+        legacy.close()
+        fresh.close()
+
+
+def test_other_schema_file_on_a_fresh_database_is_migrated(temp_db: DatabaseManager, repo_db: DatabaseManager):
+    # temp_db applies SCHEMA_TEXT from its own file: not stamped current, so every migration runs
+    assert temp_db.schema_version() == LATEST_VERSION
+    assert _schema_objects(temp_db) == _schema_objects(repo_db)
+
+
+def test_migrate_is_noop_when_current(tmp_path: Path):
+    db = DatabaseManager(str(tmp_path / "t.db"))
+    try:
+        db.migrate(str(REPO_SCHEMA))
+        # schema file is not even opened once user_version is current
+        assert db.migrate(str(tmp_path / "missing.sql")) == LATEST_VERSION
+    finally:
+        db.close()
+
+
+def test_transaction_commits_once_and_rolls_back_on_error(temp_db: DatabaseManager):
+    with temp_db.transaction():
+        uid = temp_db.execute("INSERT INTO USER(name, email) VALUES(?, ?)", ("Fay", "fay@example.com"))
+        with temp_db.transaction():  # nested block joins the outer one
+            temp_db.execute("INSERT INTO COURSE(user_id, name) VALUES(?, ?)", (uid, "Art"))
+        # nothing is committed until the outer block exits
+        assert temp_db.conn.in_transaction
+
+    with pytest.raises(sqlite3.IntegrityError):
+        with temp_db.transaction():
+            temp_db.execute("INSERT INTO USER(name, email) VALUES(?, ?)", ("Gus", "gus@example.com"))
+            temp_db.execute("INSERT INTO USER(name, email) VALUES(?, ?)", ("Gus2", "gus@example.com"))
+
+    emails = [r["email"] for r in temp_db.fetchall("SELECT email FROM USER")]
+    assert emails == ["fay@example.com"]
+    assert len(temp_db.fetchall("SELECT id FROM COURSE")) == 1
+
+
+def test_executemany_bulk_insert(temp_db: DatabaseManager):
+    uid = temp_db.execute("INSERT INTO USER(name, email) VALUES(?, ?)", ("Hal", "hal@example.com"))
+    cid = temp_db.execute("INSERT INTO COURSE(user_id, name) VALUES(?, ?)", (uid, "CS"))
+    n = temp_db.executemany(
+        "INSERT INTO TASK(course_id, name) VALUES(?, ?)",
+        ((cid, f"T{i}") for i in range(500)),
+    )
+    assert n == 500
+    assert temp_db.fetchall("SELECT COUNT(*) AS c FROM TASK")[0]["c"] == 500
+
+
+def test_interactive_profile_enables_wal(temp_db: DatabaseManager):
+    assert temp_db.profile == "interactive"
+    assert temp_db.fetchall("PRAGMA journal_mode")[0][0] == "wal"
+    assert temp_db.fetchall("PRAGMA synchronous")[0][0] == 1  # NORMAL
+    assert temp_db.fetchall("PRAGMA foreign_keys")[0][0] == 1
+
+
+def test_readonly_profile_rejects_writes(tmp_path: Path):
+    path = str(tmp_path / "ro.db")
+    writer = DatabaseManager(path, profile="bulk")
+    writer.migrate(str(REPO_SCHEMA))
+    writer.execute("INSERT INTO USER(name, email) VALUES(?, ?)", ("Ivy", "ivy@example.com"))
+
+    reader = DatabaseManager(path, profile="readonly")
+    try:
+        assert reader.fetchall("SELECT name FROM USER")[0]["name"] == "Ivy"
+        with pytest.raises(sqlite3.OperationalError):
+            reader.execute("INSERT INTO USER(name, email) VALUES(?, ?)", ("Jo", "jo@example.com"))
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_unknown_profile_is_rejected(tmp_path: Path):
+    with pytest.raises(ValueError):
+        DatabaseManager(str(tmp_path / "x.db"), profile="turbo")
+
+
+def test_pool_mode_is_safe_across_threads(tmp_path: Path):
+    db = DatabaseManager(str(tmp_path / "pool.db"), pool_size=4)
+    db.migrate(str(REPO_SCHEMA))
+    errors, ids = [], {}
+
+    def worker(n: int):
+        try:
+            for i in range(50):
+                email = f"w{n}-{i}@example.com"
+                ids[email] = db.execute("INSERT INTO USER(name, email) VALUES(?, ?)", (f"w{n}", email))
+            with db.transaction():
+                db.execute("INSERT INTO USER(name, email) VALUES(?, ?)", (f"w{n}", f"tx{n}@example.com"))
+        except Exception as exc:  # pragma: no cover - surfaced by the assert below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    try:
+        assert errors == []
+        # every lastrowid belongs to the row its own thread inserted
+        for email, uid in ids.items():
+            assert db.fetchall("SELECT email FROM USER WHERE id=?", (uid,))[0]["email"] == email
+        assert db.fetchall("SELECT COUNT(*) AS c FROM USER")[0]["c"] == 8 * 51
+    finally:
+        db.close()
+
+
+def test_pool_checkout_is_bounded(tmp_path: Path):
+    pool = ConnectionPool(lambda: sqlite3.connect(str(tmp_path / "p.db"), check_same_thread=False),
+                          size=1, timeout=0.05)
+    conn = pool.checkout()
+    with pytest.raises(PoolTimeoutError):
+        pool.checkout()
+    pool.checkin(conn)
+    with pool.connection() as again:
+        assert again is conn
+    pool.close()
+
+
+def test_named_queries_count_calls_and_estimate_cache_reuse(repo_db: DatabaseManager):
+    uid = repo_db.execute_named("user.insert", ("Kim", "kim@example.com"))
+    for _ in range(3):
+        assert repo_db.fetch_named("user.by_id", (uid,))[0]["name"] == "Kim"
+
+    stats = repo_db.query_stats()
+    assert list(stats) == ["user.by_id", "user.insert"]  # busiest first
+    assert stats["user.by_id"] == {"calls": 3, "est_hits": 2, "est_misses": 1}
+    assert stats["user.insert"] == {"calls": 1, "est_hits": 0, "est_misses": 1}
+
+    with pytest.raises(KeyError):
+        repo_db.fetch_named("user.nope")
+
+
+def test_small_statement_cache_evicts(tmp_path: Path):
+    db = DatabaseManager(str(tmp_path / "c.db"), cached_statements=1)
+    try:
+        db.migrate(str(REPO_SCHEMA))
+        for _ in range(2):
+            db.fetch_named("user.by_id", (1,))
+            db.fetch_named("user.by_email", ("x@example.com",))
+        assert db.query_stats()["user.by_id"]["est_hits"] == 0
+    finally:
+        db.close()
+
+
+def test_fetch_models_builds_slot_objects(repo_db: DatabaseManager):
+    uid = repo_db.execute_named("user.insert", ("Ola", "ola@example.com"))
+    cid = repo_db.execute_named("course.insert", (uid, "Geo", "Maps"))
+    repo_db.execute_named("task.insert", (cid, "Quiz", None, "2025-11-03"))
+
+    (user,) = repo_db.fetch_models(User, "user.by_id", (uid,))
+    (task,) = repo_db.fetch_models(Task, "task.page_by_course", (cid, MAX_ID, 0, 10))
+    assert user == User(uid, "Ola", "ola@example.com")
+    assert (task.course_id, task.name, task.due_date) == (cid, "Quiz", "2025-11-03")
+    assert task["name"] == "Quiz"  # sqlite3.Row-style access still works
+    assert not hasattr(task, "__dict__")
+    # plain fetchall on the shared cursor is back to sqlite3.Row afterwards
+    assert isinstance(repo_db.fetchall("SELECT 1 AS one")[0], sqlite3.Row)
+
+
+def test_iterate_streams_on_its_own_cursor(repo_db: DatabaseManager):
+    uid = repo_db.execute_named("user.insert", ("Ivo", "ivo@example.com"))
+    cid = repo_db.execute_named("course.insert", (uid, "Big", ""))
+    repo_db.executemany_named("task.insert", [(cid, f"T{i}", None, None) for i in range(1000)])
+
+    rows = repo_db.iterate("SELECT name FROM TASK WHERE course_id=? ORDER BY id", (cid,), batch_size=64)
+    assert next(rows)["name"] == "T0"
+    # other reads in between do not disturb the stream
+    assert repo_db.fetchall("SELECT COUNT(*) FROM TASK")[0][0] == 1000
+    assert [r["name"] for r in rows][-1] == "T999"
+
+    tasks = list(repo_db.iterate_named("task.all_by_user", (uid,), model=Task))
+    assert len(tasks) == 1000 and isinstance(tasks[0], Task)
+
+
+def test_iterate_keeps_peak_memory_bounded(tmp_path: Path):
+    db = DatabaseManager(str(tmp_path / "big.db"), profile="bulk")
+    try:
+        db.migrate(str(REPO_SCHEMA))
+        uid = db.execute_named("user.insert", ("Big", "big@example.com"))
+        cid = db.execute_named("course.insert", (uid, "Big", ""))
+        db.executemany_named("task.insert", [(cid, f"task {i}", "x" * 50, None) for i in range(20000)])
+        sql = "SELECT * FROM TASK"
+
+        def peak(scan):
+            tracemalloc.start()
+            try:
+                scan()
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        streamed = peak(lambda: sum(1 for _ in db.iterate(sql, batch_size=200)))
+        loaded = peak(lambda: len(db.fetchall(sql)))
+        assert streamed * 10 < loaded
+    finally:
+        db.close()
+
+
+def test_search_follows_writes_and_ranks_names_first(tmp_path: Path):
+    db = DatabaseManager(str(tmp_path / "s.db"))
+    try:
+        db.migrate(str(REPO_SCHEMA))
+        uid = db.execute_named("user.insert", ("Sam", "sam@example.com"))
+        other = db.execute_named("user.insert", ("Kai", "kai@example.com"))
+        cid = db.execute_named("course.insert", (uid, "History", "Essays and exams"))
+        t1 = db.execute_named("task.insert", (cid, "Reading", "outline for the essay", None))
+        t2 = db.execute_named("task.insert", (cid, "Essay draft", "", None))
+        ocid = db.execute_named("course.insert", (other, "Essay club", ""))
+
+        hits = db.search(uid, "ess")  # prefix, as typed
+        assert [(h.kind, h.id) for h in hits][0] == ("task", t2)  # name hit ranks first
+        assert {(h.kind, h.id) for h in hits} == {("task", t1), ("task", t2), ("course", cid)}
+        assert all(h.course_id == cid for h in hits)  # other users' rows are never returned
+        assert db.search(other, "essay")[0].id == ocid
+
+        db.execute_named("task.update", ("Renamed", "nothing here", None, t1))
+        assert [h.id for h in db.search(uid, "outline")] == []
+        assert [h.id for h in db.search(uid, "renam")] == [t1]
+
+        db.execute_named("course.delete", (cid,))  # cascaded task deletes fire the triggers too
+        assert db.search(uid, "essay") == []
+        assert db.fetchall("SELECT COUNT(*) FROM SEARCH")[0][0] == 1
+        # FTS5 syntax in user input is searched as plain text
+        assert db.search(other, 'club" OR NEAR(') == []
+        assert db.search(other, "  ") == []
+    finally:
+        db.close()
+
+
+def test_search_ranks_all_of_the_users_matches(tmp_path: Path):
+    db = DatabaseManager(str(tmp_path / "s.db"))
+    try:
+        db.migrate(str(REPO_SCHEMA))
+        uid = db.execute_named("user.insert", ("Sam", "sam@example.com"))
+        other = db.execute_named("user.insert", ("Kai", "kai@example.com"))
+        cid = db.execute_named("course.insert", (uid, "Chemistry", ""))
+        best = db.execute_named("task.insert", (cid, "Lab report", "", None))
+        # newer, weaker matches (description only) well past any candidate window
+        db.executemany_named("task.insert", ((cid, f"Week {i}", "bring the lab coat", None) for i in range(600)))
+        db.execute_named("course.insert", (other, "Lab safety", ""))
+
+        hits = db.search(uid, "lab", limit=5)
+        assert hits[0].id == best
+        assert len(hits) == 5 and all(h.course_id == cid for h in hits)
+        # the user id is a filter, not searchable text
+        assert db.search(other, str(other)) == []
+    finally:
+        db.close()
+
+
+def test_search_index_is_backfilled_by_migration(tmp_path: Path):
+    legacy = DatabaseManager(str(tmp_path / "legacy.db"))
+    try:
+        legacy.conn.executescript(SCHEMA_TEXT)
+        uid = legacy.execute("INSERT INTO USER(name, email) VALUES(?, ?)", ("Eve", "eve@example.com"))
+        cid = legacy.execute("INSERT INTO COURSE(user_id, name) VALUES(?, ?)", (uid, "Algebra"))
+        tid = legacy.execute("INSERT INTO TASK(course_id, name) VALUES(?, ?)", (cid, "Matrices"))
+        legacy.migrate(str(REPO_SCHEMA))
+        assert [(h.kind, h.id) for h in legacy.search(uid, "alg")] == [("course", cid)]
+        assert [(h.kind, h.id) for h in legacy.search(uid, "matri")] == [("task", tid)]
+    finally:
+        legacy.close()
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("2025-11-03", "2025-11-03"),
+    (" 2025/11/3 ", "2025-11-03"),
+    ("03/11/2025", "2025-11-03"),  # day first
+    ("2025-11-03T18:00:00Z", "2025-11-03"),
+    ("", None),
+    (None, None),
+])
+def test_normalize_due_date(raw, expected):
+    assert normalize_due_date(raw) == expected
+
+
+def test_due_dates_are_normalized_by_migration_and_guarded(tmp_path: Path):
+    legacy = DatabaseManager(str(tmp_path / "legacy.db"))
+    try:
+        legacy.conn.executescript(SCHEMA_TEXT)
+        uid = legacy.execute("INSERT INTO USER(name, email) VALUES(?, ?)", ("Eve", "eve@example.com"))
+        cid = legacy.execute("INSERT INTO COURSE(user_id, name) VALUES(?, ?)", (uid, "Algebra"))
+        legacy.executemany(
+            "INSERT INTO TASK(course_id, name, description, due_date) VALUES(?, ?, ?, ?)",
+            [(cid, "a", None, "2025-11-03"), (cid, "b", None, "5/1/2026"),
+             (cid, "c", "notes", "next friday"), (cid, "d", None, None), (cid, "e", "", "someday")])
+        legacy.migrate(str(REPO_SCHEMA))
+
+        rows = legacy.fetchall("SELECT name, description, due_date FROM TASK ORDER BY id")
+        assert [(r["due_date"]) for r in rows] == ["2025-11-03", "2026-01-05", None, None, None]
+        assert rows[2]["description"] == "notes\nDue: next friday"  # unparseable text is kept
+        assert rows[4]["description"] == "Due: someday"  # no blank first line
+
+        for bad in ("2025-02-30", "3/11/2025", ""):
+            with pytest.raises(sqlite3.IntegrityError):
+                legacy.execute("UPDATE TASK SET due_date=? WHERE name='a'", (bad,))
+    finally:
+        legacy.close()
+
+
+def _task_days(db: DatabaseManager):
+    kept = db.fetchall("SELECT user_id, day, tasks FROM TASK_DAY ORDER BY user_id, day")
+    fresh = db.fetchall(
+        "SELECT c.user_id, t.due_date, COUNT(*) FROM TASK t JOIN COURSE c ON c.id = t.course_id"
+        " WHERE t.due_date IS NOT NULL GROUP BY c.user_id, t.due_date ORDER BY 1, 2")
+    return [tuple(r) for r in kept], [tuple(r) for r in fresh]
+
+
+def test_task_day_aggregate_tracks_every_write(tmp_path: Path):
+    rnd = random.Random(3)
+    db = DatabaseManager(str(tmp_path / "agg.db"))
+    try:
+        db.migrate(str(REPO_SCHEMA))
+        users = [db.execute_named("user.insert", (f"U{i}", f"u{i}@example.com")) for i in range(3)]
+        courses = [db.execute_named("course.insert", (rnd.choice(users), f"C{i}", "")) for i in range(6)]
+        days = [f"2025-11-{d:02d}" for d in range(1, 6)] + [None]
+        for step in range(400):
+            tasks = [r[0] for r in db.fetchall("SELECT id FROM TASK")]
+            op = rnd.random()
+            if op < 0.45 or not tasks:
+                db.execute_named("task.insert", (rnd.choice(courses), "t", None, rnd.choice(days)))
+            elif op < 0.7:
+                db.execute("UPDATE TASK SET due_date=? WHERE id=?", (rnd.choice(days), rnd.choice(tasks)))
+            elif op < 0.8:
+                db.execute("UPDATE TASK SET course_id=? WHERE id=?", (rnd.choice(courses), rnd.choice(tasks)))
+            elif op < 0.9:
+                db.execute_named("task.delete", (rnd.choice(tasks),))
+            elif op < 0.95:
+                db.execute("UPDATE COURSE SET user_id=? WHERE id=?", (rnd.choice(users), rnd.choice(courses)))
+            else:
+                victim = courses.pop(rnd.randrange(len(courses)))
+                db.execute_named("course.delete", (victim,))
+                courses.append(db.execute_named("course.insert", (rnd.choice(users), "new", "")))
+            kept, fresh = _task_days(db)
+            assert kept == fresh, f"step {step}"
+
+        db.execute("DELETE FROM USER WHERE id=?", (users[0],))
+        kept, fresh = _task_days(db)
+        assert kept == fresh and all(u != users[0] for u, _, _ in kept)
+    finally:
+        db.close()
+
+
+def test_task_day_aggregate_is_backfilled_by_migration(tmp_path: Path):
+    legacy = DatabaseManager(str(tmp_path / "legacy.db"))
+    try:
+        legacy.conn.executescript(SCHEMA_TEXT)
+        uid = legacy.execute("INSERT INTO USER(name, email) VALUES(?, ?)", ("Eve", "eve@example.com"))
+        cid = legacy.execute("INSERT INTO COURSE(user_id, name) VALUES(?, ?)", (uid, "Algebra"))
+        legacy.executemany("INSERT INTO TASK(course_id, name, due_date) VALUES(?, ?, ?)",
+                           [(cid, "a", "2025-11-03"), (cid, "b", "3/11/2025"), (cid, "c", None)])
+        legacy.migrate(str(REPO_SCHEMA))
+        assert [tuple(r) for r in legacy.fetch_named(
+            "task_day.range_by_user", (uid, "2025-11-01", "2025-12-01"))] == [("2025-11-03", 2)]
+    finally:
+        legacy.close()
+
+
+def test_suspended_triggers_come_back_in_the_same_transaction(tmp_path: Path):
+    db = DatabaseManager(str(tmp_path / "s.db"))
+    db.migrate(str(REPO_SCHEMA))
+    uid = db.execute_named("user.insert", ("Bo", "bo@example.com"))
+    cid = db.execute_named("course.insert", (uid, "Art", ""))
+    with pytest.raises(RuntimeError):
+        with db.suspended_triggers("search_task_ai"):
+            pass
+
+    with db.transaction(), db.suspended_triggers("search_task_ai"):
+        db.execute_named("task.insert", (cid, "Sketch", None, None))
+    assert db.search(uid, "sketch") == []  # skipped while suspended
+    db.execute_named("task.insert", (cid, "Sketch 2", None, None))
+    assert [h.name for h in db.search(uid, "sketch")] == ["Sketch 2"]
+    db.close()
+
+
+def test_write_queue_failed_job_does_not_sink_its_group(tmp_path: Path):
+    from db.writer import WriteQueue
+
+    db = DatabaseManager(str(tmp_path / "w.db"), pool_size=2)
+    db.migrate(str(REPO_SCHEMA))
+    writes = WriteQueue(db)
+    gate = threading.Event()
+    blocker = writes.submit(gate.wait)  # holds the writer so the next jobs form one group
+    ok = writes.submit(db.execute_named, "user.insert", ("A", "a@example.com"))
+    dup = writes.submit(db.execute_named, "user.insert", ("B", "a@example.com"))
+    ok2 = writes.submit(db.execute_named, "user.insert", ("C", "c@example.com"))
+    gate.set()
+    assert blocker.result(5) is True
+    assert isinstance(ok.result(5), int) and isinstance(ok2.result(5), int)
+    with pytest.raises(sqlite3.IntegrityError):
+        dup.result(5)
+    writes.close()
+    assert [r[0] for r in db.fetchall("SELECT name FROM USER ORDER BY id")] == ["A", "C"]
+    assert writes.commits <= 2
+    db.close()
+
+
+def test_write_queue_routes_concurrent_writes_and_caps_groups(tmp_path: Path):
+    db = DatabaseManager(str(tmp_path / "q.db"), pool_size=9)
+    db.migrate(str(REPO_SCHEMA))
+    writes = db.start_write_queue(max_batch=4)
+    gate = threading.Event()
+    writes.submit(gate.wait)  # let producers pile up behind the writer
+    futures = [writes.execute_named("user.insert", (f"U{i}", f"u{i}@example.com")) for i in range(10)]
+    gate.set()
+    ids = [f.result(5) for f in futures]
+    assert sorted(ids) == ids and len(set(ids)) == 10  # lastrowid per caller
+    assert writes.largest_group <= 4
+
+    # plain execute() from many threads now goes through the queue too
+    barrier = threading.Barrier(8)
+
+    def add(i):
+        barrier.wait()
+        return db.execute_named("user.insert", (f"T{i}", f"t{i}@example.com"))
+
+    threads = [threading.Thread(target=add, args=(i,)) for i in range(8)]
+    jobs = writes.jobs
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert writes.jobs - jobs == 8
+    with pytest.raises(sqlite3.IntegrityError):  # a lone failing write fails on its own
+        db.execute_named("user.insert", ("Dup", "t0@example.com"))
+    assert db.fetchall("SELECT COUNT(*) FROM USER")[0][0] == 18
+    db.close()
+    assert db.writes is None
+
+
+def test_row_versions_are_backfilled_unique_by_migration(tmp_path: Path):
+    db = DatabaseManager(str(tmp_path / "legacy.db"))
+    try:
+        db.conn.executescript(SCHEMA_TEXT)
+        uid = db.execute("INSERT INTO USER(name, email) VALUES(?, ?)", ("Eve", "eve@example.com"))
+        cids = [db.execute("INSERT INTO COURSE(user_id, name) VALUES(?, ?)", (uid, f"C{i}")) for i in range(3)]
+        for i in range(4):
+            db.execute("INSERT INTO TASK(course_id, name) VALUES(?, ?)", (cids[i % 3], f"T{i}"))
+        db.migrate(str(REPO_SCHEMA))
+
+        versions = [r[0] for r in db.fetchall("SELECT version FROM COURSE UNION ALL SELECT version FROM TASK")]
+        assert sorted(versions) == list(range(1, 8))
+        assert db.fetch_named("revision.current")[0][0] == 7
+        # later writes keep counting from there
+        tid = db.execute_named("task.insert", (cids[0], "new", None, None))
+        assert db.fetch_named("task.details", (tid,))[0]["version"] == 8
+    finally:
+        db.close()
@@ -0,0 +1,62 @@
+import io
+from pathlib import Path
+
+import pytest
+
+from db.manager import DatabaseManager
+from service.exporter import _ics_line, export_file, write_ics
+from service.importer import import_file
+
+SCHEMA = Path(__file__).resolve().parent.parent / "db" / "schema.sql"
+
+
+@pytest.fixture
+def db(tmp_path: Path):
+    db = DatabaseManager(str(tmp_path / "e.db"))
+    db.migrate(str(SCHEMA))
+    db.user_id = db.execute_named("user.insert", ("Ada", "ada@example.com"))
+    math = db.execute_named("course.insert", (db.user_id, "Math", "Calculus, linear algebra"))
+    db.executemany_named("task.insert", [
+        (math, "HW1", "Limits; part 1\nand 2", "2025-11-01"),
+        (math, "Reading", None, None),
+    ])
+    db.execute_named("course.insert", (db.user_id, "Art", None))
+    yield db
+    db.close()
+
+
+@pytest.mark.parametrize("ext", [".csv", ".jsonl"])
+def test_export_round_trips_through_import(db, tmp_path: Path, ext):
+    out = tmp_path / f"out{ext}"
+    assert export_file(db, db.user_id, out) == 4
+
+    other = db.execute_named("user.insert", ("Bea", "bea@example.com"))
+    report = import_file(db, other, out)
+    assert (report.courses, report.tasks, report.rejected) == (2, 2, 0)
+    snapshot = ("SELECT c.name, c.description, t.name, t.description, t.due_date"
+                " FROM COURSE c LEFT JOIN TASK t ON t.course_id = c.id WHERE c.user_id=? ORDER BY c.id, t.id")
+    original = [tuple(r) for r in db.fetchall(snapshot, (db.user_id,))]
+    copied = [tuple(r) for r in db.fetchall(snapshot, (other,))]
+    # empty descriptions come back as "" (CSV cannot tell "" from NULL)
+    assert [tuple(v or None for v in r) for r in copied] == [tuple(v or None for v in r) for r in original]
+
+
+def test_ics_has_one_escaped_todo_per_dated_task(db):
+    out = io.StringIO(newline="")
+    assert write_ics(db, db.user_id, out) == 1
+    text = out.getvalue()
+    assert text.startswith("BEGIN:VCALENDAR\r\n") and text.endswith("END:VCALENDAR\r\n")
+    assert "SUMMARY:HW1\r\n" in text
+    assert r"DESCRIPTION:Limits\; part 1\nand 2" "\r\n" in text
+    assert "DUE;VALUE=DATE:20251101\r\n" in text
+
+    events = io.StringIO(newline="")
+    write_ics(db, db.user_id, events, component="VEVENT")
+    assert "DTSTART;VALUE=DATE:20251101\r\nDTEND;VALUE=DATE:20251102\r\n" in events.getvalue()
+
+
+def test_ics_lines_are_folded_at_75_octets():
+    folded = _ics_line("SUMMARY:" + "é" * 80)
+    lines = folded[:-2].split("\r\n")
+    assert all(len(line.encode("utf-8")) <= 75 for line in lines)
+    assert "".join([lines[0]] + [line[1:] for line in lines[1:]]) == "SUMMARY:" + "é" * 80
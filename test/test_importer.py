@@ -0,0 +1,119 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from db.manager import DatabaseManager
+from service.importer import MAX_REJECTS, import_file
+
+SCHEMA = Path(__file__).resolve().parent.parent / "db" / "schema.sql"
+
+
+@pytest.fixture
+def db(tmp_path: Path):
+    db = DatabaseManager(str(tmp_path / "i.db"))
+    db.migrate(str(SCHEMA))
+    db.user_id = db.execute_named("user.insert", ("Ada", "ada@example.com"))
+    yield db
+    db.close()
+
+
+def tasks_by_course(db):
+    rows = db.fetchall(
+        "SELECT c.name AS course, t.name, t.due_date FROM TASK t JOIN COURSE c ON c.id = t.course_id"
+        " ORDER BY t.id")
+    return [(r["course"], r["name"], r["due_date"]) for r in rows]
+
+
+def test_csv_import_resolves_courses_and_reports_rejects(db, tmp_path: Path):
+    existing = db.execute_named("course.insert", (db.user_id, "Math", ""))
+    src = tmp_path / "in.csv"
+    src.write_text(
+        "Type,Course,Name,Description,Due_Date\n"
+        "course,,Physics,Labs,\n"
+        "task,Math,HW1,,2025-11-01\n"
+        ",Physics,Lab 1,,03/11/2025\n"     # type inferred from `course`
+        ",Chemistry,Prep,,\n"              # unknown course -> created
+        "task,Math,,,\n"                   # no name
+        "task,Math,HW2,,someday\n"         # bad date
+        "course,,Math,,\n"                 # duplicate course
+        "note,,x,,\n",
+        encoding="utf-8")
+
+    report = import_file(db, db.user_id, src, batch_size=3)
+    assert (report.courses, report.tasks, report.rejected) == (2, 3, 4)
+    assert [line for line, _ in report.rejects] == [6, 7, 8, 9]
+    assert tasks_by_course(db) == [("Math", "HW1", "2025-11-01"), ("Physics", "Lab 1", "2025-11-03"),
+                                   ("Chemistry", "Prep", None)]
+    assert db.fetchall("SELECT course_id FROM TASK WHERE name='HW1'")[0][0] == existing
+    # imported rows are searchable like any other
+    assert [h.name for h in db.search(db.user_id, "lab")] == ["Lab 1", "Physics"]
+    # ... and versioned like any other: one distinct version each, all within REVISION
+    versions = [r[0] for r in db.fetchall("SELECT version FROM COURSE UNION ALL SELECT version FROM TASK")]
+    assert len(set(versions)) == len(versions) == 6
+    assert max(versions) == db.fetch_named("revision.current")[0][0]
+    # ... and in the change feed
+    logged = db.fetchall("SELECT entity, user_id FROM CHANGE_LOG WHERE op='insert' AND entity<>'user'")
+    assert sorted(r["entity"] for r in logged) == ["course"] * 3 + ["task"] * 3
+    assert {r["user_id"] for r in logged} == {db.user_id}
+
+
+def test_jsonl_import_skips_bad_lines_and_caps_kept_rejects(db, tmp_path: Path):
+    src = tmp_path / "in.jsonl"
+    lines = [json.dumps({"course": "Art", "name": f"Sketch {i}", "due_date": "2025-12-01"}) for i in range(5)]
+    lines += ["{not json", "[1, 2]", ""]
+    lines += [json.dumps({"course": "Art", "name": ""})] * (MAX_REJECTS + 5)
+    src.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    report = import_file(db, db.user_id, src, batch_size=4)
+    assert (report.courses, report.tasks) == (1, 5)
+    assert report.rejected == MAX_REJECTS + 7
+    assert len(report.rejects) == MAX_REJECTS
+    assert report.rejects[0] == (6, report.rejects[0][1]) and "JSON" in report.rejects[0][1]
+
+
+def test_json_array_import_streams_elements_with_their_line_numbers(db, tmp_path: Path, monkeypatch):
+    monkeypatch.setattr("service.importer.JSON_CHUNK", 16)  # elements straddle the reads
+    rows = [{"Course": "Art", "Name": f"Sketch {i}", "due_date": "2025-12-01"} for i in range(5)]
+    src = tmp_path / "in.json"
+    src.write_text(json.dumps(rows[:2] + ["oops"] + rows[2:], indent=2), encoding="utf-8")
+
+    report = import_file(db, db.user_id, src, batch_size=2)
+    assert (report.courses, report.tasks, report.rejected) == (1, 5, 1)
+    assert report.rejects == [(12, "expected a JSON object")]
+    assert [name for _, name, _ in tasks_by_course(db)] == [f"Sketch {i}" for i in range(5)]
+
+    src.write_text('[{"course": "Art", "name": "Late"}, {"name": ', encoding="utf-8")
+    report = import_file(db, db.user_id, src)
+    assert report.tasks == 1 and report.rejected == 1 and "JSON" in report.rejects[0][1]
+
+
+def test_unsupported_extension_is_rejected(db, tmp_path: Path):
+    with pytest.raises(ValueError):
+        import_file(db, db.user_id, tmp_path / "tasks.xlsx")
+
+
+def test_import_runs_on_the_write_queue_next_to_other_writers(tmp_path: Path):
+    db = DatabaseManager(str(tmp_path / "q.db"), pool_size=4)
+    db.migrate(str(SCHEMA))
+    uid = db.execute_named("user.insert", ("Ada", "ada@example.com"))
+    cid = db.execute_named("course.insert", (uid, "Math", ""))
+    queue = db.start_write_queue(name="test-writer")
+    src = tmp_path / "in.csv"
+    src.write_text("course,name\n" + "".join(f"Physics,Lab {i}\n" for i in range(2000)), encoding="utf-8")
+    try:
+        jobs = queue.jobs
+        # writes queued before and while the import runs share the writer with it
+        futures = [queue.execute_named("task.insert", (cid, f"HW {i}", None, None)) for i in range(200)]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            more = [pool.submit(db.execute_named, "task.insert", (cid, f"Quiz {i}", None, None))
+                    for i in range(200)]
+            report = import_file(db, uid, src, batch_size=250)
+            assert all(f.result(timeout=30) for f in futures + more)
+        assert (report.courses, report.tasks, report.rejected) == (1, 2000, 0)
+        assert queue.jobs - jobs == 400 + 2000 // 250  # every batch was a writer job
+        assert db.fetchall("SELECT COUNT(*) FROM TASK")[0][0] == 2400
+        assert db.fetchall("SELECT COUNT(*) FROM SEARCH WHERE kind='task'")[0][0] == 2400
+    finally:
+        db.close()
@@ -0,0 +1,110 @@
+from pathlib import Path
+
+import pytest
+
+from db.manager import DatabaseManager
+from db.models import Task
+from ui.paging import MAX_ID, PagedList
+
+SCHEMA = Path(__file__).resolve().parent.parent / "db" / "schema.sql"
+
+
+@pytest.fixture
+def course(tmp_path: Path):
+    db = DatabaseManager(str(tmp_path / "p.db"))
+    db.migrate(str(SCHEMA))
+    uid = db.execute_named("user.insert", ("Mo", "mo@example.com"))
+    cid = db.execute_named("course.insert", (uid, "Big", ""))
+    db.executemany_named("task.insert", [(cid, f"T{i}", "", None) for i in range(1, 1001)])
+    yield db, cid
+    db.close()
+
+
+def load(db, cid, model: PagedList, start: int, stop: int):
+    """Synchronously satisfy wanted_pages() the way the UI worker would."""
+    for _ in range(50):
+        wanted = model.wanted_pages(start, stop)
+        if not wanted:
+            return
+        for k, before_id, lower_id, limit in wanted:
+            model.add_page(k, db.fetch_models(Task, "task.page_by_course", (cid, before_id, lower_id, limit)))
+    pytest.fail("pages never settled")
+
+
+def test_keyset_pages_follow_id_desc(course):
+    db, cid = course
+    model = PagedList(page_size=100, max_pages=3)
+    model.reset(1000, db.fetch_models(Task, "task.page_by_course", (cid, MAX_ID, 0, 100)))
+    assert model.row(0).name == "T1000"
+    assert model.row(150) is None  # page 1 not loaded yet
+
+    load(db, cid, model, 550, 570)
+    assert [model.row(i).name for i in (550, 569)] == ["T450", "T431"]
+
+
+def test_only_recent_pages_stay_in_memory(course):
+    db, cid = course
+    model = PagedList(page_size=100, max_pages=2)
+    model.reset(1000)
+    load(db, cid, model, 900, 1000)
+    assert model.row(950).name == "T50"
+    assert model.row(0) is None  # evicted, boundary kept
+    # evicted page 0 is re-fetched by its id range, not by LIMIT
+    assert model.wanted_pages(0, 10) == [(0, MAX_ID, 901, -1)]
+
+
+def test_short_page_corrects_stale_total(course):
+    db, cid = course
+    model = PagedList(page_size=100)
+    model.reset(5000)  # count taken before rows were deleted
+    load(db, cid, model, 990, 1010)
+    assert len(model) == 1000
+    assert model.index_of(model.row(999).id) == 999
+
+
+def test_in_place_edits_keep_pages_consistent(course):
+    db, cid = course
+    model = PagedList(page_size=100, max_pages=2)
+    model.reset(1000)
+    for start in (0, 100, 200):  # pages 0..2 fetched, page 0 evicted
+        load(db, cid, model, start, start + 100)
+
+    # insert (newest id goes on top of page 0, even though it is not in memory)
+    new_id = db.execute_named("task.insert", (cid, "fresh", "", None))
+    model.insert_first(Task(new_id, cid, "fresh"))
+    # delete a row of loaded page 2 and one of evicted page 0
+    for name in ("T750", "T950"):
+        tid = db.fetch_models(Task, "task.page_by_course", (cid, MAX_ID, 0, 1000))
+        tid = next(r.id for r in tid if r.name == name)
+        db.execute_named("task.delete", (tid,))
+        model.remove(tid)
+    assert len(model) == 999
+    assert model.update(Task(model.row(250).id, cid, "renamed"))
+
+    expected = [r.name for r in db.fetch_models(Task, "task.page_by_course", (cid, MAX_ID, 0, -1))]
+    expected[250] = "renamed"
+    # pages 1..2 were edited in memory, page 0 is re-fetched by its id range
+    for start in (200, 100, 0):
+        load(db, cid, model, start, start + 100)
+        assert [model.row(i).name for i in range(start, start + 100)] == expected[start:start + 100]
+
+
+def test_page_for_key_walks_to_an_unloaded_row(course):
+    db, cid = course
+    model = PagedList(page_size=100, max_pages=2)
+    model.reset(1000, db.fetch_models(Task, "task.page_by_course", (cid, MAX_ID, 0, 100)))
+    assert model.page_for_key(1000) is None  # on the first page already
+
+    def walk(key):
+        fetches = 0
+        while (page := model.page_for_key(key)) is not None:
+            k, before_id, lower_id, limit = page
+            model.add_page(k, db.fetch_models(Task, "task.page_by_course", (cid, before_id, lower_id, limit)))
+            fetches += 1
+        return fetches
+
+    assert walk(250) == 7  # pages 1..7, in order (T250 is on page 7)
+    assert model.row(model.index_of(250)).name == "T250"
+    assert walk(950) == 1 and model.index_of(950) == 50  # evicted page 0, re-fetched by its range
+    assert walk(5000) == 0 and model.index_of(5000) is None  # no such row
+    assert walk(-1) == 3 and model.index_of(-1) is None  # pages 8, 9 and the empty frontier
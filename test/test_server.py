@@ -0,0 +1,187 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from db.manager import DatabaseManager
+from service.server import TaskServer
+
+SCHEMA = Path(__file__).resolve().parent.parent / "db" / "schema.sql"
+
+
+@pytest.fixture
+def server(tmp_path: Path):
+    db = DatabaseManager(str(tmp_path / "server.db"), pool_size=9)
+    db.migrate(str(SCHEMA))
+    srv = TaskServer(db, ("127.0.0.1", 0))
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.close()
+    db.close()
+
+
+def call(server, method, path, body=None, token=None):
+    req = urllib.request.Request(server.url + path, method=method,
+                                 data=None if body is None else json.dumps(body).encode())
+    req.add_header("Content-Type", "application/json")
+    if token:
+        req.add_header("Authorization", f"Bearer {token}")
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+
+def login(server, name, email, **extra):
+    status, body = call(server, "POST", "/login", {"name": name, "email": email, **extra})
+    assert status in (200, 201), body
+    return body["token"]
+
+
+def test_login_crud_and_search_over_http(server):
+    status, body = call(server, "POST", "/login", {"name": "Ada", "email": "ada@example.com"})
+    assert (status, body["status"]) == (201, "created")
+    token = body["token"]
+    assert call(server, "POST", "/login", {"name": "Ada", "email": "ada@example.com"})[0] == 200
+    assert call(server, "POST", "/login", {"name": "Eve", "email": "ada@example.com"})[0] == 409
+
+    status, course = call(server, "POST", "/courses", {"name": "Math"}, token)
+    assert status == 201
+    status, task = call(server, "POST", f"/courses/{course['id']}/tasks",
+                        {"name": "HW1", "due_date": "03/11/2025"}, token)
+    assert (status, task["due_date"]) == (201, "2025-11-03")
+    assert call(server, "POST", f"/courses/{course['id']}/tasks", {"name": "x", "due_date": "soon"}, token)[0] == 400
+
+    status, task = call(server, "PUT", f"/tasks/{task['id']}", {"description": "limits"}, token)
+    assert (task["name"], task["description"], task["due_date"]) == ("HW1", "limits", "2025-11-03")
+    status, page = call(server, "GET", f"/courses/{course['id']}/tasks", token=token)
+    assert page["total"] == 1 and page["tasks"][0]["description"] == "limits"
+    status, found = call(server, "GET", "/search?q=hw", token=token)
+    assert [h["name"] for h in found["hits"]] == ["HW1"]
+
+    assert call(server, "DELETE", f"/courses/{course['id']}", token=token)[0] == 200
+    assert call(server, "GET", f"/tasks/{task['id']}", token=token)[0] == 404
+    assert call(server, "GET", "/courses", token=token)[1] == {"courses": [], "total": 0}
+
+
+def test_requests_need_a_token_and_only_see_own_rows(server):
+    ada = login(server, "Ada", "ada@example.com")
+    bea = login(server, "Bea", "bea@example.com")
+    _, course = call(server, "POST", "/courses", {"name": "Math"}, ada)
+
+    assert call(server, "GET", "/courses")[0] == 401
+    assert call(server, "GET", f"/courses/{course['id']}", token=bea)[0] == 404
+    assert call(server, "DELETE", f"/courses/{course['id']}", token=bea)[0] == 404
+    assert call(server, "PUT", "/courses", {}, ada)[0] == 405
+    call(server, "POST", "/logout", token=ada)
+    assert call(server, "GET", "/me", token=ada)[0] == 401
+
+
+def test_concurrent_writers_share_group_commits(server):
+    tokens = [login(server, f"U{i}", f"u{i}@example.com") for i in range(8)]
+    course_ids = [call(server, "POST", "/courses", {"name": "C"}, t)[1]["id"] for t in tokens]
+
+    def add(i):
+        t = i % len(tokens)
+        return call(server, "POST", f"/courses/{course_ids[t]}/tasks", {"name": f"T{i}"}, tokens[t])[0]
+
+    jobs, commits = server.writes.jobs, server.writes.commits
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert set(pool.map(add, range(200))) == {201}
+    assert server.db.fetchall("SELECT COUNT(*) FROM TASK")[0][0] == 200
+    # every write went through the single writer; concurrent ones share a commit
+    assert server.writes.jobs - jobs == 200
+    assert server.writes.commits - commits <= 200
+
+
+def test_stale_put_gets_409_and_changes_report_the_delta(server):
+    token = login(server, "Ada", "ada@example.com")
+    _, course = call(server, "POST", "/courses", {"name": "Math"}, token)
+    _, since = call(server, "GET", "/changes", token=token)
+    _, task = call(server, "POST", f"/courses/{course['id']}/tasks", {"name": "HW1"}, token)
+
+    status, mine = call(server, "PUT", f"/tasks/{task['id']}", {"name": "HW1a", "version": task["version"]}, token)
+    assert status == 200 and mine["version"] > task["version"]
+    status, body = call(server, "PUT", f"/tasks/{task['id']}", {"name": "HW1b", "version": task["version"]}, token)
+    assert status == 409 and body["current"]["name"] == "HW1a"
+    assert call(server, "PUT", f"/tasks/{task['id']}", {"version": "7"}, token)[0] == 400
+
+    status, delta = call(server, "GET", f"/changes?since={since['revision']}", token=token)
+    assert status == 200 and not delta["more"]
+    assert (delta["courses"], [t["name"] for t in delta["tasks"]]) == ([], ["HW1a"])
+    assert delta["revision"] == mine["version"]
+
+    status, feed = call(server, "GET", "/feed", token=token)
+    assert (status, feed["changes"]) == (200, [])
+    call(server, "DELETE", f"/tasks/{task['id']}", token=token)
+    status, feed = call(server, "GET", f"/feed?after={feed['cursor']}", token=token)
+    assert [(c["entity"], c["op"], c["row_id"]) for c in feed["changes"]] == [("task", "delete", task["id"])]
+
+
+def test_limits_are_clamped_and_negative_ones_refused(server):
+    token = login(server, "Ada", "ada@example.com")
+    for i in range(3):
+        call(server, "POST", "/courses", {"name": f"C{i}"}, token)
+    for path in ("/courses", "/search?q=c", "/changes", "/feed"):
+        sep = "&" if "?" in path else "?"
+        assert call(server, "GET", f"{path}{sep}limit=-1", token=token)[0] == 400
+        assert call(server, "GET", f"{path}{sep}limit=0", token=token)[0] == 400
+    assert len(call(server, "GET", "/courses?limit=2", token=token)[1]["courses"]) == 2
+    assert call(server, "GET", "/courses?limit=x", token=token)[0] == 400
+
+
+def test_non_string_fields_are_rejected_before_reaching_sqlite(server):
+    token = login(server, "Ada", "ada@example.com")
+    _, course = call(server, "POST", "/courses", {"name": "Math"}, token)
+    jobs = server.writes.jobs
+    assert call(server, "POST", "/courses", {"name": "x", "description": [1]}, token)[0] == 400
+    assert call(server, "POST", "/courses", {"name": 5}, token)[0] == 400
+    assert call(server, "POST", f"/courses/{course['id']}/tasks", {"name": "T", "due_date": {}}, token)[0] == 400
+    assert call(server, "PUT", f"/courses/{course['id']}", {"description": 1.5}, token)[0] == 400
+    assert call(server, "POST", "/login", {"name": ["Ada"], "email": "ada@example.com"})[0] == 400
+    assert server.writes.jobs == jobs  # nothing reached the writer
+
+
+def test_reads_see_writes_made_outside_the_server(server):
+    token = login(server, "Ada", "ada@example.com")
+    _, course = call(server, "POST", "/courses", {"name": "Math"}, token)
+    _, task = call(server, "POST", f"/courses/{course['id']}/tasks", {"name": "HW1"}, token)
+    assert call(server, "GET", f"/tasks/{task['id']}", token=token)[1]["name"] == "HW1"
+
+    # e.g. the GUI or the CLI on the same file
+    server.db.execute("UPDATE TASK SET name='HW1 (edited)' WHERE id=?", (task["id"],))
+    assert call(server, "GET", f"/tasks/{task['id']}", token=token)[1]["name"] == "HW1 (edited)"
+    server.db.execute("DELETE FROM COURSE WHERE id=?", (course["id"],))
+    assert call(server, "GET", f"/tasks/{task['id']}", token=token)[0] == 404
+    assert call(server, "GET", f"/courses/{course['id']}", token=token)[0] == 404
+
+    server.db.execute("DELETE FROM USER WHERE email='ada@example.com'")
+    assert call(server, "GET", "/me", token=token)[0] == 401
+    assert call(server, "GET", "/courses", token=token)[0] == 401  # the token was revoked
+
+
+def test_secret_loopback_only_default_and_token_expiry(tmp_path: Path):
+    db = DatabaseManager(str(tmp_path / "s.db"), pool_size=3)
+    db.migrate(str(SCHEMA))
+    with pytest.raises(ValueError, match="secret"):
+        TaskServer(db, ("0.0.0.0", 0))
+
+    now = [1000.0]
+    srv = TaskServer(db, ("127.0.0.1", 0), secret="s3cret", token_ttl=60, clock=lambda: now[0])
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    try:
+        assert call(srv, "POST", "/login", {"name": "Ada", "email": "ada@example.com"})[0] == 401
+        assert call(srv, "POST", "/login", {"name": "Ada", "email": "ada@example.com", "secret": "x"})[0] == 401
+        token = login(srv, "Ada", "ada@example.com", secret="s3cret")
+        assert call(srv, "GET", "/me", token=token)[0] == 200
+        now[0] += 61
+        assert call(srv, "GET", "/me", token=token)[0] == 401
+    finally:
+        srv.close()
+        db.close()
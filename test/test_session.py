@@ -1,9 +1,11 @@
+import json
+import os
 from pathlib import Path
 
 import pytest
 
 from db.manager import DatabaseManager
-from session.session import SessionManager
+from session.session import SessionManager, SessionStore
 
 
 @pytest.fixture
@@ -99,3 +101,93 @@ def test_autologin_blocks_nonexistent_user(temp_db: DatabaseManager, temp_paths)
     assert loaded == 999999
     # Guard in bootstrap: check DB before trusting
     assert temp_db.user_exists(loaded) is False
+
+
+def test_resume_session_returns_saved_user_or_forgets_stale_profile(temp_db: DatabaseManager, tmp_path: Path):
+    from app import resume_session
+
+    store = SessionStore(tmp_path / "session.json")
+    assert resume_session(temp_db, store) is None
+
+    uid = create_user(temp_db)
+    store.save(uid, "Alice", "alice@example.com")
+    user = resume_session(temp_db, store)
+    assert (user.id, user.name) == (uid, "Alice")
+
+    store.save(uid + 1)  # e.g. the database was replaced
+    assert resume_session(temp_db, store) is None
+    assert [p["user_id"] for p in store.profiles()] == [uid]
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_session_store_keeps_profiles_and_expires_them(tmp_path: Path):
+    clock = FakeClock()
+    path = tmp_path / "session.json"
+    store = SessionStore(path, max_age=100, clock=clock)
+    store.save(1, "Ann", "ann@example.com")
+    clock.now += 10
+    store.save(2, "Bob", "bob@example.com")
+    assert store.load() == 2
+    assert [p["user_id"] for p in store.profiles()] == [2, 1]
+
+    store.clear()  # logout keeps the profile for a quick switch back
+    assert store.load() is None
+    assert SessionStore(path, max_age=100, clock=clock).profiles()[0]["email"] == "bob@example.com"
+
+    clock.now += 95  # Ann was last used 105s ago
+    assert [p["user_id"] for p in store.profiles()] == [2]
+    store.save(2)
+    assert set(json.loads(path.read_text(encoding="utf-8"))["profiles"]) == {"2"}
+    assert store.profiles()[0]["name"] == "Bob"  # kept when save() gets no name
+
+
+def test_session_store_caches_until_the_file_changes(tmp_path: Path, monkeypatch):
+    path = tmp_path / "session.json"
+    SessionStore(path).save(7, "Ann", "ann@example.com")
+    store = SessionStore(path)
+    reads = []
+    real_parse = store._parse
+    monkeypatch.setattr(store, "_parse", lambda: reads.append(1) or real_parse())
+
+    assert [store.load() for _ in range(5)] == [7] * 5
+    assert len(reads) == 1
+
+    SessionStore(path).save(8, "Bob", "bob@example.com")  # another window switches user
+    assert store.load() == 8 and len(reads) == 2
+
+
+def test_session_store_writes_atomically_and_reads_legacy_files(tmp_path: Path, monkeypatch):
+    path = tmp_path / "session.json"
+    path.write_text("42\n", encoding="utf-8")  # SessionManager format
+    store = SessionStore(path)
+    assert store.load() == 42
+
+    def crash(*_args):
+        raise OSError("disk full")
+    monkeypatch.setattr("session.session.os.replace", crash)
+    with pytest.raises(OSError):
+        store.save(43, "Eve", "eve@example.com")
+    assert path.read_text(encoding="utf-8") == "42\n"
+    assert list(tmp_path.iterdir()) == [path]  # temp file removed
+
+    path.write_text("{not json", encoding="utf-8")
+    assert SessionStore(path).load() is None
+
+
+def test_legacy_session_file_expires_from_its_mtime(tmp_path: Path):
+    clock = FakeClock()
+    path = tmp_path / "session.txt"
+    path.write_text("42\n", encoding="utf-8")
+    os.utime(path, (clock.now - 50, clock.now - 50))
+    assert SessionStore(path, max_age=100, clock=clock).load() == 42
+
+    clock.now += 60  # re-reading the file does not make it look used again
+    assert SessionStore(path, max_age=100, clock=clock).load() is None
+    assert SessionStore(path, max_age=100, clock=clock).profiles() == []
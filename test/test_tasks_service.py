@@ -0,0 +1,169 @@
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from db.manager import DatabaseManager
+from service.cache import LRUCache
+from service.tasks import ConflictError, TaskService
+
+SCHEMA = Path(__file__).resolve().parent.parent / "db" / "schema.sql"
+
+
+@pytest.fixture
+def service(tmp_path: Path):
+    db = DatabaseManager(str(tmp_path / "s.db"))
+    db.migrate(str(SCHEMA))
+    uid = db.execute_named("user.insert", ("Nia", "nia@example.com"))
+    svc = TaskService(db)
+    svc.user_id = uid
+    yield svc
+    db.close()
+
+
+def db_calls(svc: TaskService) -> int:
+    return sum(s["calls"] for s in svc.db.query_stats().values())
+
+
+def test_listed_rows_are_served_from_cache(service):
+    course = service.add_course(service.user_id, "Chem", "Labs")
+    for i in range(5):
+        service.add_task(course.id, f"Lab {i}", "", "2025-12-01")
+    service.cache.clear()
+
+    total, rows = service.task_listing(course.id, limit=50)
+    assert total == 5
+    before = db_calls(service)
+    for row in rows:
+        assert service.task(row.id).name == row.name
+    assert db_calls(service) == before
+
+
+def test_writes_go_through_to_db_and_cache(service):
+    course = service.add_course(service.user_id, "Bio", "")
+    task = service.add_task(course.id, "Essay", "", "2025-12-02")
+
+    service.update_task(task.id, "Essay v2", "longer", "2025-12-03")
+    assert service.cached_task(task.id).name == "Essay v2"
+    assert service.db.fetch_named("task.details", (task.id,))[0]["name"] == "Essay v2"
+
+    service.delete_course(course.id)
+    assert service.cached_course(course.id) is None
+    assert service.cached_task(task.id) is None  # cascaded
+    assert service.task(task.id) is None
+
+
+def test_lru_respects_memory_cap():
+    cache = LRUCache(max_bytes=1000, sizeof=lambda v: 100)
+    for i in range(20):
+        cache.put(i, {"id": i})
+    assert len(cache) == 10
+    assert cache.size_bytes == 1000
+    assert cache.get(0) is None and cache.get(19) is not None
+
+    cache.get(10)  # touch -> most recently used
+    cache.put(99, {"id": 99})
+    assert cache.get(10) is not None
+    assert cache.get(11) is None
+
+
+def test_iter_user_tasks_streams_without_touching_cache(service):
+    for name in ("Chem", "Bio"):
+        course = service.add_course(service.user_id, name, "")
+        for i in range(3):
+            service.add_task(course.id, f"{name} {i}", "", None)
+    service.cache.clear()
+
+    names = [t.name for t in service.iter_user_tasks(service.user_id, batch_size=2)]
+    assert names == ["Chem 0", "Chem 1", "Chem 2", "Bio 0", "Bio 1", "Bio 2"]
+    courses = list(service.iter_courses(service.user_id, batch_size=1))
+    assert [c.name for c in courses] == ["Bio", "Chem"]  # newest first, like the pages
+    assert [t.name for t in service.iter_course_tasks(courses[0].id)] == ["Bio 2", "Bio 1", "Bio 0"]
+    assert len(service.cache) == 0
+
+
+def test_agenda_spans_all_courses(service):
+    today = date(2025, 11, 12)  # a Wednesday
+    math = service.add_course(service.user_id, "Math", "")
+    art = service.add_course(service.user_id, "Art", "")
+    for course, due in ((math, "2025-11-01"), (art, "2025-11-11"), (math, "2025-11-12"),
+                        (art, "19/11/2025"), (math, "2025-11-20"), (art, None)):
+        service.add_task(course.id, f"due {due}", "", due)
+    other = service.db.execute_named("user.insert", ("Ana", "ana@example.com"))
+    service.add_task(service.add_course(other, "X", "").id, "not mine", "", "2025-11-13")
+
+    assert [t.due_date for t in service.upcoming(service.user_id, days=7, today=today)] == \
+        ["2025-11-12", "2025-11-19"]
+    assert [t.due_date for t in service.overdue(service.user_id, today=today)] == \
+        ["2025-11-11", "2025-11-01"]
+    assert service.weekly_counts(service.user_id, start=today, weeks=3) == \
+        [("2025-11-10", 2), ("2025-11-17", 2), ("2025-11-24", 0)]
+
+    with pytest.raises(ValueError):
+        service.add_task(math.id, "bad", "", "someday")
+
+
+def test_day_counts_come_from_the_aggregate(service):
+    course = service.add_course(service.user_id, "Math", "")
+    for due in ("2025-11-03", "2025-11-03", "2025-11-30", "2025-12-01"):
+        service.add_task(course.id, "t", "", due)
+    moved = service.add_task(course.id, "moved", "", "2025-11-04")
+    service.update_task(moved.id, "moved", "", "2025-11-30")
+
+    counts = service.day_counts(service.user_id, date(2025, 11, 1), date(2025, 11, 30))
+    assert counts == {"2025-11-03": 2, "2025-11-30": 2}
+    assert [t.name for t in service.tasks_due_on(service.user_id, date(2025, 11, 30))] == ["t", "moved"]
+
+
+def test_versioned_update_refuses_to_overwrite_a_newer_row(service):
+    course = service.add_course(service.user_id, "Art", "")
+    task = service.add_task(course.id, "Sketch", "", None)
+    other = TaskService(service.db)  # a second window on the same database
+
+    saved = other.update_task(task.id, "Sketch (theirs)", "", None, version=task.version)
+    assert saved.version > task.version
+    with pytest.raises(ConflictError) as err:
+        service.update_task(task.id, "Sketch (mine)", "", None, version=task.version)
+    assert err.value.current.name == "Sketch (theirs)"
+    assert service.cached_task(task.id) == err.value.current  # cache now holds the winner
+    assert service.task(task.id).name == "Sketch (theirs)"
+
+    service.update_task(task.id, "Sketch (mine)", "", None, version=err.value.current.version)
+    other.delete_task(task.id)
+    with pytest.raises(ConflictError) as err:
+        service.update_course(course.id, "Art 2", "", version=course.version - 1)
+    assert err.value.current.name == "Art"
+
+
+def test_update_of_a_missing_row_raises_and_caches_nothing(service):
+    for update in (lambda: service.update_task(999, "a", "b", None),
+                   lambda: service.update_course(999, "a", "b")):
+        with pytest.raises(ConflictError) as err:
+            update()
+        assert err.value.current is None
+    assert service.task(999) is None and service.course(999) is None
+    assert len(service.cache) == 0
+
+
+def test_changes_since_returns_only_the_delta_in_pages(service):
+    uid = service.user_id
+    start = service.revision()
+    course = service.add_course(uid, "Music", "")
+    tasks = [service.add_task(course.id, f"Scale {i}", "", None) for i in range(5)]
+    mid = service.revision()
+    service.update_task(tasks[1].id, "Scale 1b", "", None)
+    someone = service.db.execute_named("user.insert", ("Zed", "zed@example.com"))
+    service.add_course(someone, "Not mine", "")
+
+    delta = service.changes_since(uid, mid)
+    assert ([t.name for t in delta.tasks], delta.courses, delta.more) == (["Scale 1b"], [], False)
+    assert service.changes_since(uid, delta.revision).tasks == []
+
+    seen, since = [], start
+    while True:
+        page = service.changes_since(uid, since, limit=2)
+        seen += [r.name for r in page.courses + page.tasks]
+        since = page.revision
+        if not page.more:
+            break
+    assert sorted(seen) == sorted(["Music", "Scale 0", "Scale 1b", "Scale 2", "Scale 3", "Scale 4"])
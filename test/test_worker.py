@@ -0,0 +1,84 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from db.manager import DatabaseManager
+from db.worker import DBWorker
+
+SCHEMA = Path(__file__).resolve().parent.parent / "db" / "schema.sql"
+
+
+@pytest.fixture
+def worker():
+    w = DBWorker()
+    yield w
+    w.shutdown(wait=True)
+
+
+def pump_until(worker: DBWorker, done, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not done() and time.monotonic() < deadline:
+        worker.pump()
+        time.sleep(0.005)
+    assert done()
+
+
+def test_callbacks_run_on_the_pumping_thread(tmp_path: Path, worker):
+    db = DatabaseManager(str(tmp_path / "w.db"), pool_size=2)
+    db.migrate(str(SCHEMA))
+    seen = []
+
+    uid = db.execute_named("user.insert", ("Lea", "lea@example.com"))
+    worker.submit(db.fetch_named, "user.by_id", (uid,),
+                  on_done=lambda rows: seen.append((threading.current_thread(), rows[0]["name"])))
+    pump_until(worker, lambda: seen)
+    assert seen == [(threading.current_thread(), "Lea")]
+    db.close()
+
+
+def test_errors_go_to_on_error(worker):
+    errors = []
+
+    def boom():
+        raise ValueError("nope")
+
+    fut = worker.submit(boom, on_done=lambda _r: pytest.fail("on_done called"), on_error=errors.append)
+    pump_until(worker, lambda: errors)
+    assert isinstance(errors[0], ValueError)
+    assert isinstance(fut.exception(), ValueError)
+
+
+def test_same_key_coalesces_to_latest(worker):
+    gate = threading.Event()
+    rendered, ran = [], []
+
+    # keep the worker busy so the keyed requests pile up behind it
+    worker.submit(gate.wait)
+
+    def query(n):
+        ran.append(n)
+        return n
+
+    futures = [worker.submit(query, n, on_done=rendered.append, key="select") for n in range(10)]
+    gate.set()
+    pump_until(worker, lambda: rendered)
+    worker.shutdown(wait=True)
+    worker.pump()
+
+    assert ran == [9]
+    assert rendered == [9]
+    assert all(f.cancelled() for f in futures[:-1])
+
+
+def test_cancel_drops_pending_callbacks(worker):
+    gate = threading.Event()
+    rendered = []
+    worker.submit(gate.wait)
+    worker.submit(lambda: 1, on_done=rendered.append, key="tasks")
+    worker.cancel("tasks")
+    gate.set()
+    worker.shutdown(wait=True)
+    worker.pump()
+    assert rendered == []
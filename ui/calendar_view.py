@@ -0,0 +1,131 @@
+import calendar
+import tkinter as tk
+from datetime import date
+from typing import Callable, Optional
+
+import ttkbootstrap as ttk
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+def month_grid(year: int, month: int) -> list[list[date]]:
+    """The 6 weeks (Mon..Sun) shown for a month, padded with the neighbouring months' days."""
+    weeks = calendar.Calendar(firstweekday=0).monthdatescalendar(year, month)
+    while len(weeks) < 6:
+        last = weeks[-1][-1].toordinal()
+        weeks.append([date.fromordinal(last + i) for i in range(1, 8)])
+    return weeks
+
+
+class CalendarView(ttk.Frame):
+    """
+    Month grid with the number of tasks due on each day, plus the tasks of the selected day.
+
+    Args:
+        master: parent widget
+        fetch_counts (callable): fetch_counts(first, last, on_counts) must load
+            {'YYYY-MM-DD': tasks due} for first..last (dates, inclusive) asynchronously
+            and call on_counts(counts) on the Tk thread; one call per month shown
+        fetch_day (callable): fetch_day(day, on_rows) loads the tasks due on `day`
+        on_open (callable|None): called with a task row when it is double-clicked
+
+    Counts come from the TASK_DAY aggregate, so a month costs one range query
+    instead of one query per cell; refresh() re-reads the month after edits.
+    """
+
+    def __init__(self, master, fetch_counts: Callable, fetch_day: Callable,
+                 on_open: Optional[Callable] = None):
+        super().__init__(master, padding=10)
+        self._fetch_counts = fetch_counts
+        self._fetch_day = fetch_day
+        self._on_open = on_open
+        today = date.today()
+        self._year, self._month = today.year, today.month
+        self._selected: Optional[date] = None
+        self._day_rows = []
+        self._generation = 0  # bumped per month shown; late counts of another month are dropped
+
+        head = ttk.Frame(self)
+        head.pack(fill=tk.X)
+        ttk.Button(head, text="<", width=3, command=lambda: self.shift(-1)).pack(side=tk.LEFT)
+        ttk.Button(head, text=">", width=3, command=lambda: self.shift(1)).pack(side=tk.RIGHT)
+        self.title_label = ttk.Label(head, anchor="center", font=("-size", 12))
+        self.title_label.pack(fill=tk.X, expand=True)
+
+        grid = ttk.Frame(self)
+        grid.pack(fill=tk.BOTH, expand=True, pady=(8, 8))
+        for col, name in enumerate(WEEKDAYS):
+            ttk.Label(grid, text=name, anchor="center").grid(row=0, column=col, sticky="ew")
+            grid.columnconfigure(col, weight=1, uniform="day")
+        self._cells: list[ttk.Button] = []
+        for row in range(6):
+            grid.rowconfigure(row + 1, weight=1, uniform="week")
+            for col in range(7):
+                cell = ttk.Button(grid, bootstyle="secondary-outline", width=6)
+                cell.grid(row=row + 1, column=col, sticky="nsew", padx=1, pady=1)
+                self._cells.append(cell)
+
+        self.day_label = ttk.Label(self, text="")
+        self.day_label.pack(anchor="w")
+        self.day_list = tk.Listbox(self, height=6, activestyle="none")
+        self.day_list.pack(fill=tk.X)
+        self.day_list.bind("<Double-Button-1>", self._on_day_open)
+
+        self._days: list[date] = []
+        self.refresh()
+
+    # ---- Public API ---------------------------------------------------------
+    def shift(self, months: int):
+        """Show the month `months` away from the current one."""
+        index = self._year * 12 + (self._month - 1) + months
+        self._year, self._month = divmod(index, 12)
+        self._month += 1
+        self.refresh()
+
+    def refresh(self):
+        """(Re)load the counts of the month shown, and the selected day's tasks."""
+        self._generation += 1
+        generation = self._generation
+        weeks = month_grid(self._year, self._month)
+        self._days = [d for week in weeks for d in week]
+        self.title_label.configure(text=f"{calendar.month_name[self._month]} {self._year}")
+        self._render({})
+
+        def on_counts(counts):
+            if generation == self._generation:
+                self._render(counts)
+
+        self._fetch_counts(self._days[0], self._days[-1], on_counts)
+        if self._selected:
+            self.select_day(self._selected)
+
+    def select_day(self, day: date):
+        self._selected = day
+        self.day_label.configure(text=f"Due {day.isoformat()}:")
+        self._fetch_day(day, lambda rows: self._show_day(day, rows))
+
+    # ---- internals ----------------------------------------------------------
+    def _render(self, counts: dict):
+        for cell, day in zip(self._cells, self._days):
+            n = counts.get(day.isoformat(), 0)
+            in_month = day.month == self._month
+            cell.configure(
+                text=f"{day.day}\n{n} task{'s' if n != 1 else ''}" if n else f"{day.day}\n",
+                bootstyle=("primary" if n else "secondary-outline") if in_month else "light-outline",
+                command=lambda d=day: self.select_day(d),
+            )
+
+    def _show_day(self, day: date, rows):
+        if day != self._selected:
+            return
+        self._day_rows = rows
+        self.day_list.delete(0, tk.END)
+        for row in rows:
+            self.day_list.insert(tk.END, row.name)
+        if not rows:
+            self.day_list.insert(tk.END, "Nothing due")
+
+    def _on_day_open(self, _evt):
+        sel = self.day_list.curselection()
+        if self._on_open and sel and sel[0] < len(self._day_rows):
+            self._on_open(self._day_rows[sel[0]])
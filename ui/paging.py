@@ -0,0 +1,176 @@
+from bisect import bisect_left
+
+from db.queries import MAX_ID
+
+# SQLite "LIMIT -1" == no limit
+NO_LIMIT = -1
+
+
+class PagedList:
+    """
+    Keyset-paginated model of an `ORDER BY id DESC` listing (no Tk dependency).
+
+    - pages are id ranges: page k holds lower(k) <= id < before(k), where
+      before(0) is MAX_ID and before(k+1) is the last id of page k when it was
+      first fetched; the first page past the known boundaries is the "frontier"
+      and is fetched with `LIMIT page_size` to discover the next boundary
+    - only the `max_pages` most recently used pages are kept in memory; evicted
+      pages are re-fetched by their id range
+    - because pages are ranges, single-row edits (insert_first/update/remove)
+      are applied in place without re-querying or shifting other pages
+    - loading is driven from outside: wanted_pages() says which pages to fetch,
+      add_page() stores the result (the UI fetches them on a background worker)
+    - rows only need .id and .name (db.models.Course/Task)
+    """
+
+    def __init__(self, page_size: int = 200, max_pages: int = 10):
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.reset(0)
+
+    def reset(self, total: int, first_page=None) -> None:
+        self.total = total
+        self._pages: dict[int, list] = {}
+        self._lru: list[int] = []
+        self._before: list[int] = [MAX_ID]   # upper bound (exclusive) of each known page
+        self._lengths: list[int] = []        # row count of every page fetched at least once
+        self._pending: set[int] = set()
+        self._complete = False               # frontier page fetched and was short
+        if first_page is not None:
+            self.add_page(0, first_page)
+
+    def __len__(self) -> int:
+        return self.total
+
+    # ---- loading -----------------------------------------------------------
+    def wanted_pages(self, start: int, stop: int) -> list[tuple[int, int, int, int]]:
+        """
+        (page, before_id, lower_id, limit) tuples to fetch so rows [start, stop)
+        can be shown. Pages past the frontier are reached through the frontier;
+        returned pages are marked pending.
+        """
+        if stop <= start or not self.total:
+            return []
+        wanted = []
+        first, last = self._page_of_index(start), self._page_of_index(stop - 1)
+        for k in range(first, last + 1):
+            k = min(k, len(self._before) - 1)
+            if k in self._pages or k in self._pending:
+                continue
+            self._pending.add(k)
+            wanted.append((k, *self._bounds(k)))
+        return wanted
+
+    def add_page(self, k: int, rows) -> None:
+        rows = list(rows)
+        self._pending.discard(k)
+        frontier = k == len(self._before) - 1
+        self._store(k, rows)
+        if k < len(self._lengths):
+            self._lengths[k] = len(rows)
+        else:
+            self._lengths.append(len(rows))
+        if frontier and not self._complete:
+            if len(rows) >= self.page_size:
+                self._before.append(rows[-1].id)
+            else:
+                # short frontier page == end of the listing; trust it over a stale count
+                self._complete = True
+                self.total = sum(self._lengths)
+
+    def cancel_pending(self) -> None:
+        self._pending.clear()
+
+    # ---- in-place edits ------------------------------------------------------
+    def insert_first(self, row) -> None:
+        """Add a row whose id is newer than every listed id (a fresh INSERT)."""
+        if not self._lengths:
+            self._lengths.append(0)
+        self._lengths[0] += 1
+        if 0 in self._pages:
+            self._pages[0].insert(0, row)
+        self.total += 1
+
+    def update(self, row) -> bool:
+        """Replace the loaded row with the same id; False if it is not in memory."""
+        page = self._pages.get(self._page_of_key(row.id))
+        for i, old in enumerate(page or ()):
+            if old.id == row.id:
+                page[i] = row
+                return True
+        return False
+
+    def remove(self, key) -> None:
+        k = self._page_of_key(key)
+        page = self._pages.get(k)
+        if page is not None:
+            before = len(page)
+            page[:] = [r for r in page if r.id != key]
+            if len(page) == before:
+                return  # not listed
+        if k < len(self._lengths):
+            self._lengths[k] -= 1
+        self.total = max(0, self.total - 1)
+
+    # ---- access ------------------------------------------------------------
+    def row(self, index: int):
+        """Row at `index`, or None while its page is not loaded."""
+        if not 0 <= index < self.total:
+            return None
+        k = self._page_of_index(index)
+        page = self._pages.get(k)
+        if page is None:
+            return None
+        offset = index - self._start(k)
+        return page[offset] if 0 <= offset < len(page) else None
+
+    def page_for_key(self, key) -> tuple[int, int, int, int] | None:
+        """
+        (page, before_id, lower_id, limit) to fetch next on the way to the row with
+        id == key; None once the page that would hold it is loaded (it is there or
+        nowhere). Past the frontier that is the frontier page: pages are found in order.
+        """
+        k = self._page_of_key(key)
+        if k in self._pages:
+            return None
+        return (k, *self._bounds(k))
+
+    def index_of(self, key) -> int | None:
+        """Absolute index of the row with id == key if its page is loaded."""
+        k = self._page_of_key(key)
+        for i, row in enumerate(self._pages.get(k) or ()):
+            if row.id == key:
+                return self._start(k) + i
+        return None
+
+    # ---- internals ---------------------------------------------------------
+    def _bounds(self, k: int) -> tuple[int, int, int]:
+        """(before_id, lower_id, limit) of page k."""
+        if k + 1 < len(self._before):
+            return self._before[k], self._before[k + 1], NO_LIMIT
+        if self._complete:
+            return self._before[k], 0, NO_LIMIT
+        return self._before[k], 0, self.page_size
+
+    def _start(self, k: int) -> int:
+        return sum(self._lengths[:k]) + self.page_size * max(0, k - len(self._lengths))
+
+    def _page_of_index(self, index: int) -> int:
+        start = 0
+        for k, length in enumerate(self._lengths):
+            if index < start + length:
+                return k
+            start += length
+        return len(self._lengths) + (index - start) // self.page_size
+
+    def _page_of_key(self, key) -> int:
+        # _before is strictly descending; page k covers [_before[k+1], _before[k])
+        return max(0, bisect_left([-b for b in self._before], -key) - 1)
+
+    def _store(self, k: int, rows: list) -> None:
+        self._pages[k] = rows
+        if k in self._lru:
+            self._lru.remove(k)
+        self._lru.append(k)
+        while len(self._lru) > self.max_pages:
+            self._pages.pop(self._lru.pop(0), None)
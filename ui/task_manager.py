@@ -1,16 +1,35 @@
 # ui/task_manager.py
 import tkinter as tk
+from functools import partial
 
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import BOTH, X
 from tkinter import messagebox as Messagebox
-from ttkbootstrap.dialogs.dialogs import Querybox
+from db.dates import normalize_due_date
+from db.models import User
+from db.worker import DBWorker
+from service.tasks import ConflictError, TaskService
+from ui.virtual_list import VirtualList
 from ui.welcome import WelcomeScreen
 
+# Querybox/filedialog, the calendar and the import/export services are imported
+# by the handlers that use them: they are not needed to show the main screen.
+
+# rows per keyset page of the course/task lists
+PAGE_SIZE = 200
+# memory cap of the per-session course/task row cache
+CACHE_BYTES = 8 * 1024 * 1024
+# as-you-type search: wait for a typing pause, then show the best matches
+SEARCH_DELAY_MS = 200
+SEARCH_MIN_CHARS = 2
+SEARCH_LIMIT = 50
+
+
 class TaskManagerFrame(ttk.Frame):
     """Task Manager main UI (user-scoped)."""
 
-    def __init__(self, parent, controller):
+    def __init__(self, parent, controller, service=None, worker=None):
+        """`service`/`worker` may be handed over already running (see set_user's `courses`)."""
         super().__init__(parent)
         self.controller = controller
         self.db = controller.db              # expects DatabaseManager with fetchall/execute
@@ -24,9 +43,26 @@ class TaskManagerFrame(ttk.Frame):
         self.user_label.pack(side=tk.LEFT)
         ttk.Button(top, text="Logout", bootstyle="danger", command=self.controller.logout) \
             .pack(side=tk.RIGHT)
+        ttk.Button(top, text="Calendar", bootstyle="info-outline", command=self.open_calendar) \
+            .pack(side=tk.RIGHT, padx=(0, 10))
+        self._calendar = None
+        self.btn_import = ttk.Button(top, text="Import…", bootstyle="info-outline", command=self.import_data)
+        self.btn_import.pack(side=tk.RIGHT, padx=(0, 10))
+        self.btn_export = ttk.Button(top, text="Export…", bootstyle="info-outline", command=self.export_data)
+        self.btn_export.pack(side=tk.RIGHT, padx=(0, 10))
         
         frameThemeButton = ttk.Frame(top)
         frameThemeButton.pack(side=tk.RIGHT, padx=10) 
+
+        # ---- Search ---------------------------------------------------------
+        self.search_var = tk.StringVar()
+        self.ent_search = ttk.Entry(top, textvariable=self.search_var, width=32)
+        self.ent_search.pack(side=tk.RIGHT, padx=(10, 0))
+        ttk.Label(top, text="Search:").pack(side=tk.RIGHT)
+        self.ent_search.bind("<KeyRelease>", self._on_search_typed)
+        self.ent_search.bind("<Escape>", self._clear_search)
+        self._search_after = None
+        self._search_hits = []
         
 
         def toggle_theme():
@@ -43,6 +79,13 @@ class TaskManagerFrame(ttk.Frame):
         main = ttk.Frame(self, padding=12)
         main.pack(fill=BOTH, expand=True)
 
+        # search results, shown above the panes only while there is a query
+        self.search_pane = ttk.Labelframe(self, text="Search results", padding=10)
+        self.search_results = tk.Listbox(self.search_pane, height=6, activestyle="none")
+        self.search_results.pack(fill=X)
+        self.search_results.bind("<<ListboxSelect>>", self._on_search_select)
+        self._main = main
+
 
 
         panes = ttk.Panedwindow(main, orient=tk.HORIZONTAL)
@@ -55,10 +98,10 @@ class TaskManagerFrame(ttk.Frame):
         courses_pane = ttk.Labelframe(panes, text="Courses", padding=10)
         panes.add(courses_pane, weight=1)
 
-        self.courses_list = tk.Listbox(
-            courses_pane, exportselection=False, height=16)
+        self.courses_list = VirtualList(
+            courses_pane, fetch_page=self._fetch_course_page,
+            on_select=self.on_course_select, page_size=PAGE_SIZE, height=16)
         self.courses_list.pack(fill=BOTH, expand=True)
-        self.courses_list.bind("<<ListboxSelect>>", self.on_course_select)
 
         cbar = ttk.Frame(courses_pane)
         cbar.pack(fill=X, pady=(8, 0))
@@ -71,10 +114,10 @@ class TaskManagerFrame(ttk.Frame):
         tasks_pane = ttk.Labelframe(panes, text="Tasks", padding=10)
         panes.add(tasks_pane, weight=1)
 
-        self.tasks_list = tk.Listbox(
-            tasks_pane, exportselection=False, height=16)
+        self.tasks_list = VirtualList(
+            tasks_pane, fetch_page=self._fetch_task_page,
+            on_select=self.on_task_select, page_size=PAGE_SIZE, height=16)
         self.tasks_list.pack(fill=BOTH, expand=True)
-        self.tasks_list.bind("<<ListboxSelect>>", self.on_task_select)
 
         tbar = ttk.Frame(tasks_pane)
         tbar.pack(fill=X, pady=(8, 0))
@@ -111,65 +154,126 @@ class TaskManagerFrame(ttk.Frame):
         )
         self.btn_save.pack(fill=X, pady=(4, 0))
 
-        # in-memory index maps
-        self._course_index_to_id = {}
-        self._task_index_to_id = {}
+        # course whose tasks are listed (pages are fetched lazily while scrolling)
+        self._tasks_course_id = None
+        # version of the row in the detail form: Save only overwrites that version
+        self._shown_version = None
+
+        # per-session course/task access with a write-through row cache
+        self.service = service or TaskService(self.db, cache_bytes=CACHE_BYTES)
+
+        # background DB executor; callbacks are pumped from this widget's event loop
+        self.worker = worker or DBWorker(name="task-manager-db")
+        self.worker.attach(self)
+        # imports/exports hold their thread for as long as the file takes: they get
+        # their own, so pages, selections and searches on self.worker never wait
+        self.bulk_worker = DBWorker(name="task-manager-bulk")
+        self.bulk_worker.attach(self)
+        self._import_progress = None  # (courses, tasks) so far, set by the import thread
+        self._import_after = None
 
     # ---- Public API ---------------------------------------------------------
-    def set_user(self, user_id: int):
-        """Called by App after login."""
+    def set_user(self, user_id: int, user=None, courses=None):
+        """
+        Called by App after login.
+        user: the db.models.User if the caller already has it (no lookup then)
+        courses: Future of service.course_listing(user_id, PAGE_SIZE) started
+                 on self.worker before the frame was built (see app.py)
+        """
         self.current_user_id = user_id
-        rows = self.db.fetchall("SELECT name FROM USER WHERE id=?", (user_id,))
-        name = rows[0]["name"] if rows else "User"
-        self.user_label.configure(text=f"Welcome, {name}!")
-        self.controller.title(f"Task Manager - {name}")
-        self.refresh_all()
+        if user is not None:
+            self._show_user([user])
+        else:
+            self.worker.submit(self.db.fetch_models, User, "user.by_id", (user_id,),
+                               on_done=self._show_user, on_error=self._on_db_error, key="user")
+        self.refresh_all(courses)
+
+    def destroy(self):
+        if self._search_after:
+            self.after_cancel(self._search_after)
+        if self._import_after:
+            self.after_cancel(self._import_after)
+        self.worker.shutdown()
+        self.bulk_worker.shutdown()
+        super().destroy()
 
     # ---- UI refresh helpers -------------------------------------------------
-    def refresh_all(self):
-        self.load_courses()
+    # DB reads/writes run on self.worker; results are rendered from the Tk loop.
+    # Reads use a coalescing key so rapid re-selection only renders the latest one.
+    def refresh_all(self, courses=None):
+        self.load_courses(prefetched=courses)
         self.load_tasks(None)
         self.clear_details()
         self._update_button_states(course_selected=False, task_selected=False)
 
-    def load_courses(self):
-        self.courses_list.delete(0, tk.END)
-        self._course_index_to_id.clear()
+    # Lists are keyset-paginated (id DESC): a load fetches the row count and the
+    # first page; VirtualList asks for further pages through _fetch_*_page.
+    def load_courses(self, on_loaded=None, prefetched=None):
         if not self.current_user_id:
+            self.worker.cancel("courses")
+            self.courses_list.clear()
             return
-        rows = self.db.fetchall(
-            "SELECT id, name FROM COURSE WHERE user_id=? ORDER BY id DESC",
-            (self.current_user_id,),
+        # a prefetched listing ran earlier on the same worker thread: just collect it
+        job = (prefetched.result,) if prefetched is not None else (
+            self.service.course_listing, self.current_user_id, PAGE_SIZE)
+        self.worker.submit(
+            *job,
+            on_done=lambda page: self._show_first_page(self.courses_list, page, on_loaded),
+            on_error=self._on_db_error, key="courses",
         )
-        for i, row in enumerate(rows):
-            self.courses_list.insert(tk.END, row["name"])
-            self._course_index_to_id[i] = row["id"]
 
-    def load_tasks(self, course_id):
-        self.tasks_list.delete(0, tk.END)
-        self._task_index_to_id.clear()
+    def load_tasks(self, course_id, on_loaded=None):
+        self._tasks_course_id = course_id
+        # drop the previous course's rows (and task selection) right away
+        self.tasks_list.clear()
         if not course_id:
+            self.worker.cancel("tasks")
             return
-        rows = self.db.fetchall(
-            "SELECT id, name FROM TASK WHERE course_id=? ORDER BY id DESC",
-            (course_id,),
+        self.worker.submit(
+            self.service.task_listing, course_id, PAGE_SIZE,
+            on_done=lambda page: self._show_first_page(self.tasks_list, page, on_loaded),
+            on_error=self._on_db_error, key="tasks",
         )
-        for i, row in enumerate(rows):
-            self.tasks_list.insert(tk.END, row["name"])
-            self._task_index_to_id[i] = row["id"]
+
+    def _show_first_page(self, listing, page, on_loaded=None):
+        total, rows = page
+        listing.reset(total, rows)
+        if on_loaded:
+            on_loaded()
+
+    def _fetch_course_page(self, before_id, lower_id, limit, on_rows):
+        self.worker.submit(
+            self.service.course_page, self.current_user_id, before_id, lower_id, limit,
+            on_done=on_rows, on_error=self._on_db_error,
+        )
+
+    def _fetch_task_page(self, before_id, lower_id, limit, on_rows):
+        if not self._tasks_course_id:
+            return
+        self.worker.submit(
+            self.service.task_page, self._tasks_course_id, before_id, lower_id, limit,
+            on_done=on_rows, on_error=self._on_db_error,
+        )
+
+    def _show_user(self, rows):
+        name = rows[0].name if rows else "User"
+        self.user_label.configure(text=f"Welcome, {name}!")
+        self.controller.title(f"Task Manager - {name}")
+
+    def _on_db_error(self, _exc):
+        Messagebox.showerror("Database Error", "Something went wrong. Please try again.", parent=self)
 
     def clear_details(self):
         self.ent_name.delete(0, tk.END)
         self.txt_desc.delete("1.0", tk.END)
         self.ent_due.delete(0, tk.END)
+        self._shown_version = None
 
     def _selected_course_id(self):
-        sel = self.courses_list.curselection()
-        return self._course_index_to_id.get(sel[0]) if sel else None
+        return self.courses_list.selected_key()
 
     def _selected_task_id(self):
-        sel = self.tasks_list.curselection()
-        return self._task_index_to_id.get(sel[0]) if sel else None
+        return self.tasks_list.selected_key()
 
     def _update_button_states(self, course_selected: bool, task_selected: bool):
         self.btn_task_add.configure(
@@ -190,41 +294,183 @@ class TaskManagerFrame(ttk.Frame):
         self._update_button_states(
             course_selected=bool(cid), task_selected=False)
 
+        self.worker.cancel("details")
         if cid:
-            rows = self.db.fetchall(
-                "SELECT name, description FROM COURSE WHERE id=?", (cid,))
-            if rows:
-                self.ent_name.insert(0, rows[0]["name"])
-                self.txt_desc.insert("1.0", rows[0]["description"] or "")
+            # listed rows are cached by load_courses(): usually no DB round-trip
+            row = self.service.cached_course(cid)
+            if row is not None:
+                self._show_course_details(cid, row)
+                return
+            self.worker.submit(
+                self.service.course, cid,
+                on_done=lambda row: self._show_course_details(cid, row),
+                on_error=self._on_db_error, key="details",
+            )
 
     def on_task_select(self, _evt):
         tid = self._selected_task_id()
         self._update_button_states(course_selected=bool(
             self._selected_course_id()), task_selected=bool(tid))
         self.clear_details()
+        self.worker.cancel("details")
         if tid:
-            rows = self.db.fetchall(
-                "SELECT name, description, due_date FROM TASK WHERE id=?", (
-                    tid,)
+            row = self.service.cached_task(tid)
+            if row is not None:
+                self._show_task_details(tid, row)
+                return
+            self.worker.submit(
+                self.service.task, tid,
+                on_done=lambda row: self._show_task_details(tid, row),
+                on_error=self._on_db_error, key="details",
             )
-            if rows:
-                self.ent_name.insert(0, rows[0]["name"])
-                self.txt_desc.insert("1.0", rows[0]["description"] or "")
-                self.ent_due.insert(0, rows[0]["due_date"] or "")
+
+    def _show_course_details(self, cid, row):
+        # selection may have moved on while the query ran
+        if not row or self._selected_task_id() or self._selected_course_id() != cid:
+            return
+        self.clear_details()
+        self.ent_name.insert(0, row.name)
+        self.txt_desc.insert("1.0", row.description or "")
+        self._shown_version = row.version
+
+    def _show_task_details(self, tid, row):
+        if not row or self._selected_task_id() != tid:
+            return
+        self.clear_details()
+        self.ent_name.insert(0, row.name)
+        self.txt_desc.insert("1.0", row.description or "")
+        self.ent_due.insert(0, row.due_date or "")
+        self._shown_version = row.version
+
+    # ---- Search -------------------------------------------------------------
+    # Debounced: each keystroke restarts the timer, and the "search" worker key
+    # drops queries that were overtaken before they ran.
+    def _on_search_typed(self, _evt):
+        if self._search_after:
+            self.after_cancel(self._search_after)
+        self._search_after = self.after(SEARCH_DELAY_MS, self._run_search)
+
+    def _clear_search(self, _evt=None):
+        self.search_var.set("")
+        self._on_search_typed(None)
+
+    def _run_search(self):
+        self._search_after = None
+        text = self.search_var.get().strip()
+        if len(text) < SEARCH_MIN_CHARS or not self.current_user_id:
+            self.worker.cancel("search")
+            self._show_search_hits(text, [])
+            return
+        self.worker.submit(
+            self.db.search, self.current_user_id, text, SEARCH_LIMIT,
+            on_done=lambda hits: self._show_search_hits(text, hits),
+            on_error=self._on_db_error, key="search",
+        )
+
+    def _show_search_hits(self, text, hits):
+        if text != self.search_var.get().strip():
+            return  # typed on while the query ran
+        self._search_hits = hits
+        self.search_results.delete(0, tk.END)
+        for hit in hits:
+            self.search_results.insert(tk.END, f"{hit.kind.capitalize()}: {hit.name}")
+        if text:
+            if not hits:
+                self.search_results.insert(tk.END, "No matches")
+            self.search_pane.pack(fill=X, padx=12, before=self._main)
+        else:
+            self.search_pane.pack_forget()
+
+    def _on_search_select(self, _evt):
+        sel = self.search_results.curselection()
+        if not sel or sel[0] >= len(self._search_hits):
+            return
+        hit = self._search_hits[sel[0]]
+        if hit.kind == "course":
+            self._open_course(hit.course_id, lambda: self.on_course_select(None))
+        else:
+            self._open_task(hit.course_id, hit.id)
+
+    def _open_course(self, course_id, on_selected):
+        """
+        Select a course in the list, loading the pages before it first if it is not
+        in memory, then call on_selected(). Until then the previous selection (and
+        the tasks shown for it) stays as it is, so add/save never act on another course.
+        """
+        def on_done(found):
+            if found:
+                on_selected()
+            else:
+                Messagebox.showwarning("Not found", "This course was deleted elsewhere.", parent=self)
+                self._run_search()
+
+        self.courses_list.reveal_key(course_id, on_done)
+
+    def _open_task(self, course_id, task_id):
+        """Select a task's course, then the task once the course's tasks are listed."""
+        def select_task():
+            self.tasks_list.reveal_key(task_id, lambda found: found and self.on_task_select(None))
+
+        def on_course_selected():
+            self.clear_details()
+            self.load_tasks(course_id, on_loaded=select_task)
+            self._update_button_states(course_selected=True, task_selected=False)
+
+        self._open_course(course_id, on_course_selected)
+
+    # ---- Calendar -----------------------------------------------------------
+    # Day counts come from the TASK_DAY aggregate (one range query per month);
+    # the month is re-read whenever the calendar window gets the focus back.
+    def open_calendar(self):
+        if self._calendar is not None and self._calendar.winfo_exists():
+            self._calendar.lift()
+            return
+        from ui.calendar_view import CalendarView
+
+        top = tk.Toplevel(self)
+        top.title("Calendar")
+        view = CalendarView(
+            top, fetch_counts=self._fetch_day_counts, fetch_day=self._fetch_day_tasks,
+            on_open=lambda row: self._open_task(row.course_id, row.id))
+        view.pack(fill=BOTH, expand=True)
+
+        def on_focus(evt):
+            if evt.widget is top:
+                view.refresh()
+
+        top.bind("<FocusIn>", on_focus)
+        self._calendar = top
+
+    def _fetch_day_counts(self, first, last, on_counts):
+        self.worker.submit(
+            self.service.day_counts, self.current_user_id, first, last,
+            on_done=on_counts, on_error=self._on_db_error, key="calendar",
+        )
+
+    def _fetch_day_tasks(self, day, on_rows):
+        self.worker.submit(
+            self.service.tasks_due_on, self.current_user_id, day,
+            on_done=on_rows, on_error=self._on_db_error, key="calendar-day",
+        )
 
     # ---- Actions ------------------------------------------------------------
+    # Successful writes are applied to the lists in place (one row, visible rows
+    # redrawn); the DB is only re-queried to reconcile after a failed write.
     def add_course(self):
+        from ttkbootstrap.dialogs.dialogs import Querybox
+
         name = Querybox.get_string(
             prompt="Enter course name:", title="Add Course")
         if not name:
             return
         desc = Querybox.get_string(
             prompt="Enter course description (optional):", title="Add Course")
-        self.db.execute(
-            "INSERT INTO COURSE (user_id, name, description) VALUES (?, ?, ?)",
-            (self.current_user_id, name.strip(), (desc or "").strip()),
+        name = name.strip()
+        self.worker.submit(
+            self.service.add_course, self.current_user_id, name, (desc or "").strip(),
+            on_done=self.courses_list.insert_first,
+            on_error=self._on_write_error,
         )
-        self.load_courses()
 
     def delete_course(self):
         cid = self._selected_course_id()
@@ -235,13 +481,24 @@ class TaskManagerFrame(ttk.Frame):
             "Confirm Delete",
             parent=self,
         ):
-            self.db.execute("DELETE FROM COURSE WHERE id=?", (cid,))
-            self.refresh_all()
+            def on_deleted(_id):
+                self.courses_list.remove_key(cid)
+                self.load_tasks(None)
+                self.clear_details()
+                self._update_button_states(course_selected=False, task_selected=False)
+
+            # the cascade can be large: keep it off the Tk thread
+            self.worker.submit(
+                self.service.delete_course, cid,
+                on_done=on_deleted, on_error=self._on_write_error,
+            )
 
     def add_task(self):
         cid = self._selected_course_id()
         if not cid:
             return
+        from ttkbootstrap.dialogs.dialogs import Querybox
+
         name = Querybox.get_string(prompt="Enter task name:", title="Add Task")
         if not name:
             return
@@ -249,20 +506,31 @@ class TaskManagerFrame(ttk.Frame):
             prompt="Enter task description (optional):", title="Add Task Description")
         due = Querybox.get_string(
             prompt="Enter due date (YYYY-MM-DD):", title="Add Task Due Date")
-        self.db.execute(
-            "INSERT INTO TASK (course_id, name, description, due_date) VALUES (?, ?, ?, ?)",
-            (cid, name.strip(), (desc or "").strip(), (due or "").strip()),
+        name = name.strip()
+        due = self._checked_due_date(due)
+        if due is False:
+            return
+
+        def on_added(row):
+            if self._tasks_course_id == cid:
+                self.tasks_list.insert_first(row)
+
+        self.worker.submit(
+            self.service.add_task, cid, name, (desc or "").strip(), due,
+            on_done=on_added, on_error=self._on_write_error,
         )
-        self.load_tasks(cid)
 
     def delete_task(self):
         tid = self._selected_task_id()
         if not tid:
             return
         if Messagebox.askyesno("Are you sure you want to delete this task?", "Confirm Delete", parent=self):
-            self.db.execute("DELETE FROM TASK WHERE id=?", (tid,))
+            self.worker.submit(
+                self.service.delete_task, tid,
+                on_done=lambda _id: self.tasks_list.remove_key(tid),
+                on_error=self._on_write_error,
+            )
             # stay on the current course
-            self.load_tasks(self._selected_course_id())
             self.clear_details()
             self._update_button_states(
                 course_selected=True, task_selected=False)
@@ -272,27 +540,136 @@ class TaskManagerFrame(ttk.Frame):
         desc = self.txt_desc.get("1.0", tk.END).strip()
         due = self.ent_due.get().strip()
         if not name:
-            Messagebox.show_error("Name cannot be empty.", "Error")
+            Messagebox.showerror("Error", "Name cannot be empty.", parent=self)
             return
 
         cid = self._selected_course_id()
         tid = self._selected_task_id()
 
         if tid:
-            self.db.execute(
-                "UPDATE TASK SET name=?, description=?, due_date=? WHERE id=?",
-                (name, desc, due, tid),
+            due = self._checked_due_date(due)
+            if due is False:
+                return
+            self.worker.submit(
+                self.service.update_task, tid, name, desc, due, self._shown_version,
+                on_done=lambda row: self._on_saved(self.tasks_list, row),
+                on_error=self._on_save_error,
             )
-            self.load_tasks(cid)
         elif cid:
-            self.db.execute(
-                "UPDATE COURSE SET name=?, description=? WHERE id=?",
-                (name, desc, cid),
+            self.worker.submit(
+                self.service.update_course, cid, name, desc, self._shown_version,
+                on_done=lambda row: self._on_saved(self.courses_list, row),
+                on_error=self._on_save_error,
             )
-            self.load_courses()
-            # reselect the course if still present (best-effort)
-            for i in range(self.courses_list.size()):
-                if self.courses_list.get(i) == name:
-                    self.courses_list.selection_set(i)
-                    break
-            self.on_course_select(None)
+
+    def _on_saved(self, rows, row):
+        rows.update_row(row)
+        if rows.selected_key() == row.id:
+            self._shown_version = row.version
+
+    def _on_save_error(self, exc):
+        """Another window or client saved the row first: show theirs instead of overwriting it."""
+        if not isinstance(exc, ConflictError):
+            self._on_write_error(exc)
+            return
+        if exc.current is None:
+            Messagebox.showwarning("Not saved", f"This {exc.kind} was deleted elsewhere.", parent=self)
+            self._resync_lists()
+            return
+        Messagebox.showwarning(
+            "Not saved", f"This {exc.kind} was changed elsewhere. Its current version is shown; "
+                         "make your edit again to save it.", parent=self)
+        if exc.kind == "task":
+            self.tasks_list.update_row(exc.current)
+            self._show_task_details(exc.current.id, exc.current)
+        else:
+            self.courses_list.update_row(exc.current)
+            self._show_course_details(exc.current.id, exc.current)
+
+    def _checked_due_date(self, text):
+        """'YYYY-MM-DD' or None for a blank entry; False (after telling the user) if invalid."""
+        try:
+            return normalize_due_date(text)
+        except ValueError:
+            Messagebox.showerror("Error", "Due date must be a valid date (YYYY-MM-DD).", parent=self)
+            return False
+
+    def import_data(self):
+        """Bulk-load courses/tasks from a CSV, JSON-lines or JSON file (service/importer.py) on bulk_worker."""
+        from tkinter import filedialog
+
+        from service.importer import import_file
+
+        path = filedialog.askopenfilename(
+            parent=self, title="Import courses and tasks",
+            filetypes=[("CSV or JSON", "*.csv *.jsonl *.ndjson *.json"), ("All files", "*.*")])
+        if not path or not self.current_user_id:
+            return
+
+        def on_progress(report):  # import thread: only hand the counts over
+            self._import_progress = (report.courses, report.tasks)
+
+        def show_progress():
+            if self._import_progress is not None:
+                courses, tasks = self._import_progress
+                self.btn_import.configure(text=f"Importing… {courses:,} courses, {tasks:,} tasks")
+            self._import_after = self.after(250, show_progress)
+
+        def finished():
+            self.after_cancel(self._import_after)
+            self._import_after = self._import_progress = None
+            self.btn_import.configure(state="normal", text="Import…")
+
+        def on_done(report):
+            finished()
+            lines = [report.summary()]
+            lines += [f"line {line}: {reason}" for line, reason in report.rejects[:10]]
+            if report.rejected > 10:
+                lines.append(f"... and {report.rejected - 10} more rejected rows")
+            Messagebox.showinfo("Import finished", "\n".join(lines), parent=self)
+            self.refresh_all()
+
+        def on_error(exc):
+            finished()
+            Messagebox.showerror("Import failed", str(exc) or "Something went wrong.", parent=self)
+            self.refresh_all()  # batches committed before the error are kept
+
+        self.btn_import.configure(state="disabled")
+        show_progress()
+        self.bulk_worker.submit(partial(import_file, on_progress=on_progress), self.db, self.current_user_id, path,
+                                on_done=on_done, on_error=on_error)
+
+    def export_data(self):
+        """Write all courses/tasks to CSV, JSON lines or iCalendar (service/exporter.py) on bulk_worker."""
+        from tkinter import filedialog
+
+        from service.exporter import export_file
+
+        path = filedialog.asksaveasfilename(
+            parent=self, title="Export courses and tasks", defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON lines", "*.jsonl"), ("iCalendar", "*.ics")])
+        if not path or not self.current_user_id:
+            return
+
+        def on_done(n):
+            self.btn_export.configure(state="normal")
+            Messagebox.showinfo("Export finished", f"{n} rows written to {path}", parent=self)
+
+        def on_error(exc):
+            self.btn_export.configure(state="normal")
+            Messagebox.showerror("Export failed", str(exc) or "Something went wrong.", parent=self)
+
+        self.btn_export.configure(state="disabled")
+        self.bulk_worker.submit(export_file, self.db, self.current_user_id, path,
+                                on_done=on_done, on_error=on_error)
+
+    def _on_write_error(self, exc):
+        """A write failed: report it and re-sync both lists with the database."""
+        self._on_db_error(exc)
+        self._resync_lists()
+
+    def _resync_lists(self):
+        """Reload both lists from the database, keeping the selected course."""
+        cid = self._selected_course_id()
+        self.load_courses(on_loaded=lambda: self.courses_list.select_key(cid))
+        self.load_tasks(self._tasks_course_id)
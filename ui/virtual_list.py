@@ -0,0 +1,210 @@
+import tkinter as tk
+import tkinter.font as tkfont
+from typing import Callable, Optional
+
+import ttkbootstrap as ttk
+
+from ui.paging import PagedList
+
+PLACEHOLDER = "…"
+
+
+class VirtualList(ttk.Frame):
+    """
+    Listbox + scrollbar that only materializes the visible rows of a PagedList.
+
+    Args:
+        master: parent widget
+        fetch_page (callable): fetch_page(before_id, lower_id, limit, on_rows) must load
+            the rows with lower_id <= id < before_id (id DESC, LIMIT limit) asynchronously
+            and call on_rows(rows) on the Tk thread
+        on_select (callable|None): called with the Tk event when the user selects a row
+        page_size / max_pages: see PagedList
+        overscan (int): rows prefetched above and below the viewport
+
+    The selection is tracked by row id, so it survives scrolling, re-rendering and
+    the in-place edits (insert_first/update_row/remove_key), which only redraw the
+    visible rows instead of reloading the listing.
+    """
+
+    def __init__(self, master, fetch_page: Callable, on_select: Optional[Callable] = None,
+                 page_size: int = 200, max_pages: int = 10, overscan: int = 50, **listbox_kw):
+        super().__init__(master)
+        self.model = PagedList(page_size=page_size, max_pages=max_pages)
+        self._fetch_page = fetch_page
+        self._on_select = on_select
+        self._overscan = overscan
+        self._offset = 0
+        self._visible = listbox_kw.get("height", 16)
+        self._selected_key = None
+        self._generation = 0  # bumped on reset(); late pages of an old listing are dropped
+
+        self.listbox = tk.Listbox(self, exportselection=False, **listbox_kw)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self._line_height = max(1, tkfont.Font(font=self.listbox.cget("font")).metrics("linespace") + 1)
+        self.listbox.bind("<Configure>", self._on_configure)
+        self.listbox.bind("<<ListboxSelect>>", self._on_listbox_select)
+        self.listbox.bind("<MouseWheel>", self._on_wheel)
+        self.listbox.bind("<Button-4>", lambda _e: self.scroll(-3))
+        self.listbox.bind("<Button-5>", lambda _e: self.scroll(3))
+        self.listbox.bind("<Up>", lambda e: self._move_selection(-1, e))
+        self.listbox.bind("<Down>", lambda e: self._move_selection(1, e))
+        self.listbox.bind("<Prior>", lambda _e: self.scroll(-self._visible))
+        self.listbox.bind("<Next>", lambda _e: self.scroll(self._visible))
+
+    # ---- Public API ---------------------------------------------------------
+    def reset(self, total: int, first_page=None):
+        """Start a new listing with `total` rows (first page optional, fetched otherwise)."""
+        self._generation += 1
+        self.model.reset(total, first_page)
+        self._offset = 0
+        self._selected_key = None
+        self._render()
+
+    def clear(self):
+        self.reset(0, [])
+
+    def selected_key(self):
+        return self._selected_key
+
+    def select_key(self, key) -> bool:
+        """Select (and scroll to) the row with id == key if it is loaded."""
+        index = self.model.index_of(key)
+        if index is None:
+            return False
+        self._selected_key = key
+        self._scroll_into_view(index)
+        self._render()
+        return True
+
+    def reveal_key(self, key, on_done: Callable[[bool], None]) -> None:
+        """
+        select_key(), first loading the pages up to the row if it is not in memory;
+        on_done(found) runs on the Tk thread once that is settled (never if the
+        listing is reset meanwhile).
+        """
+        generation = self._generation
+
+        def step():
+            if generation != self._generation:
+                return
+            if self.select_key(key):
+                on_done(True)
+                return
+            page = self.model.page_for_key(key)
+            if page is None:
+                on_done(False)
+                return
+            self._request_page(*page, then=step)
+
+        step()
+
+    def insert_first(self, row):
+        """Show a freshly inserted row (newest id) at the top."""
+        self.model.insert_first(row)
+        self._render()
+
+    def update_row(self, row) -> bool:
+        """Redraw the row with the same id; False if it is not loaded (nothing to redraw)."""
+        changed = self.model.update(row)
+        if changed:
+            self._render()
+        return changed
+
+    def remove_key(self, key):
+        self.model.remove(key)
+        if key == self._selected_key:
+            self._selected_key = None
+        self._render()
+
+    def scroll(self, rows: int):
+        self._offset += rows
+        self._render()
+        return "break"
+
+    # ---- rendering ------------------------------------------------------------
+    def _render(self):
+        total = len(self.model)
+        self._offset = max(0, min(self._offset, total - self._visible))
+        stop = min(total, self._offset + self._visible)
+
+        lo = max(0, self._offset - self._overscan)
+        hi = min(total, stop + self._overscan)
+        for k, before_id, lower_id, limit in self.model.wanted_pages(lo, hi):
+            self._request_page(k, before_id, lower_id, limit)
+
+        self.listbox.delete(0, tk.END)
+        for i in range(self._offset, stop):
+            row = self.model.row(i)
+            self.listbox.insert(tk.END, row.name if row is not None else PLACEHOLDER)
+            if row is not None and row.id == self._selected_key:
+                self.listbox.selection_set(i - self._offset)
+
+        if total:
+            self.scrollbar.set(self._offset / total, stop / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _request_page(self, k: int, before_id: int, lower_id: int, limit: int, then=None):
+        generation = self._generation
+
+        def on_rows(rows):
+            if generation != self._generation:
+                return
+            self.model.add_page(k, rows)
+            self._render()
+            if then:
+                then()
+
+        self._fetch_page(before_id, lower_id, limit, on_rows)
+
+    def _scroll_into_view(self, index: int):
+        if index < self._offset:
+            self._offset = index
+        elif index >= self._offset + self._visible:
+            self._offset = index - self._visible + 1
+
+    # ---- events ---------------------------------------------------------------
+    def _on_configure(self, event):
+        visible = max(1, event.height // self._line_height)
+        if visible != self._visible:
+            self._visible = visible
+            self._render()
+
+    def _on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self._offset = int(float(args[0]) * len(self.model))
+        elif action == "scroll":
+            amount, unit = int(args[0]), args[1]
+            self._offset += amount * (self._visible if unit == "pages" else 1)
+        self._render()
+
+    def _on_wheel(self, event):
+        return self.scroll(-1 if event.delta > 0 else 1)
+
+    def _on_listbox_select(self, event):
+        sel = self.listbox.curselection()
+        row = self.model.row(self._offset + sel[0]) if sel else None
+        if row is None:
+            # placeholder row: keep the previous selection
+            self._render()
+            return
+        self._selected_key = row.id
+        if self._on_select:
+            self._on_select(event)
+
+    def _move_selection(self, step: int, event):
+        current = self.model.index_of(self._selected_key) if self._selected_key is not None else None
+        index = 0 if current is None else current + step
+        row = self.model.row(index)
+        if row is None:
+            return "break"
+        self._selected_key = row.id
+        self._scroll_into_view(index)
+        self._render()
+        if self._on_select:
+            self._on_select(event)
+        return "break"
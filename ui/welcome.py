@@ -3,11 +3,14 @@ from tkinter import messagebox
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import EW, NSEW, SUCCESS, W
 
-from db.manager import DatabaseManager
-from service.auth import authenticate
+from db.manager import DEFAULT_PROFILE, DatabaseManager
+from service.auth import AuthService
 
 #root = ttk.Tk()  # ou Tkinter Tk()
 
+# "Continue as ..." buttons shown for remembered profiles
+RECENT_PROFILES = 3
+
 
 class WelcomeScreen(ttk.Frame):
     """
@@ -17,11 +20,17 @@ class WelcomeScreen(ttk.Frame):
         master: parent window
         db_path (str): sqlite file path
         schema_path (str): path to schema.sql
-        on_login (callable|None): callback receiving the logged-in sqlite3.Row
+        db_profile (str): DatabaseManager connection profile ("interactive" or "bulk")
+        db (DatabaseManager|None): an already opened and migrated DB; opened from db_path if None
+        auth (AuthService|None): shared login service (keeps its email cache across logouts)
+        recent (list[dict]): remembered profiles (session.SessionStore.profiles()), shown as
+            one-click "Continue as ..." buttons for shared workstations
+        on_login (callable|None): callback receiving the logged-in db.models.User
     """
     current_theme = "flatly"
     
-    def __init__(self, master, db_path: str, schema_path: str, on_login=None):
+    def __init__(self, master, db_path: str, schema_path: str, on_login=None,
+                 db_profile: str = DEFAULT_PROFILE, db=None, auth=None, recent=()):
         super().__init__(master)
         self.on_login = on_login
 
@@ -37,8 +46,12 @@ class WelcomeScreen(ttk.Frame):
         style.configure("CardLabelDark.TLabel", background="#2b2b2b", foreground="#ffffff")
 
         # ---- DB init --------------------------------------------------------
-        self.db = DatabaseManager(db_path)
-        self.db.run_schema_file(schema_path)
+        # pool mode: TaskManagerFrame runs its queries on a background DBWorker
+        if db is None:
+            db = DatabaseManager(db_path, profile=db_profile, pool_size=4)
+            db.migrate(schema_path)  # returns at once when user_version is current
+        self.db = db
+        self.auth = auth or AuthService(db)
 
         # ---- Centered card --------------------------------------------------
         
@@ -77,6 +90,15 @@ class WelcomeScreen(ttk.Frame):
         )
         self.submit_btn.grid(row=5, column=0, sticky=EW)
 
+        # Recently used profiles (same path as typing their name/email)
+        for i, profile in enumerate(list(recent)[:RECENT_PROFILES]):
+            if not profile.get("email"):
+                continue
+            ttk.Button(
+                card, text=f"Continue as {profile['name'] or profile['email']}", bootstyle="secondary-link",
+                command=lambda p=profile: self._use_profile(p),
+            ).grid(row=6 + i, column=0, sticky=EW, pady=(8 if i == 0 else 0, 0))
+
         self.name_entry.focus_set()
 
         # ---- Theme toggle ---------------------------------------------------
@@ -105,19 +127,12 @@ class WelcomeScreen(ttk.Frame):
         toggle_btn.grid(row=0, column=0, pady=5)
 
 
-    # ---- DB helpers ---------------------------------------------------------
-    def _get_user_by_email(self, email: str):
-        rows = self.db.fetchall(
-            "SELECT id, name, email FROM USER WHERE email=? LIMIT 1", (email,)
-        )
-        return rows[0] if rows else None
-
-    def _create_user(self, name: str, email: str):
-        return self.db.execute(
-            "INSERT INTO USER (name, email) VALUES (?, ?)", (name, email)
-        )
-
     # ---- UI events ----------------------------------------------------------
+    def _use_profile(self, profile: dict):
+        self.name_var.set(profile["name"])
+        self.email_var.set(profile["email"])
+        self.on_submit()
+
     def on_submit(self):
         name = (self.name_var.get() or "").strip()
         email = (self.email_var.get() or "").strip()
@@ -130,8 +145,7 @@ class WelcomeScreen(ttk.Frame):
                 "Log in as the saved user?",
             )
 
-        status, user = authenticate(
-            self.db, name, email, confirm_on_mismatch=ask_confirm)
+        status, user = self.auth.login(name, email, confirm_on_mismatch=ask_confirm)
 
         if status == "invalid_input":
             messagebox.showerror(
@@ -147,11 +161,11 @@ class WelcomeScreen(ttk.Frame):
             return
         if status == "created":
             messagebox.showinfo(
-                "Welcome!", f"Account created. You're now logged in as {user['name']} ({user['email']}).")
+                "Welcome!", f"Account created. You're now logged in as {user.name} ({user.email}).")
         if status == "logged_in":
             title = "Welcome back"
             messagebox.showinfo(
-                title, f"Logged in as {user['name']} ({user['email']}).")
+                title, f"Logged in as {user.name} ({user.email}).")
 
         if user and self.on_login:
             self.on_login(user)